@@ -2,26 +2,75 @@ from flask import Flask, request
 from twilio.rest import Client
 from twilio.twiml.messaging_response import MessagingResponse
 import atexit
+import logging
 import os
+import re
 
-from config.settings import ADMIN_PHONE, TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, USER_MAP
+from config.settings import ADMIN_PHONE, LIVE_GOALS, TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, USER_MAP
 from services.sheets_service import SheetsService
 from services.message_service import MessageService
 from services.gameweek_service import GameweekService
 from services.scheduler_service import SchedulerService
 from services.fixture_service import FixtureService
+from services.live_scores_service import LiveScoresService
+from services.projection_service import ProjectionService
+from services.sheets_quota import SheetsBusyError
 from utils.date_utils import get_current_gameweek, is_deadline_passed, format_deadline
-from utils.text_utils import parse_player_picks
+from utils.text_utils import command_name, parse_player_picks
+from utils.message_chunks import ReplyPager
+from utils.metrics import metrics
+from utils.profiling import request_profiler
+from utils.logging_utils import clear_log_context, configure_logging, phone_hash, set_log_context
+
+# Logging first, so service start-up messages go through it too
+configure_logging()
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
 # Initialize services
 twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
 sheets_service = SheetsService()
-message_service = MessageService(twilio_client)
-gameweek_service = GameweekService()
-scheduler_service = SchedulerService(message_service)
+message_service = MessageService(twilio_client, sheets_service)
+gameweek_service = GameweekService(sheets_service)
+scheduler_service = SchedulerService(message_service, gameweek_service)
 fixture_service = FixtureService()
+live_scores_service = LiveScoresService(sheets_service, gameweek_service, message_service, fixture_service)
+projection_service = ProjectionService(gameweek_service, fixture_service)
+reply_pager = ReplyPager()
+
+# Cache hit ratios on /metrics (looked up at scrape time)
+metrics.register_cache('sheet_records', lambda: sheets_service.cache_stats)
+metrics.register_cache('leaderboard_render', lambda: gameweek_service.render_cache.stats)
+metrics.register_cache('summary_render', lambda: message_service.render_cache.stats)
+metrics.register_cache('fixtures_render', lambda: fixture_service.render_cache.stats)
+
+def webhook_command():
+    """Command name of the webhook being handled, for metrics and profile file names"""
+    return command_name(request.form.get('Body', ''))
+
+@app.before_request
+def start_request_metrics():
+    clear_log_context()
+    command = webhook_command() if request.endpoint == 'whatsapp_webhook' else '-'
+    if request.endpoint == 'whatsapp_webhook':
+        set_log_context(command=command, phone=phone_hash(request.form.get('From', '').replace('whatsapp:', '')))
+    metrics.start_request(request.endpoint or 'unknown', command)
+
+@app.after_request
+def finish_request_metrics(response):
+    """Record request latency and log a one-line timing summary (not for metrics scrapes)"""
+    log_line = metrics.finish_request(response.status_code)
+    if log_line and request.endpoint != 'metrics_endpoint':
+        logger.info(log_line)
+    clear_log_context()
+    return response
+
+def paged_reply(from_number, text):
+    """TwiML reply with the first page of text; further pages are kept for 'more'"""
+    resp = MessagingResponse()
+    resp.message(reply_pager.paginate(from_number, text))
+    return str(resp)
 
 @app.route('/send-summary/<int:gameweek>', methods=['POST'])
 def manual_summary_trigger(gameweek):
@@ -33,16 +82,28 @@ def manual_summary_trigger(gameweek):
         return {'status': 'error', 'message': str(e)}, 500
 
 @app.route('/webhook', methods=['POST'])
+@request_profiler.profiled(tag=webhook_command)
 def whatsapp_webhook():
     """Handle incoming WhatsApp messages"""
     try:
         from_number = request.form.get('From', '').replace('whatsapp:', '')
         message_body = request.form.get('Body', '')
         
-        print(f"Received message from {from_number}: {message_body}")
+        logger.info("Received message")
+        logger.debug("Message body: %r", message_body)
+
+        # Follow-ups for long replies, served from the stored pages
+        message_lower = message_body.lower().strip()
+        page_match = re.match(r'^(?:more|next|page (\d+))$', message_lower)
+        if page_match:
+            resp = MessagingResponse()
+            page_number = int(page_match.group(1)) if page_match.group(1) else None
+            resp.message(reply_pager.page(from_number, page_number))
+            return str(resp)
 
         # Check current gameweek
         current_gameweek, deadline = get_current_gameweek()
+        set_log_context(gameweek=current_gameweek)
         
         if not current_gameweek:
             resp = MessagingResponse()
@@ -52,24 +113,27 @@ def whatsapp_webhook():
         # Show fixtures command (available to all users)
         if message_body.lower().strip() in ['show fixtures', 'fixtures', 'games']:
             fixtures_message = fixture_service.format_fixtures_message(current_gameweek)
-            resp = MessagingResponse()
-            resp.message(fixtures_message)
-            return str(resp)
+            return paged_reply(from_number, fixtures_message)
 
         # Show weightings command (available to all users)
         if message_body.lower().strip() in ['show weightings', 'weightings', 'show weights', 'weights']:
             weightings_message = gameweek_service.get_player_weightings(current_gameweek)
-            resp = MessagingResponse()
-            resp.message(weightings_message)
-            return str(resp)
+            return paged_reply(from_number, weightings_message)
+
+        # Season standings commands (available to all users)
+        season_message = gameweek_service.process_season_command(message_body, current_gameweek)
+        if season_message:
+            return paged_reply(from_number, season_message)
 
         # Check for admin commands first (for admin user)
         if from_number == ADMIN_PHONE:
             admin_response = gameweek_service.process_admin_command(message_body, current_gameweek)
             if admin_response:
-                resp = MessagingResponse()
-                resp.message(admin_response)
-                return str(resp)
+                return paged_reply(from_number, admin_response)
+            
+            # Who can still win, over the fixtures left this gameweek
+            if message_lower in ['projection', 'can win', 'who can win']:
+                return paged_reply(from_number, projection_service.get_projection(current_gameweek))
             
             # Existing summary command
             if message_body.lower().strip() in ['summary', 'picks', 'show picks', 'show']:
@@ -79,14 +143,12 @@ def whatsapp_webhook():
                 return str(resp)
         
         # Handle specific commands for all users before trying to parse as picks
-        message_lower = message_body.lower().strip()
         if message_lower in ['show active', 'active', 'whos in', 'who is in']:
-            resp = MessagingResponse()
             if from_number == ADMIN_PHONE:
                 admin_response = gameweek_service.process_admin_command(message_body, current_gameweek)
-                resp.message(admin_response if admin_response else "Error processing command")
-            else:
-                resp.message("⛔ Only the admin can request active player status.")
+                return paged_reply(from_number, admin_response if admin_response else "Error processing command")
+            resp = MessagingResponse()
+            resp.message("⛔ Only the admin can request active player status.")
             return str(resp)
         
         # Check if deadline has passed
@@ -144,8 +206,13 @@ def whatsapp_webhook():
         resp.message(response_text)
         return str(resp)
         
+    except SheetsBusyError as e:
+        logger.warning("Sheets quota exhausted while processing webhook: %s", e)
+        resp = MessagingResponse()
+        resp.message(f"⏳ {e}")
+        return str(resp)
     except Exception as e:
-        print(f"Error processing webhook: {e}")
+        logger.exception("Error processing webhook: %s", e)
         resp = MessagingResponse()
         resp.message("❌ Sorry, something went wrong. Please try again.")
         return str(resp)
@@ -164,7 +231,7 @@ def get_summary():
             return "No active gameweek", 400
             
     except Exception as e:
-        print(f"Error in get_summary: {e}")
+        logger.error("Error in get_summary: %s", e)
         return f"Error: {str(e)}", 500
 
 @app.route('/health', methods=['GET'])
@@ -178,6 +245,11 @@ def health_check():
         'deadline': deadline.isoformat() if deadline else None
     }, 200
 
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
 @app.route('/gameweek-info', methods=['GET'])
 def gameweek_info():
     """API endpoint to check current gameweek status"""
@@ -212,8 +284,13 @@ def initialize_app():
 
     # Start the deadline summary scheduler
     summary_scheduler = scheduler_service.schedule_deadline_summaries()
+    # Finalize season scores and archive picks once each gameweek ends
+    scheduler_service.schedule_gameweek_rollover(summary_scheduler)
+    # Mark scorers from the FPL live feed while games are on
+    if LIVE_GOALS:
+        scheduler_service.schedule_live_scores(summary_scheduler, live_scores_service, fixture_service)
     summary_scheduler.start()
-    print("Summary scheduler started")
+    logger.info("Summary scheduler started")
 
     # Ensure the scheduler shuts down cleanly when the process exits
     atexit.register(lambda: summary_scheduler.shutdown(wait=False))
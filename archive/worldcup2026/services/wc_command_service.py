@@ -1,8 +1,8 @@
-import re
-from fuzzywuzzy import fuzz
 from config.settings import ADMIN_PHONE
-from config.wc_settings import TEAM_ABBREVIATIONS, FIFA_RANK
-from services.wc_scoring_service import WCScoringService
+from config.wc_settings import GROUP_FIXTURES, match_pair
+from services.wc_scoring_service import WCScoringService, form_row, index_results
+from services.wc_team_resolver import team_resolver
+from services import wc_simulator
 
 class WCCommandService:
     def __init__(self, sheets_service, twilio_client):
@@ -26,6 +26,10 @@ class WCCommandService:
                 player_name = original_command[7:].strip()
                 return self.scoring_service.get_detailed_scores(player_name)
 
+            # "Can I still win?" over the remaining matches (open to all)
+            if command in ['whatif', 'canwin']:
+                return self._whatif()
+
             # Help command
             if command in ['help', 'commands']:
                 return self._get_help_text()
@@ -99,6 +103,12 @@ class WCCommandService:
             if not away_team:
                 return f"❌ Could not recognize team: {team2_input}"
             
+            # Log group fixtures in the order the forms list them
+            fixture = GROUP_FIXTURES.get(match_pair(f"{home_team} vs {away_team}"))
+            if fixture and fixture[0] != home_team:
+                home_team, away_team = away_team, home_team
+                home_score, away_score = away_score, home_score
+            
             # Create match key
             match_key = f"{home_team} vs {away_team}"
             
@@ -111,8 +121,6 @@ class WCCommandService:
             )
             
             if success:
-                self.scoring_service.invalidate_cache()
-
                 if stage == 'group' and matchday:
                     stage_text = f"Group Stage, MD{matchday}"
                 else:
@@ -126,6 +134,28 @@ class WCCommandService:
             print(f"Error handling result command: {e}")
             return f"❌ Error processing result: {str(e)}"
     
+    def _whatif(self):
+        """Win chances and best/worst finish over the matches still to be played"""
+        if wc_simulator.np is None:
+            return "❌ 'wc whatif' needs numpy installed on the server."
+        try:
+            standing = self.scoring_service.player_totals()
+            if standing is None:
+                return "No picks found yet."
+            all_picks, results, totals, _ = standing
+
+            matches = wc_simulator.remaining_matches(all_picks, results)
+            if not matches:
+                return "No picked matches left to play: the leaderboard is final."
+
+            names = [player_data['display_name'] for player_data in all_picks.values()]
+            simulation = wc_simulator.WhatIf(names, [totals[name] for name in all_picks], matches)
+            return wc_simulator.format_whatif(*simulation.run())
+
+        except Exception as e:
+            print(f"Error running what-if: {e}")
+            return f"❌ Error running what-if: {str(e)}"
+    
     def _handle_bonus_command(self, bonus_text):
         """Handle bonus points: wc bonus [FORM_NUM] [POINTS] [PLAYER_NAMES]
         e.g. wc bonus 8 1 Peter Sam  or  wc bonus 8 0.5 Fraser Will"""
@@ -152,7 +182,6 @@ class WCCommandService:
             success, message = self.sheets_service.award_bonus_points(form_num, player_names, points)
 
             if success:
-                self.scoring_service.invalidate_cache()
                 pts_str = int(points) if points == int(points) else points
                 return f"✅ Bonus (Form {form_num}): {pts_str}pts awarded to {message.split(': ')[1]}"
             else:
@@ -165,10 +194,7 @@ class WCCommandService:
     def _debug_r32(self, player_name):
         """Debug R32 scoring for a player — form 5 breakdown only"""
         try:
-            abbr = {v: k for k, v in TEAM_ABBREVIATIONS.items()}
-
-            def shorten(team):
-                return abbr.get(team, team[:3].upper())
+            shorten = team_resolver.abbreviation
 
             all_picks = self.sheets_service.get_all_picks()
             all_results = self.sheets_service.get_all_results()
@@ -178,9 +204,7 @@ class WCCommandService:
                 return f"Player '{player_name}' not found."
 
             player_data = all_picks[normalized]
-            knockout_results = {
-                r['match_key']: r for r in all_results if r.get('stage') == 'knockout'
-            }
+            knockout_results = index_results(all_results)['knockout']
 
             lines = [f"R32 breakdown ({player_name}):"]
             total_pts = 0
@@ -189,22 +213,22 @@ class WCCommandService:
                 if form_num not in player_data['forms']:
                     lines.append(f"Form {form_num}: not found")
                     continue
-                picks = {k: v for k, v in player_data['forms'][form_num]['picks'].items() if ' vs ' in k}
+                schema, row = form_row(player_data['forms'][form_num])
                 lines.append(f"— Form {form_num} —")
-                for col, pick in picks.items():
-                    teams = col.split(' vs ')
-                    h_abbr = shorten(teams[0])
-                    a_abbr = shorten(teams[1])
-                    result = knockout_results.get(col)
+                for col, match_key, home_team, away_team in schema.knockout_matches:
+                    pick = row[col]
+                    h_abbr = shorten(home_team)
+                    a_abbr = shorten(away_team)
+                    result = knockout_results.get(match_key)
                     if not result:
                         lines.append(f"  {h_abbr} vs {a_abbr}: {shorten(pick)} [pending]")
                         continue
                     h = result.get('home_score', 0)
                     a = result.get('away_score', 0)
                     if h > a:
-                        correct = teams[0]
+                        correct = home_team
                     elif a > h:
-                        correct = teams[1]
+                        correct = away_team
                     else:
                         correct = 'Draw'
                     got_it = pick == correct
@@ -232,24 +256,8 @@ class WCCommandService:
             if 8 not in player_data['forms']:
                 return f"No form 8 picks found for '{player_name}'."
 
-            knockout_results = {
-                r['match_key']: r for r in all_results if r.get('stage') == 'knockout'
-            }
-
-            picks = player_data['forms'][8]['picks']
-            match_scores = {}
-            for col, val in picks.items():
-                m = re.match(r'^(.+? vs .+?) \[(.+?)\]\s*$', col)
-                if not m or val == '' or val is None:
-                    continue
-                match_key = m.group(1).strip()
-                team = m.group(2).strip()
-                if match_key not in match_scores:
-                    match_scores[match_key] = {}
-                try:
-                    match_scores[match_key][team] = int(val)
-                except (ValueError, TypeError):
-                    pass
+            knockout_results = index_results(all_results)['knockout']
+            match_scores = self.scoring_service.predicted_scores(player_data['forms'][8])
 
             lines = [f"QF breakdown ({player_name}):"]
             total_pts = 0
@@ -308,41 +316,20 @@ class WCCommandService:
 
         success, message = self.sheets_service.log_group_winner(group, team)
         if success:
-            self.scoring_service.invalidate_cache()
             return f"✅ Group {group} winner: {team}"
         return f"❌ Error: {message}"
 
     def _parse_team_name(self, team_input):
         """Parse team name from input (abbreviation or full name)"""
-        team_input = team_input.strip()
-        
-        # Check exact abbreviation match
-        if team_input.upper() in TEAM_ABBREVIATIONS:
-            return TEAM_ABBREVIATIONS[team_input.upper()]
-        
-        # Check exact full name match
-        for team_name in FIFA_RANK.keys():
-            if team_input.lower() == team_name.lower():
-                return team_name
-        
-        # Fuzzy matching for full names
-        best_match = None
-        best_score = 0
-        
-        for team_name in FIFA_RANK.keys():
-            score = fuzz.ratio(team_input.lower(), team_name.lower())
-            if score > best_score and score >= 70:  # 70% similarity threshold
-                best_score = score
-                best_match = team_name
-        
-        return best_match
+        return team_resolver.resolve(team_input.strip())
     
     def _get_help_text(self):
         """Return help text for commands"""
         return (
             "🏆 WORLD CUP 2026 BOT COMMANDS\n\n"
             "📊 FOR EVERYONE:\n"
-            "• wc leaderboard - Show current standings\n\n"
+            "• wc leaderboard - Show current standings\n"
+            "• wc whatif - Who can still win, and their chances\n\n"
             "⚙️ ADMIN ONLY:\n"
             "• wc result [TEAM1] [SCORE] [TEAM2]\n"
             "  Example: wc result ENG 2-1 CRO\n\n"
@@ -1,205 +1,250 @@
 import re
-from config.wc_settings import FIFA_RANK, GROUP_TOP_SEEDS
+from functools import lru_cache
+from config.wc_settings import FIFA_RANK, GROUP_TOP_SEEDS, GROUP_FIXTURES, KNOCKOUT_FORM_ROUNDS, match_pair
+from services.competition import WORLD_CUP_2026, ScoreCache
+
+RANK_SUFFIX = re.compile(r' \(#\d+\)')
+
+SCORE_COLUMN = re.compile(r'^(.+? vs .+?) \[(.+?)\]\s*$')
+GROUP_WINNER_COLUMN = re.compile(r'Group ([A-L]) Winner', re.IGNORECASE)
+
+class FormSchema:
+    """The pick columns of one formN_picks header row, parsed once.
+
+    Every participant's row in a tab has the same headers, so scoring walks
+    these typed column positions over the raw row instead of re-matching
+    each column name for each participant.
+    """
+
+    def __init__(self, headers):
+        self.group_matches = []     # (col, match key without rank suffixes, home, away)
+        self.knockout_matches = []  # (col, match key as written, home, away)
+        self.group_winners = []     # (col, group letter)
+        self.score_columns = []     # (col, match key, team) for 'France vs Morocco [France]'
+        for col, name in enumerate(headers):
+            if ' vs ' in name and name not in ('Timestamp', 'Your name'):
+                group_key = RANK_SUFFIX.sub('', name.strip())
+                teams = group_key.split(' vs ')
+                self.group_matches.append((col, group_key, *(teams if len(teams) == 2 else ('', ''))))
+                teams = name.split(' vs ')
+                self.knockout_matches.append((col, name, teams[0], teams[1] if len(teams) > 1 else ''))
+            score = SCORE_COLUMN.match(name)
+            if score:
+                self.score_columns.append((col, score.group(1).strip(), score.group(2).strip()))
+            winner = GROUP_WINNER_COLUMN.match(name)
+            if winner:
+                self.group_winners.append((col, winner.group(1).upper()))
+
+@lru_cache(maxsize=64)
+def form_schema(headers):
+    """FormSchema for a header tuple (shared by every row of the tab)"""
+    return FormSchema(headers)
+
+def form_row(form_entry):
+    """(schema, row) for one participant's submission from WCSheetsService.get_all_picks"""
+    return form_schema(tuple(form_entry['headers'])), form_entry['row']
+
+@lru_cache(maxsize=256)
+def form_dependencies(schema, form_num):
+    """The results a form's score depends on, as result_dependencies() keys"""
+    kind = WORLD_CUP_2026.form_kind(form_num)
+    if kind == 'group_result':
+        return frozenset(('group', match_key, form_num) for _, match_key, _, _ in schema.group_matches)
+    if kind == 'group_winner':
+        return frozenset(('winner', group) for _, group in schema.group_winners)
+    if kind == 'knockout_result':
+        return frozenset(('knockout', match_key) for _, match_key, _, _ in schema.knockout_matches)
+    if kind == 'knockout_score':
+        return frozenset(('knockout', match_key) for _, match_key, _ in schema.score_columns)
+    return frozenset()
+
+def result_dependencies(results, group_winners):
+    """{dependency: value} for every logged result and group winner"""
+    dependencies = {('winner', group): team for group, team in group_winners.items()}
+    for (match_key, matchday), result in results['group'].items():
+        dependencies[('group', match_key, matchday)] = (result.get('home_score'), result.get('away_score'))
+    for match_key, result in results['knockout'].items():
+        dependencies[('knockout', match_key)] = (result.get('home_score'), result.get('away_score'))
+    return dependencies
+
+def index_results(all_results):
+    """Index logged results once per leaderboard build.
+
+    'group' is keyed by (match_key, matchday) and 'knockout' by match_key;
+    both keep the latest entry, so a result re-entered with 'wc result'
+    corrects the earlier one. A group fixture is recognised from
+    GROUP_FIXTURES whatever its team order, and filed under the key its
+    form column uses. A row stamped 'knockout' is only treated that way
+    (as an old row logged the wrong way round) while the fixture has no
+    group result yet; after that it is a knockout rematch of the two teams.
+    """
+    group = {}
+    knockout = {}
+    for result in all_results:
+        match_key = result.get('match_key') or ''
+        fixture = GROUP_FIXTURES.get(match_pair(match_key))
+        if fixture:
+            home, away, matchday = fixture
+            group_key = (f"{home} vs {away}", matchday)
+            if result.get('stage') != 'knockout' or group_key not in group:
+                if match_key.split(' vs ')[0].strip() != home:
+                    result = dict(result, match_key=f"{home} vs {away}",
+                                  home_score=result.get('away_score'), away_score=result.get('home_score'))
+                group[group_key] = result
+                continue
+        else:
+            group[(match_key, result.get('matchday'))] = result
+        if result.get('stage') == 'knockout':
+            knockout[match_key] = result
+    return {'group': group, 'knockout': knockout}
 
 class WCScoringService:
     def __init__(self, sheets_service):
         self.sheets_service = sheets_service
-        self._leaderboard_cache = None
-        self._cached_result_count = -1
-
-    def invalidate_cache(self):
-        self._leaderboard_cache = None
-        self._cached_result_count = -1
+        self.competition = WORLD_CUP_2026
+        self.score_cache = ScoreCache()     # {(participant, form_num): score}
 
     def strip_rank(self, team_name):
         """Strip ranking suffix from team names, e.g. 'England (#4)' -> 'England'"""
-        return re.sub(r' \(#\d+\)', '', team_name.strip())
+        return RANK_SUFFIX.sub('', team_name.strip())
+
+    def _score_form(self, form_num, form_entry, results, group_winners):
+        kind = self.competition.form_kind(form_num)
+        if kind == 'group_result':
+            return self._score_group_stage_picks(form_entry, results, form_num)
+        if kind == 'group_winner':
+            return self._score_group_winner_picks(form_entry, group_winners)
+        if kind == 'knockout_result':
+            return self._score_r32_picks(form_entry, results)
+        if kind == 'knockout_score':
+            return self._score_qf_picks(form_entry, results)
+        return 0
+
+    def _refresh_form_scores(self, all_picks, results, group_winners):
+        """{(participant, form_num): score}, rescoring only what changed.
+
+        A cached form score is reused while the participant's row is the same
+        and none of the results it depends on (form_dependencies) was added
+        or edited since it was computed, so a new result rescores only the
+        forms containing that match.
+        """
+        items = []
+        for normalized_name, player_data in all_picks.items():
+            for form_num, form_entry in player_data['forms'].items():
+                schema, row = form_row(form_entry)
+                items.append(((normalized_name, form_num), (schema, row), form_dependencies(schema, form_num)))
+
+        def score(key):
+            normalized_name, form_num = key
+            return self._score_form(form_num, all_picks[normalized_name]['forms'][form_num], results, group_winners)
+
+        return self.score_cache.refresh(items, result_dependencies(results, group_winners), score)
+
+    def player_totals(self):
+        """(all_picks, indexed results, {participant: total points}, all_results), or None with no picks"""
+        all_results = self.sheets_service.get_all_results()
+        all_picks = self.sheets_service.get_all_picks()
+        bonus_ledger = self.sheets_service.get_bonus_ledger()
+        group_winners = self.sheets_service.get_group_winners()
+
+        if not all_picks:
+            return None
+
+        results = index_results(all_results)
+        form_scores = self._refresh_form_scores(all_picks, results, group_winners)
+
+        totals = {}
+        for normalized_name, player_data in all_picks.items():
+            total_score = sum(form_scores[(normalized_name, form_num)] for form_num in player_data['forms'])
+            totals[normalized_name] = total_score + bonus_ledger.get(normalized_name, (0, []))[0]
+        return all_picks, results, totals, all_results
 
     def calculate_leaderboard(self):
         """Calculate current leaderboard based on available results"""
         try:
-            all_results = self.sheets_service.get_all_results()
-            total_results = len(all_results)
-
-            if self._leaderboard_cache is not None and total_results == self._cached_result_count:
-                return self._leaderboard_cache
-
-            all_picks = self.sheets_service.get_all_picks()
-            all_bonus = self.sheets_service.get_all_bonus_awards()
-            group_winners = self.sheets_service.get_group_winners()
-
-            if not all_picks:
+            standing = self.player_totals()
+            if standing is None:
                 return "No picks found yet."
+            all_picks, _, totals, all_results = standing
 
-            # Calculate scores for each player
-            player_scores = {}
-
-            for normalized_name, player_data in all_picks.items():
-                display_name = player_data['display_name']
-                total_score = 0
-
-                # Score group stage matches from Forms 1, 2, 3
-                for form_num in [1, 2, 3]:
-                    if form_num in player_data['forms']:
-                        form_picks = player_data['forms'][form_num]['picks']
-                        total_score += self._score_group_stage_picks(form_picks, all_results, form_num)
-
-                # Score group winner picks from Form 4
-                if 4 in player_data['forms']:
-                    total_score += self._score_group_winner_picks(
-                        player_data['forms'][4]['picks'], group_winners
-                    )
-
-                # Score R32 picks from Forms 5, 6, 7
-                for form_num in [5, 6, 7]:
-                    if form_num in player_data['forms']:
-                        total_score += self._score_r32_picks(
-                            player_data['forms'][form_num]['picks'], all_results
-                        )
-
-                # Score QF/SF/Final score picks from Forms 8+
-                for form_num in [8, 9, 10]:
-                    if form_num in player_data['forms']:
-                        total_score += self._score_qf_picks(
-                            player_data['forms'][form_num]['picks'], all_results
-                        )
-
-                # Add bonus points
-                for bonus_award in all_bonus:
-                    if self.sheets_service.normalize_name(bonus_award.get('player', '')) == normalized_name:
-                        total_score += float(bonus_award.get('points', 0) or 0)
-
-                player_scores[display_name] = total_score
+            player_scores = {
+                all_picks[normalized_name]['display_name']: total for normalized_name, total in totals.items()
+            }
 
             # Sort by score (descending)
             sorted_players = sorted(player_scores.items(), key=lambda x: x[1], reverse=True)
 
             latest_result = all_results[-1] if all_results else None
-            result = self._format_leaderboard(sorted_players, total_results, latest_result)
-
-            self._leaderboard_cache = result
-            self._cached_result_count = total_results
-            return result
+            return self._format_leaderboard(sorted_players, len(all_results), latest_result)
 
         except Exception as e:
             print(f"Error calculating leaderboard: {e}")
             return f"❌ Error calculating leaderboard: {str(e)}"
     
-    def _score_group_stage_picks(self, form_picks, all_results, form_num):
-        """Score group stage match predictions"""
-        total_points = 0
-        
-        # Get matchday for this form
-        if form_num == 1:
-            target_matchday = 1
-        elif form_num == 2:
-            target_matchday = 2
-        elif form_num == 3:
-            target_matchday = 3
-        else:
+    def _score_group_stage_picks(self, form_entry, results, form_num):
+        """Score group stage match predictions (results: index_results())"""
+        # Forms 1-3 are matchdays 1-3
+        if self.competition.form_kind(form_num) != 'group_result':
             return 0
         
-        # Check each match prediction
-        for column_name, pick in form_picks.items():
-            if ' vs ' not in column_name or column_name in ['Timestamp', 'Your name']:
+        rule = self.competition.rule('group_result')
+        schema, row = form_row(form_entry)
+        group_results = results['group']
+        total_points = 0
+        for col, match_key, home_team, away_team in schema.group_matches:
+            result = group_results.get((match_key, form_num))
+            if result is None:
                 continue
-                
-            # Extract teams from column name (remove rankings)
-            match_key = self.strip_rank(column_name)
-            
-            # Find corresponding result
-            for result in all_results:
-                if result.get('match_key') == match_key and result.get('matchday') == target_matchday:
-                    # Determine actual result
-                    home_score = result.get('home_score', 0)
-                    away_score = result.get('away_score', 0)
-                    
-                    # Get team names from match_key
-                    teams = match_key.split(' vs ')
-                    home_team = teams[0] if len(teams) == 2 else ''
-                    away_team = teams[1] if len(teams) == 2 else ''
-                    
-                    # Determine correct prediction format
-                    if home_score > away_score:
-                        correct_pick = home_team
-                    elif away_score > home_score:
-                        correct_pick = away_team
-                    else:
-                        correct_pick = 'Draw'
-                    
-                    # Award points for correct prediction
-                    if pick == correct_pick:
-                        total_points += 1
-                    
-                    break
-        
+            total_points += rule.points(row[col], home_team, away_team,
+                                        result.get('home_score', 0), result.get('away_score', 0))
         return total_points
     
-    def _score_group_winner_picks(self, form_picks, group_winners):
+    def _score_group_winner_picks(self, form_entry, group_winners):
         """Score group winner predictions from Form 4. 1pt for top seed, 3pt for upset."""
+        rule = self.competition.rule('group_winner')
+        schema, row = form_row(form_entry)
         total_points = 0
-        for column_name, pick in form_picks.items():
-            match = re.match(r'Group ([A-L]) Winner', column_name, re.IGNORECASE)
-            if not match or not pick:
-                continue
-            group = match.group(1).upper()
-            actual_winner = group_winners.get(group)
-            if not actual_winner:
-                continue
-            if self.strip_rank(pick) == actual_winner:
-                points = 1 if actual_winner == GROUP_TOP_SEEDS.get(group) else 3
-                total_points += points
+        for col, group in schema.group_winners:
+            total_points += rule.points(self.strip_rank(row[col]), group_winners.get(group), GROUP_TOP_SEEDS.get(group))
         return total_points
 
-    def _score_r32_picks(self, form_picks, all_results):
+    def _score_r32_picks(self, form_entry, results):
         """Score Round of 32 predictions. 1pt per correct pick."""
+        rule = self.competition.rule('knockout_result')
+        schema, row = form_row(form_entry)
+        knockout_results = results['knockout']
         total_points = 0
-        knockout_results = {
-            r['match_key']: r for r in all_results if r.get('stage') == 'knockout'
-        }
-        for column_name, pick in form_picks.items():
-            if ' vs ' not in column_name or not pick:
-                continue
-            result = knockout_results.get(column_name)
-            if not result:
+        for col, match_key, home_team, away_team in schema.knockout_matches:
+            pick = row[col]
+            result = knockout_results.get(match_key)
+            if not pick or not result:
                 continue
-            home_score = result.get('home_score', 0)
-            away_score = result.get('away_score', 0)
-            teams = column_name.split(' vs ')
-            if home_score > away_score:
-                correct_pick = teams[0]
-            elif away_score > home_score:
-                correct_pick = teams[1]
-            else:
-                correct_pick = 'Draw'
-            if pick == correct_pick:
-                total_points += 1
+            total_points += rule.points(pick, home_team, away_team,
+                                        result.get('home_score', 0), result.get('away_score', 0))
         return total_points
     
-    def _score_qf_picks(self, form_picks, all_results):
-        """Score QF+ predictions. 2pts exact score, 1pt correct result but wrong score.
-        Column format: 'France vs Morocco [France]' and 'France vs Morocco [Morocco]'"""
-        total_points = 0
-        knockout_results = {
-            r['match_key']: r for r in all_results if r.get('stage') == 'knockout'
-        }
-
-        # Collect both team scores per match
+    def predicted_scores(self, form_entry):
+        """{match_key: {team: predicted goals}} from a score form (QF, SF, Final)"""
+        schema, row = form_row(form_entry)
         match_scores = {}
-        for column_name, pick in form_picks.items():
-            m = re.match(r'^(.+? vs .+?) \[(.+?)\]\s*$', column_name)
-            if not m or pick == '' or pick is None:
+        for col, match_key, team in schema.score_columns:
+            pick = row[col]
+            if pick == '' or pick is None:
                 continue
-            match_key = m.group(1).strip()
-            team = m.group(2).strip()
-            if match_key not in match_scores:
-                match_scores[match_key] = {}
             try:
-                match_scores[match_key][team] = int(pick)
+                match_scores.setdefault(match_key, {})[team] = int(pick)
             except (ValueError, TypeError):
                 pass
+        return match_scores
 
-        for match_key, team_scores in match_scores.items():
+    def _score_qf_picks(self, form_entry, results):
+        """Score QF+ predictions. 2pts exact score, 1pt correct result but wrong score.
+        Column format: 'France vs Morocco [France]' and 'France vs Morocco [Morocco]'"""
+        rule = self.competition.rule('knockout_score')
+        total_points = 0
+        knockout_results = results['knockout']
+
+        for match_key, team_scores in self.predicted_scores(form_entry).items():
             result = knockout_results.get(match_key)
             if not result:
                 continue
@@ -211,15 +256,8 @@ class WCScoringService:
             pred_away = team_scores.get(away_team)
             if pred_home is None or pred_away is None:
                 continue
-            actual_home = int(result.get('home_score', 0))
-            actual_away = int(result.get('away_score', 0))
-
-            if pred_home == actual_home and pred_away == actual_away:
-                total_points += 2
-            elif (pred_home > pred_away and actual_home > actual_away) or \
-                 (pred_away > pred_home and actual_away > actual_home) or \
-                 (pred_home == pred_away and actual_home == actual_away):
-                total_points += 1
+            total_points += rule.points(pred_home, pred_away,
+                                        int(result.get('home_score', 0)), int(result.get('away_score', 0)))
 
         return total_points
 
@@ -257,15 +295,16 @@ class WCScoringService:
         try:
             all_picks = self.sheets_service.get_all_picks()
             all_results = self.sheets_service.get_all_results()
-            all_bonus = self.sheets_service.get_all_bonus_awards()
             group_winners = self.sheets_service.get_group_winners()
 
             if player_name:
                 normalized_target = self.sheets_service.normalize_name(player_name)
                 if normalized_target not in all_picks:
                     return f"Player '{player_name}' not found."
+                form_scores = self._refresh_form_scores(all_picks, index_results(all_results), group_winners)
                 return self._get_player_breakdown(
-                    all_picks[normalized_target], all_results, all_bonus, group_winners, normalized_target
+                    all_picks[normalized_target], form_scores, self.sheets_service.get_bonus_ledger(),
+                    normalized_target
                 )
             else:
                 return self.calculate_leaderboard()
@@ -274,53 +313,46 @@ class WCScoringService:
             print(f"Error getting detailed scores: {e}")
             return f"❌ Error getting scores: {str(e)}"
 
-    def _get_player_breakdown(self, player_data, all_results, all_bonus, group_winners, normalized_name):
-        """Get detailed score breakdown for a specific player"""
+    def _get_player_breakdown(self, player_data, form_scores, bonus_ledger, normalized_name):
+        """Get detailed score breakdown for a specific player (form_scores: _refresh_form_scores())"""
         display_name = player_data['display_name']
+        forms = player_data['forms']
         message = f"📊 DETAILED SCORES - {display_name.upper()}\n"
         message += "=" * 25 + "\n\n"
 
         total_score = 0
 
         for form_num in [1, 2, 3]:
-            if form_num in player_data['forms']:
-                form_picks = player_data['forms'][form_num]['picks']
-                form_score = self._score_group_stage_picks(form_picks, all_results, form_num)
+            if form_num in forms:
+                form_score = form_scores[(normalized_name, form_num)]
                 total_score += form_score
                 message += f"📋 MD{form_num} picks: {form_score} pts\n"
 
-        if 4 in player_data['forms']:
-            gw_score = self._score_group_winner_picks(player_data['forms'][4]['picks'], group_winners)
+        if 4 in forms:
+            gw_score = form_scores[(normalized_name, 4)]
             total_score += gw_score
             message += f"🏅 Group winners: {gw_score} pts\n"
 
         r32_score = 0
-        if 5 in player_data['forms'] or 6 in player_data['forms']:
+        if 5 in forms or 6 in forms:
             for form_num in [5, 6, 7]:
-                if form_num in player_data['forms']:
-                    r32_score += self._score_r32_picks(player_data['forms'][form_num]['picks'], all_results)
+                if form_num in forms:
+                    r32_score += form_scores[(normalized_name, form_num)]
             message += f"⚽ R32 picks: {r32_score} pts\n"
         else:
             message += f"⚽ R32 picks: form not found\n"
 
         total_score += r32_score
 
-        form_labels = {8: 'QF', 9: 'SF', 10: 'Final'}
         for form_num in [8, 9, 10]:
-            if form_num in player_data['forms']:
-                score = self._score_qf_picks(player_data['forms'][form_num]['picks'], all_results)
+            if form_num in forms:
+                score = form_scores[(normalized_name, form_num)]
                 total_score += score
-                label = form_labels.get(form_num, f'Form {form_num}')
+                label = KNOCKOUT_FORM_ROUNDS.get(form_num, f'Form {form_num}')
                 message += f"🎯 {label} scores: {score} pts\n"
 
-        bonus_total = 0
-        bonus_details = []
-        for bonus_award in all_bonus:
-            if self.sheets_service.normalize_name(bonus_award.get('player', '')) == normalized_name:
-                points = float(bonus_award.get('points', 0) or 0)
-                form = bonus_award.get('form', '')
-                bonus_total += points
-                bonus_details.append(f"Form {form}")
+        bonus_total, bonus_forms = bonus_ledger.get(normalized_name, (0, []))
+        bonus_details = [f"Form {form}" for form in bonus_forms]
 
         if bonus_total > 0:
             message += f"🎯 Bonus: {bonus_total} pts ({', '.join(bonus_details)})\n"
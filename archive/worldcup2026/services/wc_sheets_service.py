@@ -1,15 +1,38 @@
 from google.oauth2.service_account import Credentials
 import gspread
 import os
+import time
 from datetime import datetime
 from config.settings import SCOPES
-from config.wc_settings import WC_MASTER_SHEET_ID, FIFA_RANK, GROUP_TOP_SEEDS
+from config.wc_settings import WC_MASTER_SHEET_ID, FIFA_RANK, GROUP_TOP_SEEDS, GROUP_FIXTURES, match_pair
+from services.sheet_probe import DriveRevisionProbe
+from services.sheets_quota import ThrottledSpreadsheet, sheets_quota
+from services.sheets_service import records_from_values
+from services.wc_scoring_service import index_results
 import re
 
+FORM_TABS = [f'form{form_num}_picks' for form_num in range(1, 11)]
+WC_TABS = FORM_TABS + ['results', 'bonus', 'group_winners']
+TITLES_TTL = 600         # seconds before re-listing tabs (picks up a newly linked form)
+NAME_PREFIXES = ('your name', 'enter your name', 'first name', 'full name', 'name')
+
+
+def _grid_hash(values):
+    return hash(tuple(tuple(row) for row in values))
+
+
 class WCSheetsService:
-    def __init__(self):
+    def __init__(self, spreadsheet=None, probe=None, quota=None):
         self.master_sheet_id = WC_MASTER_SHEET_ID
-        self._spreadsheet = None
+        self.quota = quota or sheets_quota
+        # Injected backend (tests); otherwise opened lazily
+        self._spreadsheet = ThrottledSpreadsheet(spreadsheet, self.quota) if spreadsheet is not None else None
+        self.probe = probe or DriveRevisionProbe()
+        self._titles = None             # tab titles that exist
+        self._titles_listed_at = 0.0
+        self._values = None             # {tab: values grid} from the last batch read
+        self._values_token = None       # spreadsheet revision of that read
+        self._parsed = {}               # {(tab, parser): (values grid, row count, grid hash, parsed)}
     
     def get_google_sheet(self):
         """Initialize Google Sheets connection"""
@@ -29,11 +52,72 @@ class WCSheetsService:
             }, scopes=SCOPES)
             
             gc = gspread.authorize(creds)
-            self._spreadsheet = gc.open_by_key(self.master_sheet_id)
+            self._spreadsheet = ThrottledSpreadsheet(gc.open_by_key(self.master_sheet_id), self.quota)
             return self._spreadsheet
         except Exception as e:
             print(f"Error connecting to Google Sheets: {e}")
             return None
+
+    def _read_tabs(self):
+        """Values of every WC tab that exists, from a single values_batch_get.
+
+        Reused without any Sheets call while the spreadsheet's Drive revision
+        is unchanged (the probe re-asks Drive at most every few seconds).
+        """
+        sheet = self.get_google_sheet()
+        if not sheet:
+            return {}
+        token = self.probe.token(sheet)
+        if self._values is not None and token is not None and token == self._values_token:
+            return self._values
+
+        now = time.monotonic()
+        if self._titles is None or (now - self._titles_listed_at) > TITLES_TTL:
+            self._titles = {worksheet.title for worksheet in sheet.worksheets()}
+            self._titles_listed_at = now
+        titles = [title for title in WC_TABS if title in self._titles]
+        response = sheet.values_batch_get([f"'{title}'" for title in titles])
+        self._values = {
+            title: value_range.get('values', [])
+            for title, value_range in zip(titles, response.get('valueRanges', []))
+        }
+        self._values_token = token
+        return self._values
+
+    def _parsed_tab(self, title, parse, extend=None):
+        """parse(values) for a tab, redone only when the tab's values change.
+
+        A batch read only happens after the Drive revision changes, and any
+        cell may have changed with it: admins correct results by hand and
+        Google Forms edits responses in place. So the whole grid is hashed and
+        compared. With `extend` (only for tabs the bot alone appends to),
+        rows added below unchanged cached rows are folded in with
+        extend(parsed, values, first new row) instead of a full parse.
+        Returns None if the tab doesn't exist.
+        """
+        values = self._read_tabs().get(title)
+        if values is None:
+            return None
+        key = (title, parse.__name__)
+        cached = self._parsed.get(key)
+        if cached and cached[0] is values:
+            return cached[3]
+
+        digest = _grid_hash(values)
+        if cached and cached[1] == len(values) and cached[2] == digest:
+            parsed = cached[3]
+        elif cached and extend is not None and 1 < cached[1] < len(values) \
+                and _grid_hash(values[:cached[1]]) == cached[2]:
+            parsed = extend(cached[3], values, cached[1])
+        else:
+            parsed = parse(values)
+        self._parsed[key] = (values, len(values), digest, parsed)
+        return parsed
+
+    def _invalidate(self):
+        """Forget the last batch read after this process writes"""
+        self._values = None
+        self.probe.reset()
     
     def setup_master_sheet_connection(self):
         """Test connection to master sheet on startup"""
@@ -77,6 +161,7 @@ class WCSheetsService:
             ]
             
             results_sheet.append_row(row_data)
+            self._invalidate()
             return True, f"Result logged: {match_key}"
             
         except Exception as e:
@@ -91,76 +176,70 @@ class WCSheetsService:
                 return False, "Could not connect to sheet"
             
             bonus_sheet = sheet.worksheet('bonus')
-            awarded_to = []
+            awarded_at = datetime.now().isoformat()
             
-            for player_name in player_names:
-                normalized_player = self.normalize_name(player_name)
-                
-                # Add bonus row
-                row_data = [
-                    form_num,
-                    normalized_player,
-                    points,
-                    datetime.now().isoformat()
-                ]
-                
-                bonus_sheet.append_row(row_data)
-                awarded_to.append(player_name.title())
+            # One row per player, written in a single call
+            rows = [
+                [form_num, self.normalize_name(player_name), points, awarded_at]
+                for player_name in player_names
+            ]
+            awarded_to = [player_name.title() for player_name in player_names]
             
+            bonus_sheet.append_rows(rows)
+            self._invalidate()
             return True, f"Bonus points awarded to: {', '.join(awarded_to)}"
             
         except Exception as e:
             print(f"Error awarding bonus points: {e}")
             return False, str(e)
     
+    def _parse_form(self, values):
+        """(headers, [(normalized name, name, timestamp, row)]) for one form response tab"""
+        if not values:
+            return [], []
+        # Column positions are the same for every row: find them once
+        headers = values[0]
+        timestamp_col = headers.index('Timestamp') if 'Timestamp' in headers else None
+        name_cols = [i for i, key in enumerate(headers) if key.lower().startswith(NAME_PREFIXES)]
+        
+        submissions = []
+        for row in values[1:]:
+            row = row + [''] * (len(headers) - len(row))
+            timestamp = row[timestamp_col] if timestamp_col is not None else ''
+            if not timestamp:
+                continue
+            name = next((row[i].strip() for i in name_cols if row[i].strip()), '')
+            if name:
+                submissions.append((self.normalize_name(name), name, timestamp, row))
+        return headers, submissions
+    
     def get_all_picks(self):
         """Get all picks from all form response tabs"""
         try:
-            sheet = self.get_google_sheet()
-            if not sheet:
-                return {}
-            
             all_picks = {}
             
-            for form_num in [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]:
-                tab_name = f'form{form_num}_picks'
-                try:
-                    form_sheet = sheet.worksheet(tab_name)
-                    records = form_sheet.get_all_records()
-                    
-                    for record in records:
-                        if not record.get('Timestamp'):
-                            continue
-
-                        name = ''
-                        for key in record.keys():
-                            if key.lower().startswith(('your name', 'enter your name', 'first name', 'full name', 'name')):
-                                name = record[key].strip()
-                                if name:
-                                    break
-                        if not name:
-                            continue
-                            
-                        normalized_name = self.normalize_name(name)
-                        timestamp = record.get('Timestamp', '')
-                        
-                        if normalized_name not in all_picks:
-                            all_picks[normalized_name] = {
-                                'display_name': name.title(),
-                                'forms': {}
-                            }
-                        
-                        # Only keep latest submission per form
-                        if form_num not in all_picks[normalized_name]['forms'] or \
-                           timestamp > all_picks[normalized_name]['forms'][form_num].get('timestamp', ''):
-                            all_picks[normalized_name]['forms'][form_num] = {
-                                'timestamp': timestamp,
-                                'picks': record
-                            }
-                
-                except Exception as e:
-                    print(f"Error reading {tab_name}: {e}")
+            for form_num, tab_name in enumerate(FORM_TABS, start=1):
+                parsed = self._parsed_tab(tab_name, self._parse_form)
+                if parsed is None:
                     continue
+                headers, submissions = parsed
+                
+                for normalized_name, name, timestamp, row in submissions:
+                    if normalized_name not in all_picks:
+                        all_picks[normalized_name] = {
+                            'display_name': name.title(),
+                            'forms': {}
+                        }
+                    
+                    # Only keep latest submission per form
+                    if form_num not in all_picks[normalized_name]['forms'] or \
+                       timestamp > all_picks[normalized_name]['forms'][form_num].get('timestamp', ''):
+                        # Scoring walks `row` by column position (see wc_scoring_service.FormSchema)
+                        all_picks[normalized_name]['forms'][form_num] = {
+                            'timestamp': timestamp,
+                            'headers': headers,
+                            'row': row
+                        }
             
             return all_picks
             
@@ -171,13 +250,7 @@ class WCSheetsService:
     def get_all_results(self):
         """Get all logged results"""
         try:
-            sheet = self.get_google_sheet()
-            if not sheet:
-                return []
-            
-            results_sheet = sheet.worksheet('results')
-            return results_sheet.get_all_records()
-            
+            return self._parsed_tab('results', records_from_values) or []
         except Exception as e:
             print(f"Error getting results: {e}")
             return []
@@ -185,17 +258,32 @@ class WCSheetsService:
     def get_all_bonus_awards(self):
         """Get all bonus point awards"""
         try:
-            sheet = self.get_google_sheet()
-            if not sheet:
-                return []
-            
-            bonus_sheet = sheet.worksheet('bonus')
-            return bonus_sheet.get_all_records()
-            
+            return self._parsed_tab('bonus', records_from_values) or []
         except Exception as e:
             print(f"Error getting bonus awards: {e}")
             return []
     
+    def _bonus_ledger(self, values, ledger=None, start=1):
+        """Fold bonus rows values[start:] into {normalized name: (total points, [forms])}"""
+        ledger = {} if ledger is None else ledger
+        for award in records_from_values(values[:1] + values[start:]):
+            name = self.normalize_name(str(award.get('player', '')))
+            total, forms = ledger.get(name, (0, []))
+            ledger[name] = (total + float(award.get('points', 0) or 0), forms + [award.get('form', '')])
+        return ledger
+    
+    def get_bonus_ledger(self):
+        """Bonus awards aggregated per participant: {normalized name: (total points, [forms])}"""
+        try:
+            ledger = self._parsed_tab(
+                'bonus', self._bonus_ledger,
+                extend=lambda ledger, values, start: self._bonus_ledger(values, ledger, start)
+            )
+            return ledger or {}
+        except Exception as e:
+            print(f"Error getting bonus ledger: {e}")
+            return {}
+    
     def log_group_winner(self, group, team):
         """Log a group stage winner"""
         try:
@@ -204,6 +292,7 @@ class WCSheetsService:
                 return False, "Could not connect to sheet"
             winners_sheet = sheet.worksheet('group_winners')
             winners_sheet.append_row([group.upper(), team, datetime.now().isoformat()])
+            self._invalidate()
             return True, f"Group {group.upper()} winner logged: {team}"
         except Exception as e:
             print(f"Error logging group winner: {e}")
@@ -212,11 +301,7 @@ class WCSheetsService:
     def get_group_winners(self):
         """Get all logged group winners, returning latest entry per group"""
         try:
-            sheet = self.get_google_sheet()
-            if not sheet:
-                return {}
-            winners_sheet = sheet.worksheet('group_winners')
-            records = winners_sheet.get_all_records()
+            records = self._parsed_tab('group_winners', records_from_values) or []
             winners = {}
             for record in records:
                 group = record.get('group', '').upper()
@@ -229,50 +314,17 @@ class WCSheetsService:
             return {}
 
     def determine_match_stage_and_matchday(self, match_key):
-        """Determine stage and matchday for a given match"""
-        # For now, assume all matches are group stage
-        # This can be enhanced later for knockout stages
-        
-        # Group stage fixtures mapping
-        md1_fixtures = [
-            'Mexico vs South Africa', 'South Korea vs Czechia', 'Canada vs Bosnia & Herzegovina',
-            'Qatar vs Switzerland', 'Brazil vs Morocco', 'Haiti vs Scotland', 'USA vs Paraguay',
-            'Australia vs Turkey', 'Germany vs Curacao', 'Ivory Coast vs Ecuador',
-            'Netherlands vs Japan', 'Sweden vs Tunisia', 'Belgium vs Egypt',
-            'Iran vs New Zealand', 'Spain vs Cape Verde', 'Saudi Arabia vs Uruguay',
-            'France vs Senegal', 'Iraq vs Norway', 'Argentina vs Algeria',
-            'Austria vs Jordan', 'Portugal vs DR Congo', 'Uzbekistan vs Colombia',
-            'England vs Croatia', 'Ghana vs Panama'
-        ]
-        
-        md2_fixtures = [
-            'Czechia vs South Africa', 'Mexico vs South Korea', 'Switzerland vs Bosnia & Herzegovina',
-            'Canada vs Qatar', 'Scotland vs Morocco', 'Brazil vs Haiti', 'USA vs Australia',
-            'Turkey vs Paraguay', 'Germany vs Ivory Coast', 'Ecuador vs Curacao',
-            'Netherlands vs Sweden', 'Tunisia vs Japan', 'Belgium vs Iran',
-            'New Zealand vs Egypt', 'Spain vs Saudi Arabia', 'Uruguay vs Cape Verde',
-            'France vs Iraq', 'Norway vs Senegal', 'Argentina vs Austria',
-            'Jordan vs Algeria', 'Portugal vs Uzbekistan', 'Colombia vs DR Congo',
-            'England vs Ghana', 'Panama vs Croatia'
-        ]
-        
-        md3_fixtures = [
-            'Czechia vs Mexico', 'South Africa vs South Korea', 'Switzerland vs Canada',
-            'Bosnia & Herzegovina vs Qatar', 'Scotland vs Brazil', 'Morocco vs Haiti',
-            'Turkey vs USA', 'Paraguay vs Australia', 'Ecuador vs Germany',
-            'Curacao vs Ivory Coast', 'Japan vs Sweden', 'Tunisia vs Netherlands',
-            'Egypt vs Iran', 'New Zealand vs Belgium', 'Cape Verde vs Saudi Arabia',
-            'Uruguay vs Spain', 'Norway vs France', 'Senegal vs Iraq',
-            'Algeria vs Austria', 'Jordan vs Argentina', 'Colombia vs Portugal',
-            'DR Congo vs Uzbekistan', 'Panama vs England', 'Croatia vs Ghana'
-        ]
-        
-        if match_key in md1_fixtures:
-            return 'group', 1
-        elif match_key in md2_fixtures:
-            return 'group', 2
-        elif match_key in md3_fixtures:
-            return 'group', 3
-        else:
-            # Assume knockout if not found in group stage
-            return 'knockout', None
\ No newline at end of file
+        """Determine stage and matchday for a given match, in either team order.
+
+        A group fixture that already has a result is a correction until the
+        knockout stage has started (any knockout result is logged); after
+        that the two teams are meeting again in a knockout round.
+        """
+        fixture = GROUP_FIXTURES.get(match_pair(match_key))
+        if fixture:
+            home, away, matchday = fixture
+            results = index_results(self.get_all_results())
+            if (f"{home} vs {away}", matchday) not in results['group'] or not results['knockout']:
+                return 'group', matchday
+        # Not a group fixture, or a knockout rematch of one
+        return 'knockout', None
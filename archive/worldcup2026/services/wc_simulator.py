@@ -0,0 +1,201 @@
+"""'Can I still win?' for the World Cup game: plays out the remaining matches.
+
+Every match with no logged result that someone has picked becomes a table
+of the points each participant gets for each possible outcome, built with
+the same rules the leaderboard scores with (services.competition.WORLD_CUP_2026).
+Scenarios are then all combinations of outcomes when there are few enough,
+otherwise Monte-Carlo samples, and NumPy adds the tables up for every
+scenario at once.
+
+NumPy is pinned in requirements.txt; if it is missing only 'wc whatif'
+is unavailable.
+"""
+from math import exp, factorial, prod
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from services.competition import WORLD_CUP_2026
+from services.wc_scoring_service import form_row
+
+SCENARIOS = 100_000        # scenarios sampled when there are too many to enumerate
+MAX_GOALS = 5              # scorelines simulated up to 5-5
+GOALS_PER_TEAM = 1.3       # Poisson mean for one team's goals in a match
+RANK_CHUNK = 4096          # scenarios ranked per step (bounds the scenario x player x player array)
+OUTCOMES = [(1, 0), (0, 0), (0, 1)]    # home win, draw, away win: for matches only picked by result
+
+def _goal_probabilities():
+    weights = [exp(-GOALS_PER_TEAM) * GOALS_PER_TEAM ** goals / factorial(goals) for goals in range(MAX_GOALS + 1)]
+    return [weight / sum(weights) for weight in weights]
+
+def remaining_matches(all_picks, results):
+    """{match id: {'teams': (home, away), 'picks': [(participant, rule, pick)]}} for unplayed picked matches.
+
+    rule is 'outcome' (a team or 'Draw': group and R32 forms) or 'score'
+    (predicted (home, away) goals: QF, SF and Final forms).
+    """
+    matches = {}
+
+    def add(match_id, home, away, participant, rule, pick):
+        match = matches.setdefault(match_id, {'teams': (home, away), 'picks': []})
+        match['picks'].append((participant, rule, pick))
+
+    for participant, player_data in enumerate(all_picks.values()):
+        for form_num, form_entry in player_data['forms'].items():
+            schema, row = form_row(form_entry)
+            kind = WORLD_CUP_2026.form_kind(form_num)
+            if kind == 'group_result':
+                for col, match_key, home, away in schema.group_matches:
+                    if (match_key, form_num) not in results['group'] and row[col]:
+                        add(('group', match_key, form_num), home, away, participant, 'outcome', row[col])
+            elif kind == 'knockout_result':
+                for col, match_key, home, away in schema.knockout_matches:
+                    if match_key not in results['knockout'] and row[col]:
+                        add(('knockout', match_key), home, away, participant, 'outcome', row[col])
+            elif kind == 'knockout_score':
+                for col, match_key, team in schema.score_columns:
+                    teams = [t.strip() for t in match_key.split(' vs ')]
+                    if match_key in results['knockout'] or len(teams) != 2:
+                        continue
+                    try:
+                        goals = int(row[col])
+                    except (ValueError, TypeError):
+                        continue
+                    match = matches.setdefault(('knockout', match_key), {'teams': tuple(teams), 'picks': []})
+                    match.setdefault('scores', {}).setdefault(participant, {})[team] = goals
+
+    # A score pick counts once both of its teams' goals were filled in
+    for match in matches.values():
+        home, away = match['teams']
+        for participant, goals in match.pop('scores', {}).items():
+            if home in goals and away in goals:
+                match['picks'].append((participant, 'score', (goals[home], goals[away])))
+    return {match_id: match for match_id, match in matches.items() if match['picks']}
+
+class WhatIf:
+    """Remaining matches as outcome x participant points tables, over current totals"""
+
+    def __init__(self, names, totals, matches):
+        self.names = names
+        self.base = np.array(totals, dtype=float)
+        self.tables = []
+        self.probabilities = []
+        goal_probabilities = _goal_probabilities()
+        for match_id, match in matches.items():
+            home, away = match['teams']
+            if any(rule == 'score' for _, rule, _ in match['picks']):
+                outcomes = [(h, a) for h in range(MAX_GOALS + 1) for a in range(MAX_GOALS + 1)]
+                probabilities = [goal_probabilities[h] * goal_probabilities[a] for h, a in outcomes]
+            else:
+                outcomes = OUTCOMES
+                probabilities = [1 / len(OUTCOMES)] * len(OUTCOMES)
+            table = np.zeros((len(outcomes), len(names)))
+            kinds = {'score': 'knockout_score', 'outcome': 'group_result' if match_id[0] == 'group' else 'knockout_result'}
+            for row, (home_score, away_score) in enumerate(outcomes):
+                for participant, rule, pick in match['picks']:
+                    points = WORLD_CUP_2026.rule(kinds[rule]).points
+                    if rule == 'score':
+                        table[row, participant] += points(pick[0], pick[1], home_score, away_score)
+                    else:
+                        table[row, participant] += points(pick, home, away, home_score, away_score)
+            self.tables.append(table)
+            self.probabilities.append(np.array(probabilities))
+
+    def scenario_count(self):
+        return prod(len(table) for table in self.tables)
+
+    def max_totals(self):
+        """Highest total each participant can still reach"""
+        return self.base + sum((table.max(axis=0) for table in self.tables), np.zeros(len(self.names)))
+
+    def leads_best_case(self, participant):
+        """Does the participant come first when every match goes their way?
+
+        Per match the outcome worth most to them, ties going to the one that
+        helps their closest rival least; rivals score what that same outcome
+        gives them.
+        """
+        totals = self.base.copy()
+        others = np.arange(len(self.names)) != participant
+        for table in self.tables:
+            mine = table[:, participant]
+            candidates = np.flatnonzero(mine == mine.max())
+            if others.any():
+                row = candidates[np.argmin(table[candidates][:, others].max(axis=1))]
+            else:
+                row = candidates[0]
+            totals += table[row]
+        return not others.any() or totals[participant] >= totals[others].max()
+
+    def _scenarios(self, scenarios, seed):
+        """(outcome index per scenario and match, scenario weights, exhaustive?)"""
+        if self.scenario_count() <= scenarios:
+            shape = [len(table) for table in self.tables]
+            outcomes = np.indices(shape).reshape(len(shape), -1).T
+            weights = np.ones(len(outcomes))
+            for match, probabilities in enumerate(self.probabilities):
+                weights *= probabilities[outcomes[:, match]]
+            return outcomes, weights, True
+        rng = np.random.default_rng(seed)
+        outcomes = np.column_stack([
+            rng.choice(len(probabilities), size=scenarios, p=probabilities) for probabilities in self.probabilities
+        ])
+        return outcomes, np.full(scenarios, 1 / scenarios), False
+
+    def run(self, scenarios=SCENARIOS, seed=None):
+        """({participant name: {'win', 'best', 'worst', 'max', 'alive'}}, scenarios played, exhaustive?)
+
+        'alive' is exact when every outcome was played: some scenario puts
+        the participant first. When sampling, it is also true if their own
+        best case (leads_best_case) does. 'best' and 'worst' are over the
+        scenarios played.
+        """
+        outcomes, weights, exhaustive = self._scenarios(scenarios, seed)
+        totals = np.tile(self.base, (len(outcomes), 1))
+        for match, table in enumerate(self.tables):
+            totals += table[outcomes[:, match]]
+
+        count = len(self.names)
+        wins = np.zeros(count)
+        best = np.full(count, count)
+        worst = np.ones(count, dtype=int)
+        for start in range(0, len(totals), RANK_CHUNK):
+            chunk = totals[start:start + RANK_CHUNK]
+            # Competition ranking: 1 + players strictly ahead
+            ranks = 1 + (chunk[:, None, :] > chunk[:, :, None]).sum(axis=2)
+            leaders = ranks == 1
+            # A shared first place splits the win
+            wins += (leaders / leaders.sum(axis=1, keepdims=True) * weights[start:start + RANK_CHUNK, None]).sum(axis=0)
+            best = np.minimum(best, ranks.min(axis=0))
+            worst = np.maximum(worst, ranks.max(axis=0))
+
+        max_totals = self.max_totals()
+        report = {}
+        for i, name in enumerate(self.names):
+            alive = best[i] == 1 or (not exhaustive and self.leads_best_case(i))
+            report[name] = {
+                'win': float(wins[i] / weights.sum()), 'best': int(best[i]), 'worst': int(worst[i]),
+                'max': float(max_totals[i]), 'alive': bool(alive),
+            }
+        return report, len(outcomes), exhaustive
+
+def format_whatif(report, played, exhaustive):
+    """WhatsApp text for WhatIf.run()"""
+    how = f"all {played:,} outcomes" if exhaustive else f"{played:,} simulated tournaments"
+    message = f"🔮 WC 2026 - CAN I STILL WIN?\n({how})\n"
+    message += "=" * 25 + "\n\n"
+    ranked = sorted(report.items(), key=lambda item: (-item[1]['win'], -item[1]['max'], item[0]))
+    for name, outcome in ranked:
+        first_name = name.split()[0] if name else name
+        max_points = int(outcome['max']) if outcome['max'].is_integer() else round(outcome['max'], 1)
+        if not outcome['alive']:
+            chance = "out"
+        elif outcome['win'] >= 0.001:
+            chance = f"{outcome['win']:.1%}"
+        else:
+            chance = "<0.1%"
+        ranks = f"#{outcome['best']}" if outcome['best'] == outcome['worst'] else f"#{outcome['best']}-{outcome['worst']}"
+        message += f"{first_name}  —  {chance} (max {max_points} pts, {ranks})\n"
+    return message
@@ -0,0 +1,59 @@
+from difflib import SequenceMatcher
+from functools import lru_cache
+from config.wc_settings import TEAM_ABBREVIATIONS, FIFA_RANK
+
+FUZZY_THRESHOLD = 70     # % similarity for a typo to resolve ('Croatai' -> 'Croatia')
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TeamResolver:
+    """Team names from admin input ('ENG', 'england', 'Croatai'), indexed once.
+
+    Abbreviations and full names are exact dict lookups. Typos are only
+    compared with the teams sharing a trigram or the first three letters,
+    scored the way fuzz.ratio does without python-Levenshtein (difflib),
+    and recent inputs are remembered.
+    """
+
+    def __init__(self, teams, abbreviations):
+        self.teams = list(teams)
+        self._exact = {team.lower(): team for team in self.teams}
+        # Abbreviations win over full names, as they were checked first
+        self._exact.update({abbr.lower(): team for abbr, team in abbreviations.items()})
+        self._abbreviations = {team: abbr for abbr, team in abbreviations.items()}
+        self._by_trigram = {}
+        self._by_prefix = {}
+        for position, team in enumerate(self.teams):
+            for trigram in _trigrams(team.lower()):
+                self._by_trigram.setdefault(trigram, set()).add(position)
+            self._by_prefix.setdefault(team.lower()[:3], set()).add(position)
+        self.resolve = lru_cache(maxsize=256)(self._resolve)
+
+    def _resolve(self, team_input):
+        """Team name for an input, or None"""
+        key = team_input.strip().lower()
+        if key in self._exact:
+            return self._exact[key]
+
+        candidates = set(self._by_prefix.get(key[:3], ()))
+        for trigram in _trigrams(key):
+            candidates |= self._by_trigram.get(trigram, set())
+
+        # Best score wins; ties go to the team listed first
+        best_match = None
+        best_score = 0
+        for position in sorted(candidates):
+            team = self.teams[position]
+            score = round(100 * SequenceMatcher(None, key, team.lower()).ratio())
+            if score > best_score and score >= FUZZY_THRESHOLD:
+                best_score = score
+                best_match = team
+        return best_match
+
+    def abbreviation(self, team):
+        """'England' -> 'ENG' (first three letters for a team without one)"""
+        return self._abbreviations.get(team, team[:3].upper())
+
+team_resolver = TeamResolver(FIFA_RANK, TEAM_ABBREVIATIONS)
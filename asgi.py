@@ -0,0 +1,178 @@
+"""Optional ASGI entry point: `uvicorn asgi:app` (needs `pip install httpx uvicorn`).
+
+Same routes and replies as app.py (`gunicorn app:app` stays the default).
+Network reads a command depends on are done on the event loop with one
+shared httpx.AsyncClient, concurrently:
+
+    fixtures                        FPL bootstrap-static + fixtures
+    leaderboard, weights            picks + Player Scores in one Sheets batchGet,
+                                    with the Drive revision alongside
+
+and stored in the services' caches. The unchanged Flask handler then runs
+on a small thread pool (ASGI_THREADS) where it only renders. Outgoing
+WhatsApp messages go through the Twilio REST API from the event loop.
+Run a single worker, as with gunicorn: the scheduler lives in app.py.
+"""
+import asyncio
+import io
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import app as bot
+from config.settings import ASGI_THREADS
+from services.async_clients import AsyncFplReader, AsyncOutbound, AsyncSheetsReader
+from services.sheets_service import service_account_credentials
+from utils.date_utils import get_current_gameweek
+from utils.text_utils import command_name
+
+logger = logging.getLogger(__name__)
+
+SHEETS_WARM_COMMANDS = {'leaderboard', 'leaderboard_detail', 'weights'}
+
+
+def wsgi_environ(scope, body):
+    """Minimal PEP 3333 environ for an ASGI http scope"""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        key = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if key in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[key] = value
+        else:
+            environ[f'HTTP_{key}'] = f"{environ[f'HTTP_{key}']},{value}" if f'HTTP_{key}' in environ else value
+    return environ
+
+
+def call_wsgi(wsgi_app, environ):
+    """Run a WSGI app to completion; returns (status code, [(name, value)], body bytes)"""
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = headers
+
+    result = wsgi_app(environ, start_response)
+    try:
+        body = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return started['status'], started['headers'], body
+
+
+class AsyncBot:
+    """ASGI application wrapping the Flask app's services"""
+
+    def __init__(self, bot_module=bot, client=None, threads=ASGI_THREADS):
+        self.bot = bot_module
+        self.client = client
+        self._own_client = client is None
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='asgi-command')
+        self.fpl = None
+        self.sheets = None
+        self.outbound = None
+        self._started = False
+
+    async def startup(self):
+        if self._started:
+            return
+        self._started = True
+        if self.client is None:
+            import httpx
+            self.client = httpx.AsyncClient(limits=httpx.Limits(max_connections=20, max_keepalive_connections=10))
+
+        self.fpl = AsyncFplReader(self.client, self.bot.fixture_service)
+        try:
+            credentials = service_account_credentials()
+        except KeyError:
+            credentials = None    # no Google credentials (tests, benchmarks): commands read synchronously
+        if credentials is not None:
+            self.sheets = AsyncSheetsReader(self.client, self.bot.sheets_service, credentials)
+        self.outbound = AsyncOutbound(self.client, asyncio.get_running_loop())
+        self.outbound.start()
+        self.bot.message_service.outbound = self.outbound
+        logger.info("ASGI mode started")
+
+    async def shutdown(self):
+        if self.outbound:
+            await self.outbound.stop()
+        if self._own_client and self.client is not None:
+            await self.client.aclose()
+        self.executor.shutdown(wait=False)
+
+    async def warm(self, message_body):
+        """Fetch, concurrently, what the command in `message_body` will read"""
+        command = command_name(message_body)
+        current_gameweek, _ = get_current_gameweek()
+        if not current_gameweek:
+            return
+
+        reads = []
+        if command == 'fixtures':
+            reads.append(self.fpl.warm_fixtures(current_gameweek))
+        picks_title = self.bot.sheets_service.picks_sheet_title()
+        if command in SHEETS_WARM_COMMANDS and self.sheets and picks_title:
+            reads.append(self.sheets.warm([picks_title, 'Player Scores']))
+        for result in await asyncio.gather(*reads, return_exceptions=True):
+            if isinstance(result, Exception):
+                # The handler fetches for itself; only the speed-up is lost
+                logger.warning("Async prefetch failed: %s", result)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await self.startup()
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await self.shutdown()
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        if scope['type'] != 'http':
+            return
+
+        await self.startup()
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        if scope['method'] == 'POST' and scope['path'] == '/webhook':
+            form = parse_qs(body.decode('utf-8', 'replace'))
+            await self.warm(form.get('Body', [''])[0])
+
+        loop = asyncio.get_running_loop()
+        status, headers, content = await loop.run_in_executor(
+            self.executor, call_wsgi, self.bot.app, wsgi_environ(scope, body)
+        )
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        })
+        await send({'type': 'http.response.body', 'body': content})
+
+
+app = AsyncBot()
@@ -0,0 +1,297 @@
+"""Replay a deadline rush of pick submissions against the webhook.
+
+Arrivals come from a synthetic curve (most picks in the last minutes before
+the deadline) or from a recorded CSV, e.g. the picks sheet exported with its
+Timestamp column. Each webhook really runs through the Flask app on the Sheets
+fake; queueing is then simulated on a virtual clock for a gunicorn with
+`--workers` sync workers (1 in production), so a 30 minute rush replays in
+seconds:
+
+    service time  = measured handler time + Sheets calls x --latency-ms
+                    + time each call waits for the Sheets quota
+    queueing delay = time a request waits for a free worker after it arrives
+
+The Sheets quota runs on the same virtual clock: every call takes a token
+from the read or write bucket (the SheetsQuota budgets), waiting for one if
+needed and failing the request with the "busy" reply if the wait would pass
+CALL_DEADLINE. Calls beyond Google's per-minute quota in any minute would get
+a 429, so they count as errors too (only possible with --no-quota).
+
+A response slower than Twilio's 15 second webhook timeout counts as an error.
+
+    python -m bench.deadline_replay --users 1000
+    python -m bench.deadline_replay --recorded gw7_picks.csv --latency-ms 200
+    python -m bench.deadline_replay --users 300 --no-quota   # client-side buckets off
+"""
+import argparse
+import csv
+import heapq
+import random
+import time
+from collections import Counter
+from datetime import datetime
+
+from bench.harness import (build_spreadsheet, league, load_app, percentile, post,
+                           random_picks, synthetic_users)
+from services.sheets_quota import (CALL_DEADLINE, READ_BURST, READS_PER_MINUTE, WRITE_BURST,
+                                   WRITES_PER_MINUTE, _method_kind)
+
+TWILIO_TIMEOUT = 15.0      # seconds Twilio waits for the webhook before giving up
+DEFAULT_WINDOW = 30 * 60   # the rush: last 30 minutes before the deadline
+DEFAULT_LATENCY_MS = 150   # typical Sheets API round trip from our host
+BUCKET = 5 * 60            # report granularity
+GOOGLE_PER_MINUTE = 60     # Google's read and write quotas, per minute each
+
+
+def synthetic_arrivals(phones, window=DEFAULT_WINDOW, resubmit_rate=0.1, seed=0):
+    """[(offset_seconds, phone, body)] with arrival density rising towards the deadline.
+
+    Offsets are drawn as window * u**(1/3), i.e. density grows with t squared,
+    so the last 10 minutes see about 70% of submissions.
+    """
+    rng = random.Random(seed)
+    senders = list(phones) + rng.sample(list(phones), int(len(phones) * resubmit_rate))
+    arrivals = [
+        (window * rng.random() ** (1 / 3.0), phone, '\n'.join(random_picks(rng)))
+        for phone in senders
+    ]
+    return sorted(arrivals)
+
+
+def recorded_arrivals(path, phones, seed=0):
+    """Arrivals from a CSV with a Timestamp column (ISO format), as exported from the picks sheet.
+
+    Uses the Phone Number and Player 1-8 columns when present; otherwise the
+    sender and picks are synthetic.
+    """
+    rng = random.Random(seed)
+    rows = []
+    with open(path, newline='') as f:
+        for record in csv.DictReader(f):
+            try:
+                timestamp = datetime.fromisoformat(record['Timestamp'].strip())
+            except (KeyError, ValueError):
+                continue
+            phone = (record.get('Phone Number') or '').strip()
+            if phone and not phone.startswith('+'):
+                phone = f'+{phone}'
+            players = [record.get(f'Player {i}', '').strip() for i in range(1, 9)]
+            body = '\n'.join(players) if all(players) else '\n'.join(random_picks(rng))
+            rows.append((timestamp, phone or rng.choice(phones), body))
+
+    if not rows:
+        raise ValueError(f"No rows with a Timestamp column in {path}")
+    rows.sort(key=lambda row: row[0])
+    start = rows[0][0]
+    return [((timestamp - start).total_seconds(), phone, body) for timestamp, phone, body in rows]
+
+
+class VirtualBucket:
+    """SheetsQuota's TokenBucket on the replay's virtual clock: same refill, no sleeping"""
+
+    def __init__(self, per_minute, burst):
+        self.rate = per_minute / 60.0
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = 0.0
+
+    def acquire(self, now, max_wait):
+        """Seconds to wait for a token at `now`, or None if that would exceed max_wait"""
+        # With several workers calls arrive slightly out of order; never refill backwards
+        self._tokens = min(self.capacity, self._tokens + max(0.0, now - self._updated) * self.rate)
+        self._updated = max(self._updated, now)
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        wait = (1 - self._tokens) / self.rate
+        if wait > max_wait:
+            return None
+        self._tokens -= 1
+        return wait
+
+
+def simulate_queue(arrivals, handler_times, sheets_calls, workers, latency, quota=True):
+    """FIFO queue with `workers` servers and the Sheets quota on a virtual clock.
+
+    `sheets_calls` holds each request's call kinds ('read'/'write'/'drive') in
+    order. Each call waits for its bucket's token, then takes `latency`; a
+    call that would wait past CALL_DEADLINE ends the request as rejected.
+    Returns one dict per request: start, finish, throttled (seconds spent
+    waiting for tokens), rejected, and calls as [(time, kind)].
+    """
+    buckets = {
+        'read': VirtualBucket(READS_PER_MINUTE, READ_BURST),
+        'write': VirtualBucket(WRITES_PER_MINUTE, WRITE_BURST),
+    } if quota else {}
+    free_at = [0.0] * workers
+    heapq.heapify(free_at)
+    schedule = []
+    for (offset, _, _), handler, kinds in zip(arrivals, handler_times, sheets_calls):
+        start = max(offset, heapq.heappop(free_at))
+        now = start + handler
+        throttled = 0.0
+        rejected = False
+        calls = []
+        for kind in kinds:
+            bucket = buckets.get(kind)
+            if bucket is not None:
+                wait = bucket.acquire(now, CALL_DEADLINE)
+                if wait is None:
+                    rejected = True
+                    break
+                now += wait
+                throttled += wait
+            calls.append((now, kind))
+            now += latency
+        heapq.heappush(free_at, now)
+        schedule.append({'start': start, 'finish': now, 'throttled': throttled,
+                         'rejected': rejected, 'calls': calls})
+    return schedule
+
+
+def over_quota(schedule):
+    """Indices of requests with a call beyond Google's per-minute quota for its kind"""
+    per_minute = {}
+    for index, entry in enumerate(schedule):
+        for when, kind in entry['calls']:
+            if kind != 'drive':
+                per_minute.setdefault((kind, int(when // 60)), []).append((when, index))
+    failed = set()
+    for calls in per_minute.values():
+        calls.sort()
+        failed.update(index for _, index in calls[GOOGLE_PER_MINUTE:])
+    return failed
+
+
+def replay(app_module, users, arrivals, latency, workers=1, quota=True):
+    """Run every arrival through the webhook and simulate the queue; returns per-request dicts"""
+    spreadsheet = build_spreadsheet(users, submitted_picks=False)
+    handler_times = []
+    sheets_calls = []
+    results = []
+
+    # The app's own buckets would sleep in real time; the quota is applied on the virtual clock instead
+    with league(app_module, spreadsheet, users):
+        client = app_module.app.test_client()
+        for offset, phone, body in arrivals:
+            before = Counter(spreadsheet.calls)
+            start = time.perf_counter()
+            reply = post(client, phone, body)
+            handler_times.append(time.perf_counter() - start)
+            made = spreadsheet.calls - before
+            # The fake counts calls per method, not in order: reads come first, as a submission reads then writes
+            kinds = sorted((_method_kind(name) for name in made.elements()), key=lambda kind: kind == 'write')
+            sheets_calls.append(kinds)
+            results.append({
+                'arrival': offset,
+                'calls': len(kinds),
+                'failed': '✅' not in reply,
+            })
+
+    schedule = simulate_queue(arrivals, handler_times, sheets_calls, workers, latency, quota=quota)
+    rejected_by_google = over_quota(schedule)
+    for index, (result, entry) in enumerate(zip(results, schedule)):
+        result['queue_delay'] = entry['start'] - result['arrival']
+        result['service'] = entry['finish'] - entry['start']
+        result['response'] = entry['finish'] - result['arrival']
+        result['finish'] = entry['finish']
+        result['throttled'] = entry['throttled']
+        result['rejected'] = entry['rejected']
+        result['over_quota'] = index in rejected_by_google
+        result['sheets_calls'] = entry['calls']
+        if result['rejected'] or result['over_quota'] or result['response'] > TWILIO_TIMEOUT:
+            result['failed'] = True
+    return results
+
+
+def calls_per_minute(results):
+    """{minute: Counter(kind)} of the Sheets calls made, by the virtual clock"""
+    minutes = {}
+    for r in results:
+        for when, kind in r['sheets_calls']:
+            minutes.setdefault(int(when // 60), Counter())[kind] += 1
+    return minutes
+
+
+def format_report(results, workers, latency, quota=True):
+    total = len(results)
+    duration = max(r['finish'] for r in results) - min(r['arrival'] for r in results)
+    delays = [r['queue_delay'] for r in results]
+    responses = [r['response'] for r in results]
+    errors = sum(1 for r in results if r['failed'])
+    timeouts = sum(1 for r in results if r['response'] > TWILIO_TIMEOUT)
+    rejected = sum(1 for r in results if r['rejected'])
+    over = sum(1 for r in results if r['over_quota'])
+    throttled = [r['throttled'] for r in results if r['throttled']]
+    calls = sum(r['calls'] for r in results)
+    mean_service = sum(r['service'] for r in results) / total
+    minutes = calls_per_minute(results)
+    peak_reads = max((counts['read'] for counts in minutes.values()), default=0)
+    peak_writes = max((counts['write'] for counts in minutes.values()), default=0)
+
+    lines = [
+        f"Deadline replay: {total} webhooks, {workers} worker(s), {latency * 1000:.0f} ms per Sheets call, "
+        f"quota {'on' if quota else 'off'}",
+        f"Throughput:      {total / duration if duration else 0.0:.2f} req/s over {duration / 60:.1f} min",
+        f"Capacity:        {workers / mean_service:.2f} req/s (mean service time {mean_service:.2f}s)",
+        f"Queueing delay:  p50 {percentile(delays, 50):.2f}s  p95 {percentile(delays, 95):.2f}s  "
+        f"max {max(delays):.2f}s",
+        f"Response time:   p50 {percentile(responses, 50):.2f}s  p95 {percentile(responses, 95):.2f}s  "
+        f"p99 {percentile(responses, 99):.2f}s",
+        f"Errors:          {errors} ({errors / total:.1%}), of which {timeouts} over Twilio's "
+        f"{TWILIO_TIMEOUT:.0f}s timeout, {rejected} busy (quota wait over {CALL_DEADLINE:.0f}s), "
+        f"{over} over Google's quota",
+        f"Sheets calls:    {calls} ({calls / total:.1f} per webhook)",
+        f"Sheets quota:    peak {peak_reads} reads/min and {peak_writes} writes/min "
+        f"(Google allows {GOOGLE_PER_MINUTE} each); {len(throttled)} webhooks waited, "
+        f"max {max(throttled, default=0.0):.2f}s",
+        "",
+        f"{'minute':>8}{'arrivals':>10}{'avg wait s':>12}{'max wait s':>12}{'errors':>8}"
+        f"{'peak r/min':>12}{'peak w/min':>12}",
+    ]
+    buckets = {}
+    for r in results:
+        buckets.setdefault(int(r['arrival'] // BUCKET), []).append(r)
+    for bucket in sorted(buckets):
+        rows = buckets[bucket]
+        waits = [r['queue_delay'] for r in rows]
+        first = bucket * BUCKET // 60
+        window = [minutes.get(minute, Counter()) for minute in range(first, first + BUCKET // 60)]
+        lines.append(f"{first:>8}{len(rows):>10}{sum(waits) / len(waits):>12.2f}"
+                     f"{max(waits):>12.2f}{sum(1 for r in rows if r['failed']):>8}"
+                     f"{max(counts['read'] for counts in window):>12}{max(counts['write'] for counts in window):>12}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a deadline rush of pick submissions")
+    parser.add_argument('--users', type=int, default=1000, help="league size for synthetic arrivals")
+    parser.add_argument('--recorded', help="CSV with a Timestamp column to replay instead")
+    parser.add_argument('--window', type=float, default=DEFAULT_WINDOW / 60, help="rush length in minutes")
+    parser.add_argument('--latency-ms', type=float, default=DEFAULT_LATENCY_MS,
+                        help="simulated latency per Sheets API call")
+    parser.add_argument('--workers', type=int, default=1, help="gunicorn sync workers to simulate")
+    parser.add_argument('--no-quota', action='store_true',
+                        help="don't model the client-side quota buckets (Google's quota still counts)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from config.settings import ADMIN_PHONE
+
+    app_module = load_app()
+    users = synthetic_users(args.users, ADMIN_PHONE)
+    if args.recorded:
+        arrivals = recorded_arrivals(args.recorded, list(users), seed=args.seed)
+        for _, phone, _ in arrivals:
+            users.setdefault(phone, phone)
+    else:
+        arrivals = synthetic_arrivals(list(users), window=args.window * 60, seed=args.seed)
+
+    latency = args.latency_ms / 1000.0
+    quota = not args.no_quota
+    results = replay(app_module, users, arrivals, latency, workers=args.workers, quota=quota)
+    print(format_report(results, args.workers, latency, quota=quota))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Recorded-JSON stand-in for the FPL API, for benchmarks and tests.
+
+Serves files from a directory in place of fantasy.premierleague.com:
+
+    bootstrap-static/          -> bootstrap-static.json
+    event/{gw}/live/           -> event-{gw}-live.json
+    fixtures/?event={gw}       -> fixtures-event-{gw}.json
+
+Responses carry an ETag derived from the file contents and answer a
+matching If-None-Match with a 304, like the real API behind its CDN, so
+editing a file between requests looks like the feed updating.
+"""
+import hashlib
+import json
+import os
+from collections import Counter
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from services.fixture_service import FPL_BASE
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(__file__), 'fpl_recordings')
+
+
+class RecordedResponse:
+    def __init__(self, url, status_code, body=b'', headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.content = body
+        self.headers = CaseInsensitiveDict(headers or {})
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} for url: {self.url}", response=self)
+
+
+class RecordedFplHttp:
+    """Drop-in for the `requests` module as FixtureService(http=...) uses it"""
+
+    def __init__(self, directory=RECORDINGS_DIR):
+        self.directory = directory
+        self.requests = Counter()     # {file name: count}, 304s included
+
+    def _file_name(self, url, params):
+        path = url[len(FPL_BASE):].strip('/')
+        if path == 'bootstrap-static':
+            return 'bootstrap-static.json'
+        if path == 'fixtures':
+            return f"fixtures-event-{(params or {}).get('event')}.json"
+        parts = path.split('/')
+        if len(parts) == 3 and parts[0] == 'event' and parts[2] == 'live':
+            return f"event-{parts[1]}-live.json"
+        return None
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        name = self._file_name(url, params)
+        self.requests[name] += 1
+        path = os.path.join(self.directory, name) if name else None
+        if not path or not os.path.exists(path):
+            return RecordedResponse(url, 404)
+
+        with open(path, 'rb') as f:
+            body = f.read()
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+        if (headers or {}).get('If-None-Match') == etag:
+            return RecordedResponse(url, 304, headers={'ETag': etag})
+        return RecordedResponse(url, 200, body, {'ETag': etag, 'Content-Type': 'application/json'})
@@ -0,0 +1,210 @@
+"""In-memory stand-in for a gspread Spreadsheet, for benchmarks and tests.
+
+Implements the slice of the gspread 5.x API the bot uses (sheet1, worksheet,
+add_worksheet, batch_update deleteDimension, values_batch_get of whole tabs,
+get_lastUpdateTime and the Worksheet read/write methods) on plain lists of strings. Values come back the
+way Google returns them: get_all_records numericises cells with gspread's own
+helper, so phone numbers lose their '+' exactly as they do in production.
+
+Every API call is counted per method and can be slowed down by a fixed
+latency to approximate the round trip to Google.
+"""
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from gspread.exceptions import GSpreadException, WorksheetNotFound
+from gspread.utils import a1_to_rowcol, numericise
+
+
+def _cell(value):
+    # Sheets stores what it's given; reads always come back as display strings
+    return '' if value is None else str(value)
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, sheet_id, title, rows=None):
+        self.spreadsheet = spreadsheet
+        self.id = sheet_id
+        self.title = title
+        self.rows = [[_cell(v) for v in row] for row in (rows or [])]
+
+    # -- reads --
+
+    def get_all_values(self):
+        self.spreadsheet._api_call('get_all_values')
+        width = max((len(row) for row in self.rows), default=0)
+        return [row + [''] * (width - len(row)) for row in self.rows]
+
+    def get_all_records(self, head=1, default_blank=''):
+        self.spreadsheet._api_call('get_all_records')
+        if len(self.rows) < head:
+            return []
+        keys = self.rows[head - 1]
+        records = []
+        for row in self.rows[head:]:
+            row = row + [''] * (len(keys) - len(row))
+            records.append({
+                key: numericise(value, default_blank=default_blank)
+                for key, value in zip(keys, row)
+            })
+        return records
+
+    def row_values(self, row):
+        self.spreadsheet._api_call('row_values')
+        if row > len(self.rows):
+            return []
+        values = list(self.rows[row - 1])
+        while values and values[-1] == '':
+            values.pop()
+        return values
+
+    def col_values(self, col):
+        self.spreadsheet._api_call('col_values')
+        values = [row[col - 1] if col <= len(row) else '' for row in self.rows]
+        while values and values[-1] == '':
+            values.pop()
+        return values
+
+    # -- writes --
+
+    def _set(self, row, col, value):
+        while len(self.rows) < row:
+            self.rows.append([])
+        cells = self.rows[row - 1]
+        while len(cells) < col:
+            cells.append('')
+        cells[col - 1] = _cell(value)
+
+    def append_row(self, values, **kwargs):
+        self.spreadsheet._api_call('append_row', write=True)
+        self.rows.append([_cell(v) for v in values])
+
+    def append_rows(self, values, **kwargs):
+        self.spreadsheet._api_call('append_rows', write=True)
+        self.rows.extend([_cell(v) for v in row] for row in values)
+
+    def insert_row(self, values, index=1, **kwargs):
+        self.spreadsheet._api_call('insert_row', write=True)
+        self.rows.insert(index - 1, [_cell(v) for v in values])
+
+    def update_cell(self, row, col, value):
+        self.spreadsheet._api_call('update_cell', write=True)
+        self._set(row, col, value)
+
+    def update(self, range_name, values=None, **kwargs):
+        self.spreadsheet._api_call('update', write=True)
+        start_row, start_col = a1_to_rowcol(range_name.split(':')[0])
+        for r, row in enumerate(values or []):
+            for c, value in enumerate(row):
+                self._set(start_row + r, start_col + c, value)
+
+    def batch_update(self, data, **kwargs):
+        self.spreadsheet._api_call('batch_update', write=True)
+        for update in data:
+            start_row, start_col = a1_to_rowcol(update['range'].split(':')[0])
+            for r, row in enumerate(update['values']):
+                for c, value in enumerate(row):
+                    self._set(start_row + r, start_col + c, value)
+
+    def clear(self):
+        self.spreadsheet._api_call('clear', write=True)
+        self.rows = []
+
+
+class FakeSpreadsheet:
+    """A spreadsheet of FakeWorksheets; sheet1 is created empty"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()     # {gspread method name: count}
+        self.revision = 1          # bumped on every write, reported by get_lastUpdateTime
+        self._lock = threading.Lock()
+        self._worksheets = [FakeWorksheet(self, 0, 'Sheet1')]
+
+    def _api_call(self, name, write=False):
+        with self._lock:
+            self.calls[name] += 1
+            if write:
+                self.revision += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def reset_calls(self):
+        self.calls.clear()
+
+    @property
+    def sheet1(self):
+        self._api_call('fetch_sheet_metadata')
+        return self._worksheets[0]
+
+    def worksheet(self, title):
+        self._api_call('fetch_sheet_metadata')
+        for worksheet in self._worksheets:
+            if worksheet.title == title:
+                return worksheet
+        raise WorksheetNotFound(title)
+
+    def worksheets(self):
+        self._api_call('fetch_sheet_metadata')
+        return list(self._worksheets)
+
+    def add_worksheet(self, title, rows, cols, index=None):
+        self._api_call('add_worksheet', write=True)
+        if any(ws.title == title for ws in self._worksheets):
+            raise GSpreadException(f'A sheet with the name "{title}" already exists.')
+        worksheet = FakeWorksheet(self, max(ws.id for ws in self._worksheets) + 1, title)
+        self._worksheets.append(worksheet)
+        return worksheet
+
+    def seed(self, title, rows):
+        """Create or replace a worksheet's contents without counting an API call"""
+        for worksheet in self._worksheets:
+            if worksheet.title == title:
+                worksheet.rows = [[_cell(v) for v in row] for row in rows]
+                return worksheet
+        worksheet = FakeWorksheet(self, max(ws.id for ws in self._worksheets) + 1, title, rows)
+        self._worksheets.append(worksheet)
+        return worksheet
+
+    def batch_update(self, body):
+        self._api_call('batch_update', write=True)
+        by_id = {ws.id: ws for ws in self._worksheets}
+        for req in body.get('requests', []):
+            if 'deleteDimension' not in req:
+                raise NotImplementedError(f"FakeSpreadsheet.batch_update: {list(req)}")
+            rng = req['deleteDimension']['range']
+            if rng.get('dimension') != 'ROWS':
+                raise NotImplementedError("FakeSpreadsheet.batch_update: only ROWS deletes")
+            del by_id[rng['sheetId']].rows[rng['startIndex']:rng['endIndex']]
+        return {'replies': [{} for _ in body.get('requests', [])]}
+
+    def values_batch_get(self, ranges, params=None):
+        """Whole-tab ranges only ("'Player Scores'"); trailing blanks trimmed as Google does"""
+        self._api_call('values_batch_get')
+        by_title = {ws.title: ws for ws in self._worksheets}
+        value_ranges = []
+        for rng in ranges:
+            title = rng.strip("'")
+            if title not in by_title:
+                raise GSpreadException(f"Unable to parse range: {rng}")
+            values = []
+            for row in by_title[title].rows:
+                row = list(row)
+                while row and row[-1] == '':
+                    row.pop()
+                values.append(row)
+            while values and not values[-1]:
+                values.pop()
+            value_ranges.append({'range': rng, 'majorDimension': 'ROWS', 'values': values})
+        return {'valueRanges': value_ranges}
+
+    def get_lastUpdateTime(self):
+        self._api_call('get_lastUpdateTime')
+        # Drive reports modifiedTime; a revision-derived stamp changes on the same events
+        stamp = datetime.fromtimestamp(self.revision, tz=timezone.utc)
+        return stamp.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
@@ -0,0 +1,159 @@
+"""Shared setup for the offline benchmarks: a synthetic league on the Sheets fake.
+
+Imports the Flask app with dummy Twilio credentials, then swaps its services
+for ones backed by a FakeSpreadsheet and a Twilio client that only records
+messages. Nothing here talks to Google or Twilio.
+"""
+import contextlib
+import os
+import random
+from datetime import datetime, timedelta
+
+from bench.fake_gspread import FakeSpreadsheet
+
+# Read by config.settings, so set before anything imports it
+os.environ.setdefault('TWILIO_ACCOUNT_SID', 'ACbench')
+os.environ.setdefault('TWILIO_AUTH_TOKEN', 'bench')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')   # per-request log lines would drown the report
+
+PLAYER_POOL = [
+    'Haaland', 'Salah', 'Saka', 'Palmer', 'Watkins', 'Isak', 'Son', 'Wissa',
+    'Mbeumo', 'Gordon', 'Solanke', 'Jackson', 'Havertz', 'Jota', 'Foden', 'Bowen',
+    'Mateta', 'Wood', 'Cunha', 'Eze', 'Rashford', 'Hojlund', 'Welbeck', 'Mitoma',
+    'Kluivert', 'Semenyo', 'Gakpo', 'Diaz', 'Nunez', 'Martinelli', 'Trossard', 'Odegaard',
+    'Bruno Fernandes', 'Maddison', 'Richarlison', 'Kulusevski', 'Garnacho', 'Doku',
+    'Strand Larsen', 'Calvert-Lewin',
+]
+
+# Inside GW1's window, before its deadline: picks are accepted and goals can be logged
+BENCH_NOW = datetime(2026, 8, 21, 12, 0)
+BENCH_GAMEWEEK = 1
+
+PICKS_HEADERS = ['Timestamp', 'Phone Number', 'User ID', 'Gameweek', 'Deadline',
+                 'Player 1', 'Player 2', 'Player 3', 'Player 4',
+                 'Player 5', 'Player 6', 'Player 7', 'Player 8']
+STATUS_HEADERS = ['Timestamp', 'Gameweek', 'Phone Number', 'User Name',
+                  'Player 1', 'P1 Scored', 'Player 2', 'P2 Scored',
+                  'Player 3', 'P3 Scored', 'Player 4', 'P4 Scored',
+                  'Player 5', 'P5 Scored', 'Player 6', 'P6 Scored',
+                  'Player 7', 'P7 Scored', 'Player 8', 'P8 Scored',
+                  'Status', 'Updated']
+SCORES_HEADERS = ['Gameweek', 'Player', 'Scored', 'Updated']
+
+
+class RecordingTwilioClient:
+    """Twilio client stand-in: messages.create() just records the call"""
+
+    def __init__(self):
+        self.messages = self
+        self.sent = []
+
+    def create(self, body, from_, to):
+        self.sent.append((to, body))
+
+
+def synthetic_users(num_users, admin_phone):
+    """{phone: name} for num_users users, the first of whom is the admin"""
+    users = {admin_phone: 'Admin'}
+    for i in range(1, num_users):
+        users[f'+4470{i:08d}'] = f'User{i:04d}'
+    return users
+
+
+def random_picks(rng):
+    return rng.sample(PLAYER_POOL, 8)
+
+
+def build_spreadsheet(users, gameweek=BENCH_GAMEWEEK, seed=0, latency=0.0, submitted_picks=True):
+    """A FakeSpreadsheet where every user has already submitted picks for the gameweek.
+
+    With submitted_picks=False only the headers exist, as before a deadline rush.
+    """
+    rng = random.Random(seed)
+    spreadsheet = FakeSpreadsheet()
+    deadline = BENCH_NOW.replace(hour=18, minute=30)
+    submitted = BENCH_NOW - timedelta(days=1)
+
+    picks_rows = [PICKS_HEADERS]
+    status_rows = [STATUS_HEADERS]
+    for i, (phone, name) in enumerate(users.items() if submitted_picks else []):
+        players = random_picks(rng)
+        timestamp = (submitted + timedelta(seconds=i)).isoformat()
+        picks_rows.append([timestamp, phone, name, gameweek, deadline.strftime("%Y-%m-%d %H:%M")] + players)
+        status_row = [timestamp, gameweek, phone, name]
+        for player in players:
+            status_row += [player, '']
+        status_rows.append(status_row + ['Pending', timestamp])
+
+    spreadsheet.seed('Sheet1', picks_rows)
+    spreadsheet.seed('User Status', status_rows)
+    spreadsheet.seed('Player Scores', [SCORES_HEADERS] + [
+        [gameweek, player, 'Yes', submitted.isoformat()] for player in PLAYER_POOL[:3] if submitted_picks
+    ])
+    # Seeding isn't traffic; latency applies from here on
+    spreadsheet.latency = latency
+    return spreadsheet
+
+
+def load_app():
+    """Import app.py offline and clear the jobs its scheduler starts with"""
+    import app as app_module
+    app_module.summary_scheduler.remove_all_jobs()
+
+    from utils import date_utils
+    date_utils.now_uk = lambda: BENCH_NOW
+    return app_module
+
+
+@contextlib.contextmanager
+def league(app_module, spreadsheet, users, throttle=False):
+    """Point the app's services at `spreadsheet` and its user map at `users` for the block.
+
+    Without `throttle` the Sheets quota's token buckets are removed, so the
+    numbers show the code's own cost rather than time spent waiting for quota.
+    """
+    from config.settings import USER_MAP
+    from services.gameweek_service import GameweekService
+    from services.message_service import MessageService
+    from services.sheets_quota import SheetsQuota
+    from services.sheets_service import SheetsService
+    from utils.message_chunks import ReplyPager
+
+    quota = SheetsQuota()
+    if not throttle:
+        quota.buckets.clear()
+
+    saved_users = dict(USER_MAP)
+    saved = {name: getattr(app_module, name)
+             for name in ('sheets_service', 'message_service', 'gameweek_service', 'reply_pager')}
+    USER_MAP.clear()
+    USER_MAP.update(users)
+    try:
+        twilio = RecordingTwilioClient()
+        sheets_service = SheetsService(spreadsheet=spreadsheet, quota=quota)
+        app_module.sheets_service = sheets_service
+        app_module.message_service = MessageService(twilio, sheets_service)
+        app_module.message_service.outbound.part_delay = 0
+        app_module.gameweek_service = GameweekService(sheets_service)
+        app_module.reply_pager = ReplyPager()
+        yield twilio
+    finally:
+        for name, value in saved.items():
+            setattr(app_module, name, value)
+        USER_MAP.clear()
+        USER_MAP.update(saved_users)
+
+
+def post(client, phone, body):
+    """Send one synthetic Twilio webhook and return the reply text"""
+    response = client.post('/webhook', data={'From': f'whatsapp:{phone}', 'Body': body})
+    return response.get_data(as_text=True)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
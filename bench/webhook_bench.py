@@ -0,0 +1,107 @@
+"""Webhook latency benchmark on the in-memory Sheets fake.
+
+Drives whatsapp_webhook through the Flask test client with synthetic Twilio
+form posts and reports, per command and league size, latency percentiles and
+the number of Sheets API calls each command made.
+
+    python -m bench.webhook_bench
+    python -m bench.webhook_bench --users 14 100 --rounds 50 --latency-ms 120
+
+Commands run in rounds (pick, goal, leaderboard detail, weights, status) so
+the writes in each round invalidate caches the way real traffic does.
+"""
+import argparse
+import json
+import random
+import time
+
+from bench.harness import (PLAYER_POOL, build_spreadsheet, league, load_app, percentile,
+                           post, random_picks, synthetic_users)
+
+DEFAULT_USERS = [14, 100, 1000]
+DEFAULT_ROUNDS = 20
+COMMANDS = ['pick', 'goal', 'leaderboard detail', 'weights', 'status']
+
+
+def run_scale(app_module, num_users, rounds, latency, seed=0):
+    """Benchmark every command at one league size; returns {command: result dict}"""
+    from config.settings import ADMIN_PHONE
+
+    rng = random.Random(seed)
+    users = synthetic_users(num_users, ADMIN_PHONE)
+    phones = [phone for phone in users if phone != ADMIN_PHONE] or [ADMIN_PHONE]
+    spreadsheet = build_spreadsheet(users, seed=seed, latency=latency)
+
+    timings = {command: [] for command in COMMANDS}
+    calls = {command: 0 for command in COMMANDS}
+    errors = {command: 0 for command in COMMANDS}
+
+    with league(app_module, spreadsheet, users):
+        client = app_module.app.test_client()
+        for round_num in range(rounds):
+            for command in COMMANDS:
+                if command == 'pick':
+                    phone, body = rng.choice(phones), '\n'.join(random_picks(rng))
+                elif command == 'goal':
+                    phone, body = ADMIN_PHONE, f'goal {PLAYER_POOL[round_num % len(PLAYER_POOL)]}'
+                elif command == 'weights':
+                    phone, body = rng.choice(phones), 'weights'
+                else:
+                    phone, body = ADMIN_PHONE, command
+
+                before = spreadsheet.total_calls()
+                start = time.perf_counter()
+                reply = post(client, phone, body)
+                timings[command].append((time.perf_counter() - start) * 1000)
+                calls[command] += spreadsheet.total_calls() - before
+                if 'something went wrong' in reply or 'Sheets is busy' in reply:
+                    errors[command] += 1
+
+    return {
+        command: {
+            'users': num_users,
+            'command': command,
+            'n': len(samples),
+            'p50_ms': percentile(samples, 50),
+            'p90_ms': percentile(samples, 90),
+            'p99_ms': percentile(samples, 99),
+            'max_ms': max(samples),
+            'sheets_calls': calls[command] / len(samples),
+            'errors': errors[command],
+        }
+        for command, samples in timings.items()
+    }
+
+
+def format_report(results):
+    lines = [f"{'users':>6}  {'command':<20}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+             f"{'calls/cmd':>11}{'errors':>8}"]
+    for row in results:
+        lines.append(f"{row['users']:>6}  {row['command']:<20}{row['p50_ms']:>9.1f}{row['p90_ms']:>9.1f}"
+                     f"{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}{row['sheets_calls']:>11.1f}{row['errors']:>8}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the WhatsApp webhook against an in-memory sheet")
+    parser.add_argument('--users', type=int, nargs='+', default=DEFAULT_USERS, help="league sizes to run")
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS, help="times each command is sent")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="simulated latency per Sheets API call")
+    parser.add_argument('--json', dest='json_path', help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    app_module = load_app()
+    results = []
+    for num_users in args.users:
+        scale = run_scale(app_module, num_users, args.rounds, args.latency_ms / 1000.0)
+        results.extend(scale[command] for command in COMMANDS)
+
+    print(format_report(results))
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -72,7 +72,11 @@ USER_MAP = {
 
 # Google Sheets setup
 SPREADSHEET_ID = os.environ.get('GOOGLE_SHEET_ID', 'your-google-sheet-id')
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    # Read-only Drive metadata, used to check the sheet's modifiedTime before refetching
+    'https://www.googleapis.com/auth/drive.metadata.readonly',
+]
 
 ADMIN_PHONE = os.environ.get('ADMIN_PHONE', "+447375356774")
 
@@ -80,3 +84,20 @@ ADMIN_PHONE = os.environ.get('ADMIN_PHONE', "+447375356774")
 TWILIO_ACCOUNT_SID = os.environ.get('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.environ.get('TWILIO_AUTH_TOKEN')
 TWILIO_FROM_NUMBER = os.environ.get('TWILIO_WHATSAPP_NUMBER', 'whatsapp:+14155238886')
+
+# Logging: level, 'text' (key=value) or 'json', and a salt for the phone hashes in log lines
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')
+LOG_PHONE_SALT = os.environ.get('LOG_PHONE_SALT', '')
+
+# Opt-in request profiling (off unless one of the first two is set)
+PROFILE_EVERY = int(os.environ.get('PROFILE_EVERY', '0'))        # cProfile every Nth webhook
+PROFILE_SLOW_MS = float(os.environ.get('PROFILE_SLOW_MS', '0'))  # keep stack samples of slower webhooks
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+
+# Optional ASGI mode (asgi.py): threads for running commands once their reads are done
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', '4'))
+
+# Live goal ingestion from the FPL event-live feed (set LIVE_GOALS=0 to mark scorers by hand only)
+LIVE_GOALS = os.environ.get('LIVE_GOALS', '1') != '0'
+LIVE_POLL_INTERVAL = int(os.environ.get('LIVE_POLL_INTERVAL', '60'))   # seconds between feed polls during a match (30-60)
@@ -3,7 +3,9 @@
 Kept separate from the live Premier League bot settings. Only the archived
 World Cup services (see archive/worldcup2026/) import from this module.
 """
+import json
 import os
+from types import MappingProxyType
 
 # World Cup 2026 Google Sheets setup
 WC_MASTER_SHEET_ID = os.environ.get('WC_MASTER_SHEET_ID')
@@ -31,6 +33,30 @@ GROUP_TOP_SEEDS = {
     'I': 'France', 'J': 'Argentina', 'K': 'Portugal', 'L': 'England',
 }
 
+# Group fixtures (as listed on the forms) and knockout rounds: the one source
+# for both result logging and scoring
+with open(os.path.join(os.path.dirname(__file__), 'wc_fixtures.json')) as _f:
+    _WC_FIXTURES = json.load(_f)
+
+
+def match_pair(match_key):
+    """Order-insensitive key for a 'Home vs Away' match"""
+    return frozenset(team.strip() for team in match_key.split(' vs '))
+
+
+# {frozenset({home, away}): (home, away, matchday)}
+GROUP_FIXTURES = MappingProxyType({
+    frozenset((home, away)): (home, away, int(matchday))
+    for matchday, fixtures in _WC_FIXTURES['group'].items()
+    for home, away in fixtures
+})
+
+# Knockout rounds in order, e.g. {'round': 'QF', 'forms': [8], 'matches': 4}
+KNOCKOUT_ROUNDS = tuple(MappingProxyType(knockout_round) for knockout_round in _WC_FIXTURES['knockout'])
+KNOCKOUT_FORM_ROUNDS = MappingProxyType({
+    form_num: knockout_round['round'] for knockout_round in KNOCKOUT_ROUNDS for form_num in knockout_round['forms']
+})
+
 # Team abbreviations for parsing WC commands
 TEAM_ABBREVIATIONS = {
     # Common abbreviations
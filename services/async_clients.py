@@ -0,0 +1,152 @@
+"""Async readers/senders for the optional ASGI mode (asgi.py), on one shared httpx.AsyncClient.
+
+They don't replace the services: they fetch what a command is about to
+need concurrently and store it in the services' existing caches, so the
+unchanged command code then runs without waiting on the network.
+Every function takes the client as an argument; httpx itself is only
+imported by asgi.py when it creates the client.
+"""
+import asyncio
+import logging
+from urllib.parse import quote
+
+from config.settings import SPREADSHEET_ID, TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_FROM_NUMBER
+from services.fixture_service import FIXTURES_TTL, FPL_BASE
+from services.outbound_queue import PART_DELAY
+from services.sheets_service import records_from_values
+from utils.logging_utils import phone_hash
+from utils.message_chunks import number_parts, split_message
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SHEETS_API = "https://sheets.googleapis.com/v4/spreadsheets"
+DRIVE_API = "https://www.googleapis.com/drive/v3/files"
+TWILIO_API = "https://api.twilio.com/2010-04-01"
+
+
+class AsyncFplReader:
+    """Fills FixtureService's caches, fetching bootstrap-static and the fixtures in parallel"""
+
+    def __init__(self, client, fixture_service):
+        self.client = client
+        self.fixture_service = fixture_service
+
+    async def _get_json(self, operation, url, **kwargs):
+        with metrics.external_call('fpl', operation):
+            resp = await self.client.get(url, timeout=10, **kwargs)
+            resp.raise_for_status()
+        return resp.json()
+
+    async def warm_fixtures(self, gameweek_num):
+        if self.fixture_service.fixtures_fresh(gameweek_num, FIXTURES_TTL):
+            return
+        fetches = [self._get_json('fixtures', f"{FPL_BASE}/fixtures/", params={'event': gameweek_num})]
+        if not self.fixture_service.bootstrap_fresh():
+            fetches.append(self._get_json('bootstrap-static', f"{FPL_BASE}/bootstrap-static/"))
+        raw_fixtures, *bootstrap = await asyncio.gather(*fetches)
+        if bootstrap:
+            self.fixture_service.store_bootstrap(bootstrap[0])
+        self.fixture_service.store_fixtures(gameweek_num, raw_fixtures, self.fixture_service.get_team_map())
+
+
+class AsyncSheetsReader:
+    """Reads several tabs in one values:batchGet, after the Drive revision,
+    and primes SheetsService's records cache with them."""
+
+    def __init__(self, client, sheets_service, credentials):
+        self.client = client
+        self.sheets_service = sheets_service
+        self.credentials = credentials
+        self._refresh_lock = asyncio.Lock()
+
+    async def _auth_headers(self):
+        async with self._refresh_lock:
+            if not self.credentials.valid:
+                from google.auth.transport.requests import Request
+                # google-auth is sync; a token refresh is rare (hourly)
+                await asyncio.to_thread(self.credentials.refresh, Request())
+        return {'Authorization': f'Bearer {self.credentials.token}'}
+
+    async def _get_json(self, kind, url, **kwargs):
+        bucket = self.sheets_service.quota.buckets.get(kind)
+        # Never block the event loop on the quota: with no token free, let the sync path queue for one
+        if bucket is not None and bucket.acquire(0) is None:
+            raise RuntimeError(f"no Sheets {kind} token free")
+        self.sheets_service.quota._count(f'{kind}_calls')
+        headers = await self._auth_headers()
+        with metrics.external_call('sheets', kind):
+            resp = await self.client.get(url, headers=headers, timeout=10, **kwargs)
+            resp.raise_for_status()
+        return resp.json()
+
+    async def warm(self, titles):
+        """Read `titles` into the records cache; failures are logged and left to the sync path.
+
+        The revision is fetched before the values, as _get_records does, so
+        values read after an edit are never cached under an older token.
+        """
+        write_count = self.sheets_service._write_count
+        try:
+            revision = await self._get_json('drive', f"{DRIVE_API}/{quote(SPREADSHEET_ID)}",
+                                            params={'fields': 'modifiedTime', 'supportsAllDrives': 'true'})
+            values = await self._get_json('read', f"{SHEETS_API}/{SPREADSHEET_ID}/values:batchGet",
+                                          params=[('ranges', f"'{title}'") for title in titles])
+        except Exception as e:
+            logger.warning("Async Sheets read failed, command will read synchronously: %s", e)
+            return False
+
+        token = revision.get('modifiedTime')
+        for title, value_range in zip(titles, values.get('valueRanges', [])):
+            records = records_from_values(value_range.get('values', []))
+            if not self.sheets_service.prime_records(title, records, token, write_count):
+                return False
+        return True
+
+
+class AsyncOutbound:
+    """OutboundQueue's interface (send) on the event loop: one task sends queued parts in order.
+
+    send() is called from the thread running a command, so parts are handed
+    to the loop thread-safely.
+    """
+
+    def __init__(self, client, loop, part_delay=PART_DELAY):
+        self.client = client
+        self.loop = loop
+        self.part_delay = part_delay
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    def send(self, to, body):
+        parts = number_parts(split_message(body))
+        for part in parts:
+            self.loop.call_soon_threadsafe(self._queue.put_nowait, (to, part))
+        return len(parts)
+
+    def start(self):
+        self._task = self.loop.create_task(self._run())
+
+    async def stop(self):
+        await self._queue.join()
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self):
+        while True:
+            to, body = await self._queue.get()
+            try:
+                with metrics.external_call('twilio', 'send'):
+                    resp = await self.client.post(
+                        f"{TWILIO_API}/Accounts/{TWILIO_ACCOUNT_SID}/Messages.json",
+                        data={'From': TWILIO_FROM_NUMBER, 'To': to, 'Body': body},
+                        auth=(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN),
+                        timeout=10,
+                    )
+                    resp.raise_for_status()
+            except Exception as e:
+                logger.error("Error sending message: %s", e, extra={'phone': phone_hash(to.replace('whatsapp:', ''))})
+            finally:
+                self._queue.task_done()
+            if self.part_delay and not self._queue.empty():
+                await asyncio.sleep(self.part_delay)
@@ -0,0 +1,147 @@
+"""Scoring shared by the weekly Premier League game and the World Cup game.
+
+A Competition is a game's format as configuration: which rule scores each
+kind of pick and, for form-based games, which kind of pick each form holds.
+The rules are small objects with their points as parameters, so a new
+format (Euros, Champions League) is a new Competition rather than new
+scoring code. ScoreCache is the one cache model both games use: a score is
+kept until the pick or one of the results it depends on changes.
+"""
+
+
+class WeightedGoals:
+    """Goal picks: a goal is worth less the more users picked the scorer"""
+
+    def __init__(self, step=0.1, floor=0.1):
+        self.step = step
+        self.floor = floor
+
+    def multiplier(self, pickers):
+        """0.1 less per other picker, at least 0.1"""
+        return max(self.floor, 1 - self.step * (pickers - 1))
+
+    def points(self, goals, pickers):
+        return goals * self.multiplier(pickers)
+
+
+class MatchResult:
+    """Result picks (a team, or 'Draw'): `correct` points when right"""
+
+    def __init__(self, correct=1):
+        self.correct = correct
+
+    @staticmethod
+    def outcome(home_team, away_team, home_score, away_score):
+        """The pick a result makes correct: the winning team, or 'Draw'"""
+        if home_score > away_score:
+            return home_team
+        if away_score > home_score:
+            return away_team
+        return 'Draw'
+
+    def points(self, pick, home_team, away_team, home_score, away_score):
+        return self.correct if pick == self.outcome(home_team, away_team, home_score, away_score) else 0
+
+
+class GroupWinner:
+    """Group winner picks: `favourite` points for the top seed, `upset` for anyone else"""
+
+    def __init__(self, favourite=1, upset=3):
+        self.favourite = favourite
+        self.upset = upset
+
+    def points(self, pick, winner, top_seed):
+        if not pick or not winner or pick != winner:
+            return 0
+        return self.favourite if winner == top_seed else self.upset
+
+
+class ExactScore:
+    """Score predictions: `exact` points for the exact score, `result` for the right result"""
+
+    def __init__(self, exact=2, result=1):
+        self.exact = exact
+        self.result = result
+
+    def points(self, pred_home, pred_away, home_score, away_score):
+        if pred_home == home_score and pred_away == away_score:
+            return self.exact
+        if (pred_home > pred_away) == (home_score > away_score) and (pred_away > pred_home) == (away_score > home_score):
+            return self.result
+        return 0
+
+
+class Competition:
+    """A game's format: {pick kind: rule} and, for form-based games, {form number: pick kind}"""
+
+    def __init__(self, name, rules, forms=None):
+        self.name = name
+        self.rules = rules
+        self.forms = forms or {}
+
+    def rule(self, kind):
+        return self.rules[kind]
+
+    def form_kind(self, form_num):
+        """Kind of pick a form holds, or None for a form that isn't scored"""
+        return self.forms.get(form_num)
+
+    def forms_of(self, kind):
+        return [form_num for form_num, form_kind in self.forms.items() if form_kind == kind]
+
+
+PREMIER_LEAGUE = Competition('Premier League', {'goal': WeightedGoals()})
+
+WORLD_CUP_2026 = Competition(
+    'World Cup 2026',
+    {
+        'group_result': MatchResult(),
+        'group_winner': GroupWinner(favourite=1, upset=3),
+        'knockout_result': MatchResult(),
+        'knockout_score': ExactScore(exact=2, result=1),
+    },
+    forms={
+        1: 'group_result', 2: 'group_result', 3: 'group_result',     # matchdays 1-3
+        4: 'group_winner',
+        5: 'knockout_result', 6: 'knockout_result', 7: 'knockout_result',    # R32
+        8: 'knockout_score', 9: 'knockout_score', 10: 'knockout_score',      # QF, SF, Final
+    },
+)
+
+
+class ScoreCache:
+    """Scores per key (participant, form or user), recomputed only when stale.
+
+    refresh() takes every score wanted now as (key, pick, dependencies) and
+    the current {dependency: value} of all results. A cached score is
+    reused while its pick compares equal and none of its dependencies'
+    values changed since the previous refresh. Keys not asked for are
+    dropped, so no entry can miss a change.
+    """
+
+    def __init__(self):
+        self._scores = {}          # {key: (pick, score)}
+        self._dependencies = {}    # {dependency: value} at the last refresh
+
+    def refresh(self, items, dependencies, score):
+        """{key: score}, calling score(key) only for new or stale keys"""
+        changed = {
+            dependency for dependency in dependencies.keys() | self._dependencies.keys()
+            if dependencies.get(dependency) != self._dependencies.get(dependency)
+        }
+
+        scores = {}
+        for key, pick, depends_on in items:
+            cached = self._scores.get(key)
+            if cached is not None and cached[0] == pick and not (changed & depends_on):
+                scores[key] = cached
+            else:
+                scores[key] = (pick, score(key))
+
+        self._scores = scores
+        self._dependencies = dict(dependencies)
+        return {key: value for key, (_, value) in scores.items()}
+
+    def clear(self):
+        self._scores = {}
+        self._dependencies = {}
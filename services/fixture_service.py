@@ -1,8 +1,13 @@
+import logging
 import requests
 import time
 from datetime import datetime
 
 from utils.date_utils import get_uk_timezone
+from utils.metrics import metrics
+from utils.render_cache import RenderCache
+
+logger = logging.getLogger(__name__)
 
 FPL_BASE = "https://fantasy.premierleague.com/api"
 FIXTURES_TTL = 3600      # cache fixtures per gameweek for 1 hour
@@ -15,48 +20,117 @@ class FixtureService:
     directly onto this bot's gameweek numbering.
     """
 
-    def __init__(self):
+    def __init__(self, http=None):
+        # Anything with requests.get's interface; tests pass a recorded-JSON stand-in
+        self.http = http or requests
         self._teams = None            # {team_id: team_name}
+        self._players = None          # {element_id: bootstrap element dict}
         self._teams_fetched_at = 0.0
         self._fixtures_cache = {}     # {gameweek: (fetched_at, [fixtures])}
+        self._live_validators = {}    # {gameweek: {'ETag': ..., 'Last-Modified': ...}} of the last applied feed
+        self._pending_validators = {} # same, for a feed read but not yet confirmed applied
+        self.render_cache = RenderCache()
+
+    def _load_bootstrap(self):
+        """Fetch and cache bootstrap-static: the team id -> name map and the player list."""
+        if self.bootstrap_fresh():
+            return
+
+        with metrics.external_call('fpl', 'bootstrap-static'):
+            resp = self.http.get(f"{FPL_BASE}/bootstrap-static/", timeout=10)
+            resp.raise_for_status()
+        self.store_bootstrap(resp.json())
+
+    def bootstrap_fresh(self):
+        return self._teams is not None and (time.monotonic() - self._teams_fetched_at) < BOOTSTRAP_TTL
 
-    def _get_team_map(self):
-        """Fetch and cache the team id -> name map from bootstrap-static."""
-        now = time.monotonic()
-        if self._teams is not None and (now - self._teams_fetched_at) < BOOTSTRAP_TTL:
-            return self._teams
-
-        resp = requests.get(f"{FPL_BASE}/bootstrap-static/", timeout=10)
-        resp.raise_for_status()
-        teams = resp.json().get('teams', [])
-        self._teams = {t['id']: t['name'] for t in teams}
-        self._teams_fetched_at = now
+    def store_bootstrap(self, data):
+        """Cache a bootstrap-static payload (also used by the async reader)"""
+        self._teams = {t['id']: t['name'] for t in data.get('teams', [])}
+        self._players = {p['id']: p for p in data.get('elements', [])}
+        self._teams_fetched_at = time.monotonic()
+
+    def get_team_map(self):
+        """Team id -> name map from bootstrap-static (cached for BOOTSTRAP_TTL)."""
+        self._load_bootstrap()
         return self._teams
 
-    def get_fixtures_for_gameweek(self, gameweek_num):
+    def get_players(self):
+        """FPL player id -> bootstrap element (web_name, first_name, second_name, team...)."""
+        self._load_bootstrap()
+        return self._players
+
+    def get_live_goals(self, gameweek_num):
+        """Goals per FPL player id from event/{gw}/live/, or None if unchanged or unavailable.
+
+        Uses conditional requests (If-None-Match / If-Modified-Since), so an
+        unchanged feed costs a 304 with no body. The validators of a new feed
+        only count once confirm_live_goals() is called, so goals that failed
+        to apply are fetched again on the next poll.
+        """
+        headers = {}
+        validators = self._live_validators.get(gameweek_num, {})
+        if validators.get('ETag'):
+            headers['If-None-Match'] = validators['ETag']
+        if validators.get('Last-Modified'):
+            headers['If-Modified-Since'] = validators['Last-Modified']
+
+        try:
+            with metrics.external_call('fpl', 'event-live'):
+                resp = self.http.get(f"{FPL_BASE}/event/{gameweek_num}/live/", headers=headers, timeout=10)
+                if resp.status_code == 304:
+                    return None
+                resp.raise_for_status()
+            elements = resp.json().get('elements', [])
+        except Exception as e:
+            logger.error("Error fetching live data from FPL API: %s", e, extra={'gameweek': gameweek_num})
+            return None
+
+        self._pending_validators[gameweek_num] = {
+            key: resp.headers.get(key) for key in ('ETag', 'Last-Modified') if resp.headers.get(key)
+        }
+        return {
+            element['id']: element.get('stats', {}).get('goals_scored', 0)
+            for element in elements
+        }
+
+    def confirm_live_goals(self, gameweek_num):
+        """Mark the last feed read for a gameweek as applied: later polls may get a 304 for it"""
+        validators = self._pending_validators.pop(gameweek_num, None)
+        if validators is not None:
+            self._live_validators[gameweek_num] = validators
+
+    def get_fixtures_for_gameweek(self, gameweek_num, max_age=FIXTURES_TTL):
         """Return a list of fixture dicts for the given gameweek.
 
-        Results are cached for FIXTURES_TTL seconds. On any API error this
-        returns an empty list.
+        Results are cached for `max_age` seconds (the live scheduler asks for
+        fresher match states). On any API error this returns an empty list.
         """
-        now = time.monotonic()
-        cached = self._fixtures_cache.get(gameweek_num)
-        if cached and (now - cached[0]) < FIXTURES_TTL:
-            return cached[1]
+        if self.fixtures_fresh(gameweek_num, max_age):
+            return self._fixtures_cache[gameweek_num][1]
 
         try:
-            teams = self._get_team_map()
-            resp = requests.get(
-                f"{FPL_BASE}/fixtures/",
-                params={'event': gameweek_num},
-                timeout=10,
-            )
-            resp.raise_for_status()
+            teams = self.get_team_map()
+            with metrics.external_call('fpl', 'fixtures'):
+                resp = self.http.get(
+                    f"{FPL_BASE}/fixtures/",
+                    params={'event': gameweek_num},
+                    timeout=10,
+                )
+                resp.raise_for_status()
             raw_fixtures = resp.json()
         except Exception as e:
-            print(f"Error fetching fixtures from FPL API: {e}")
+            logger.error("Error fetching fixtures from FPL API: %s", e)
             return []
 
+        return self.store_fixtures(gameweek_num, raw_fixtures, teams)
+
+    def fixtures_fresh(self, gameweek_num, max_age=FIXTURES_TTL):
+        cached = self._fixtures_cache.get(gameweek_num)
+        return bool(cached) and (time.monotonic() - cached[0]) < max_age
+
+    def store_fixtures(self, gameweek_num, raw_fixtures, teams):
+        """Parse and cache a fixtures/?event= payload; returns the fixture dicts"""
         uk_tz = get_uk_timezone()
         fixtures = []
         for f in raw_fixtures:
@@ -68,6 +142,7 @@ class FixtureService:
                 time_str = dt_uk.strftime('%H:%M')
             else:
                 # Fixture scheduled but kickoff not yet confirmed
+                dt_uk = None
                 date_str = ''
                 time_str = 'TBC'
 
@@ -78,10 +153,15 @@ class FixtureService:
                 'home_team': teams.get(f.get('team_h'), '?'),
                 'away_team': teams.get(f.get('team_a'), '?'),
                 'status': 'Finished' if f.get('finished') else 'Scheduled',
+                # Match state for the live polling schedule (naive UK time, like the gameweek schedule)
+                'kickoff': dt_uk.replace(tzinfo=None) if dt_uk else None,
+                'started': bool(f.get('started')),
+                'finished_provisional': bool(f.get('finished_provisional') or f.get('finished')),
+                'finished': bool(f.get('finished')),
             })
 
         fixtures.sort(key=lambda x: f"{x['date']} {x['time']}")
-        self._fixtures_cache[gameweek_num] = (now, fixtures)
+        self._fixtures_cache[gameweek_num] = (time.monotonic(), fixtures)
         return fixtures
 
     def format_fixtures_message(self, gameweek_num):
@@ -91,7 +171,15 @@ class FixtureService:
         if not fixtures:
             return f"No fixtures found for Gameweek {gameweek_num}"
 
-        message = ""
+        # Fixtures only change when they are re-fetched, so the fetch time versions the text
+        cached = self._fixtures_cache.get(gameweek_num)
+        version = cached[0] if cached else None
+        return self.render_cache.get_or_render(
+            'fixtures', gameweek_num, version, lambda: self._render_fixtures(fixtures)
+        )
+
+    def _render_fixtures(self, fixtures):
+        lines = []
 
         current_date = ""
         for fixture in fixtures:
@@ -102,16 +190,15 @@ class FixtureService:
                 # Format date nicely
                 try:
                     date_obj = datetime.strptime(fixture_date, '%Y-%m-%d')
-                    formatted_date = date_obj.strftime('%A, %d %B')
-                    message += f"{formatted_date}\n"
+                    lines.append(date_obj.strftime('%A, %d %B'))
                 except ValueError:
-                    message += f"{fixture_date}\n"
+                    lines.append(fixture_date)
 
             # Add fixture
             time_str = fixture['time']
             home = fixture['home_team']
             away = fixture['away_team']
 
-            message += f"{time_str} - {home} vs {away}\n"
+            lines.append(f"{time_str} - {home} vs {away}")
 
-        return message
+        return "\n".join(lines) + "\n"
@@ -1,10 +1,35 @@
+import logging
+import re
+
 from config.settings import USER_MAP
+from services.competition import PREMIER_LEAGUE, ScoreCache
+from services.sheets_quota import SheetsBusyError
 from services.sheets_service import SheetsService
-from utils.date_utils import format_deadline
+from services.standings_service import StandingsService
+from utils.date_utils import format_deadline, get_closed_gameweeks
+from utils.metrics import metrics
+from utils.render_cache import RenderCache, Uncached
+
+logger = logging.getLogger(__name__)
+
+GOALS = PREMIER_LEAGUE.rule('goal')
+# Points for a goal by a player `pickers` users picked
+pick_multiplier = GOALS.multiplier
+
+def count_pickers(all_picks):
+    """How many users picked each player (title case), counted once per user"""
+    pickers_per_player = {}
+    for phone, pick_data in all_picks.items():
+        for player_normalized in {p.strip().title() for p in pick_data['players']}:
+            pickers_per_player[player_normalized] = pickers_per_player.get(player_normalized, 0) + 1
+    return pickers_per_player
 
 class GameweekService:
-    def __init__(self):
-        self.sheets_service = SheetsService()
+    def __init__(self, sheets_service=None):
+        self.sheets_service = sheets_service or SheetsService()
+        self.standings_service = StandingsService(self.sheets_service)
+        self.render_cache = RenderCache()
+        self.score_caches = {}      # {gameweek: ScoreCache of each user's scored picks}
         self.user_map = USER_MAP
 
     def process_admin_command(self, message_body, gameweek_num):
@@ -82,11 +107,16 @@ class GameweekService:
                     "• reinstate [user] - Reinstate eliminated user\n"
                     "• leaderboard - Show simple leaderboard\n"
                     "• leaderboard detail - Show detailed leaderboard\n"
+                    "• projection - Who can still win this gameweek\n"
                     "• show active - Show win/lose status\n"
                     "• show scorers - List all players who scored\n"
                     "• show unique - Show unique picks (1 picker only)\n"
                     "• summary/picks - Show all picks\n"
-                    "• fixtures - Show fixtures\n\n"
+                    "• fixtures - Show fixtures\n"
+                    "• season - Season table across all gameweeks\n"
+                    "• form last 5 - Points over recent gameweeks\n"
+                    "• h2h [user] [user] - Head-to-head record\n"
+                    "• more / page 2 - Next part of a long reply\n\n"
                     "Example: goal Mohamed Salah")
         
         # Show all scorers for the gameweek
@@ -97,8 +127,9 @@ class GameweekService:
                     return "❌ Could not connect to sheet"
                 
                 try:
-                    scores_sheet = sheet.spreadsheet.worksheet("Player Scores")
-                    scores_records = scores_sheet.get_all_records()
+                    scores_records = self.sheets_service.get_player_score_records()
+                    if scores_records is None:
+                        return "No scoring data recorded yet. Use 'goal [player]' to add."
                     
                     scorers = []
                     non_scorers = []
@@ -200,234 +231,288 @@ class GameweekService:
         
         return None
     
+    def get_leaderboard(self, gameweek_num, detailed=False):
+        """Leaderboard text for a gameweek (as for the 'leaderboard' admin command)"""
+        return self._generate_leaderboard(gameweek_num, detailed)
+    
     def _generate_leaderboard(self, gameweek_num, detailed=False):
         """Generate leaderboard with weighted scoring"""
         try:
-            # Get all picks for this gameweek
-            all_picks = self.sheets_service.get_all_picks_for_gameweek(gameweek_num)
-            if not all_picks:
-                return "No picks found for this gameweek."
-            
-            # Get scoring data
-            sheet = self.sheets_service.get_google_sheet()
-            if not sheet:
-                return "❌ Could not connect to sheet"
-            
-            try:
-                scores_sheet = sheet.spreadsheet.worksheet("Player Scores")
-                scores_records = scores_sheet.get_all_records()
-            except:
-                return "No scoring data recorded yet."
+            command = 'leaderboard detail' if detailed else 'leaderboard'
+            return self.render_cache.get_or_render(
+                command, gameweek_num, self.sheets_service.data_version(),
+                lambda: self._render_leaderboard(gameweek_num, detailed)
+            )
+        except Exception as e:
+            return f"❌ Error generating leaderboard: {str(e)}"
+    
+    def _render_leaderboard(self, gameweek_num, detailed):
+        """Build the leaderboard text (error replies are never memoized)"""
+        user_scores, error = self.calculate_user_scores(gameweek_num)
+        if error:
+            return Uncached(error)
+        
+        # Keep the season standings' live gameweek in step with every leaderboard
+        self.standings_service.record_gameweek(gameweek_num, user_scores)
+        
+        # Generate leaderboard message
+        if detailed:
+            return self._format_detailed_leaderboard(gameweek_num, user_scores)
+        else:
+            return self._format_simple_leaderboard(gameweek_num, user_scores)
+    
+    def calculate_user_scores(self, gameweek_num):
+        """Weighted scores for every user with picks, sorted best first.
+        
+        Returns (user_scores, None) or (None, message) when there is nothing to score.
+        """
+        # Picks and Player Scores in one round trip
+        self.sheets_service.prefetch_gameweek_records(gameweek_num)
+        all_picks = self.sheets_service.get_all_picks_for_gameweek(gameweek_num)
+        if not all_picks:
+            return None, "No picks found for this gameweek."
+        
+        # Get scoring data
+        sheet = self.sheets_service.get_google_sheet()
+        if not sheet:
+            return None, "❌ Could not connect to sheet"
+        
+        try:
+            scores_records = self.sheets_service.get_player_score_records()
+        except SheetsBusyError:
+            raise
+        except:
+            scores_records = None
+        if scores_records is None:
+            return None, "No scoring data recorded yet."
             
-            # Build scorer data with goal counts
-            scorer_goals = {}
-            for record in scores_records:
-                if str(record.get('Gameweek')) == str(gameweek_num):
-                    player = record.get('Player', '').strip().title()
-                    scored = record.get('Scored', '').strip().lower() == 'yes'
-                    if scored:
-                        # For now, assume 1 goal per scored player (can be extended later)
-                        scorer_goals[player] = 1
+        # Build scorer data with goal counts
+        scorer_goals = {}
+        for record in scores_records:
+            if str(record.get('Gameweek')) == str(gameweek_num):
+                player = record.get('Player', '').strip().title()
+                scored = record.get('Scored', '').strip().lower() == 'yes'
+                if scored:
+                    # For now, assume 1 goal per scored player (can be extended later)
+                    scorer_goals[player] = 1
+        
+        pickers_per_player = count_pickers(all_picks)
+        
+        def score_user(phone):
+            total_score = 0
+            player_breakdown = []
             
-            # Calculate scores for each user
-            user_scores = []
-            for phone, pick_data in all_picks.items():
-                user_name = pick_data['user_name']
-                players = pick_data['players']
-                
-                total_score = 0
-                player_breakdown = []
+            for player in all_picks[phone]['players']:
+                player_normalized = player.strip().title()
+                goals = scorer_goals.get(player_normalized, 0)
                 
-                for player in players:
-                    player_normalized = player.strip().title()
-                    goals = scorer_goals.get(player_normalized, 0)
+                if goals > 0:
+                    # Apply weighted scoring formula
+                    multiplier = GOALS.multiplier(pickers_per_player[player_normalized])
+                    points = GOALS.points(goals, pickers_per_player[player_normalized])
+                    total_score += points
                     
-                    if goals > 0:
-                        # Calculate how many other users picked this player
-                        other_pickers = sum(1 for other_phone, other_pick in all_picks.items() 
-                                          if other_phone != phone and 
-                                          any(p.strip().title() == player_normalized for p in other_pick['players']))
-                        
-                        # Apply weighted scoring formula
-                        multiplier = max(0.1, 1 - 0.1 * other_pickers)
-                        points = goals * multiplier
-                        total_score += points
-                        
-                        player_breakdown.append({
-                            'player': player_normalized,
-                            'goals': goals,
-                            'multiplier': multiplier,
-                            'points': points
-                        })
-                
-                user_scores.append({
-                    'name': user_name,
-                    'total_score': total_score,
-                    'breakdown': player_breakdown
-                })
-            
-            # Sort by total score (descending)
-            user_scores.sort(key=lambda x: x['total_score'], reverse=True)
-            
-            # Generate leaderboard message
-            if detailed:
-                return self._format_detailed_leaderboard(gameweek_num, user_scores)
-            else:
-                return self._format_simple_leaderboard(gameweek_num, user_scores)
-                
-        except Exception as e:
-            return f"❌ Error generating leaderboard: {str(e)}"
+                    player_breakdown.append({
+                        'player': player_normalized,
+                        'goals': goals,
+                        'multiplier': multiplier,
+                        'points': points
+                    })
+            return total_score, player_breakdown
+        
+        # A user is rescored only when one of their players scores or changes popularity
+        dependencies = {('pickers', player): count for player, count in pickers_per_player.items()}
+        dependencies.update({('goals', player): goals for player, goals in scorer_goals.items()})
+        items = []
+        for phone, pick_data in all_picks.items():
+            players = {p.strip().title() for p in pick_data['players']}
+            depends_on = {('goals', player) for player in players} | {('pickers', player) for player in players}
+            items.append((phone, tuple(pick_data['players']), depends_on))
+        scores = self.score_caches.setdefault(gameweek_num, ScoreCache()).refresh(items, dependencies, score_user)
+        
+        user_scores = [
+            {'name': pick_data['user_name'], 'total_score': scores[phone][0], 'breakdown': scores[phone][1]}
+            for phone, pick_data in all_picks.items()
+        ]
+        
+        # Sort by total score (descending)
+        user_scores.sort(key=lambda x: x['total_score'], reverse=True)
+        return user_scores, None
     
     def _format_simple_leaderboard(self, gameweek_num, user_scores):
         """Format simple leaderboard view"""
-        message = f"🏆 LEADERBOARD\n\n"
+        lines = ["🏆 LEADERBOARD", ""]
         
         for i, user_score in enumerate(user_scores, 1):
             score_str = f"{user_score['total_score']:.1f}" if user_score['total_score'] > 0 else "0.0"
-            message += f"{i}. {user_score['name']} — {score_str} pts\n"
+            lines.append(f"{i}. {user_score['name']} — {score_str} pts")
         
-        return message
+        return "\n".join(lines) + "\n"
     
     def _format_detailed_leaderboard(self, gameweek_num, user_scores):
         """Format detailed leaderboard view"""
-        message = f"🏆 LEADERBOARD (DETAILED)\n\n"
+        lines = ["🏆 LEADERBOARD (DETAILED)", ""]
         
         for i, user_score in enumerate(user_scores, 1):
             score_str = f"{user_score['total_score']:.1f}" if user_score['total_score'] > 0 else "0.0"
-            message += f"{i}. {user_score['name']} — {score_str} pts\n"
+            lines.append(f"{i}. {user_score['name']} — {score_str} pts")
             
             for breakdown in user_score['breakdown']:
-                message += f"   ⚽ {breakdown['player']} ({breakdown['goals']}g × {breakdown['multiplier']:.1f}) = {breakdown['points']:.1f}\n"
+                lines.append(f"   ⚽ {breakdown['player']} ({breakdown['goals']}g × {breakdown['multiplier']:.1f}) = {breakdown['points']:.1f}")
             
             if not user_score['breakdown']:
-                message += "   No scorers yet\n"
+                lines.append("   No scorers yet")
             
-            message += "\n"
+            lines.append("")
         
-        return message
+        return "\n".join(lines) + "\n"
+    
+    def _pick_index(self, all_picks):
+        """Map each picked player (title case) to the names of the users who picked them"""
+        player_pickers = {}
+        for phone, pick_data in all_picks.items():
+            user_name = pick_data['user_name']
+            for player in pick_data['players']:
+                player_normalized = player.strip().title()
+                if player_normalized:
+                    player_pickers.setdefault(player_normalized, []).append(user_name)
+        return player_pickers
     
     def get_player_weightings(self, gameweek_num):
         """Show weightings for all picked players, sorted by weight (ascending)"""
         try:
-            # Get all picks for this gameweek
-            all_picks = self.sheets_service.get_all_picks_for_gameweek(gameweek_num)
-            if not all_picks:
-                return "No picks found for this gameweek."
-            
-            # Count how many times each player was picked and track who picked them
-            player_pick_data = {}
-            total_pickers = len(all_picks)
-            
-            for phone, pick_data in all_picks.items():
-                user_name = pick_data['user_name']
-                players = pick_data['players']
-                for player in players:
-                    player_normalized = player.strip().title()
-                    if player_normalized:
-                        if player_normalized not in player_pick_data:
-                            player_pick_data[player_normalized] = {
-                                'count': 0,
-                                'pickers': []
-                            }
-                        player_pick_data[player_normalized]['count'] += 1
-                        player_pick_data[player_normalized]['pickers'].append(user_name)
-            
-            if not player_pick_data:
-                return "No players have been picked yet."
-            
-            # Calculate weightings for each player
-            player_weightings = []
-            for player, data in player_pick_data.items():
-                pick_count = data['count']
-                pickers = data['pickers']
-                
-                # Skip players with only 1 pick
-                if pick_count == 1:
-                    continue
-                    
-                # For weighting calculation, we use other_pickers (exclude the current picker)
-                # Since we want to show the weight any individual picker would get
-                other_pickers = pick_count - 1  # Subtract 1 for the picker themselves
-                weight = max(0.1, 1 - 0.1 * other_pickers)
-                player_weightings.append({
-                    'player': player,
-                    'pick_count': pick_count,
-                    'weight': weight,
-                    'pickers': pickers
-                })
-            
-            # Sort by weight (ascending - least popular first)
-            player_weightings.sort(key=lambda x: x['weight'])
-            
-            # Build the message
-            message = f"📊 PLAYER WEIGHTINGS (GW{gameweek_num})\n"
-            message += "=" * 25 + "\n\n"
-            
-            for item in player_weightings:
-                weight = item['weight']
-                player = item['player']
-                pickers = ', '.join(item['pickers'])
-                
-                message += f"{weight:.1f} — *{player}* ({pickers})\n"
-            
-            return message
-                
+            return self.render_cache.get_or_render(
+                'weights', gameweek_num, self.sheets_service.data_version(),
+                lambda: self._render_player_weightings(gameweek_num)
+            )
         except Exception as e:
             return f"❌ Error getting player weightings: {str(e)}"
     
+    def _render_player_weightings(self, gameweek_num):
+        # Get all picks for this gameweek
+        all_picks = self.sheets_service.get_all_picks_for_gameweek(gameweek_num)
+        if not all_picks:
+            return Uncached("No picks found for this gameweek.")
+        
+        # Track who picked each player
+        player_pickers = self._pick_index(all_picks)
+        if not player_pickers:
+            return Uncached("No players have been picked yet.")
+        
+        # Calculate weightings for each player
+        player_weightings = []
+        for player, pickers in player_pickers.items():
+            pick_count = len(pickers)
+            
+            # Skip players with only 1 pick
+            if pick_count == 1:
+                continue
+                
+            # The weight any individual picker would get
+            weight = pick_multiplier(pick_count)
+            player_weightings.append({
+                'player': player,
+                'pick_count': pick_count,
+                'weight': weight,
+                'pickers': pickers
+            })
+        
+        # Sort by weight (ascending - least popular first)
+        player_weightings.sort(key=lambda x: x['weight'])
+        
+        # Build the message
+        lines = [f"📊 PLAYER WEIGHTINGS (GW{gameweek_num})", "=" * 25, ""]
+        
+        for item in player_weightings:
+            lines.append(f"{item['weight']:.1f} — *{item['player']}* ({', '.join(item['pickers'])})")
+        
+        return "\n".join(lines) + "\n"
+    
     def _show_unique_picks(self, gameweek_num):
         """Show players that were picked by only one person"""
         try:
-            # Get all picks for this gameweek
-            all_picks = self.sheets_service.get_all_picks_for_gameweek(gameweek_num)
-            if not all_picks:
-                return "No picks found for this gameweek."
-            
-            # Count how many times each player was picked and track who picked them
-            player_pick_data = {}
-            
-            for phone, pick_data in all_picks.items():
-                user_name = pick_data['user_name']
-                players = pick_data['players']
-                for player in players:
-                    player_normalized = player.strip().title()
-                    if player_normalized:
-                        if player_normalized not in player_pick_data:
-                            player_pick_data[player_normalized] = {
-                                'count': 0,
-                                'pickers': []
-                            }
-                        player_pick_data[player_normalized]['count'] += 1
-                        player_pick_data[player_normalized]['pickers'].append(user_name)
-            
-            if not player_pick_data:
-                return "No players have been picked yet."
-            
-            # Filter for unique picks (count == 1)
-            unique_picks = []
-            for player, data in player_pick_data.items():
-                if data['count'] == 1:
-                    unique_picks.append({
-                        'player': player,
-                        'picker': data['pickers'][0]  # Only one picker
-                    })
-            
-            if not unique_picks:
-                return f"🔍 No unique picks found for Gameweek {gameweek_num}.\nAll players were picked by multiple people."
-            
-            # Sort by player name
-            unique_picks.sort(key=lambda x: x['player'])
-            
-            # Build the message
-            message = f"🎯 UNIQUE PICKS (GW{gameweek_num})\n"
-            message += "=" * 25 + "\n\n"
-            
-            for item in unique_picks:
-                player = item['player']
-                picker = item['picker']
-                message += f"*{player}* — {picker}\n"
-            
-            return message
-            
+            return self.render_cache.get_or_render(
+                'unique', gameweek_num, self.sheets_service.data_version(),
+                lambda: self._render_unique_picks(gameweek_num)
+            )
         except Exception as e:
-            return f"❌ Error getting unique picks: {str(e)}"
\ No newline at end of file
+            return f"❌ Error getting unique picks: {str(e)}"
+    
+    def _render_unique_picks(self, gameweek_num):
+        # Get all picks for this gameweek
+        all_picks = self.sheets_service.get_all_picks_for_gameweek(gameweek_num)
+        if not all_picks:
+            return Uncached("No picks found for this gameweek.")
+        
+        # Track who picked each player
+        player_pickers = self._pick_index(all_picks)
+        if not player_pickers:
+            return Uncached("No players have been picked yet.")
+        
+        # Filter for unique picks (only one picker), sorted by player name
+        unique_picks = sorted(
+            (player, pickers[0]) for player, pickers in player_pickers.items() if len(pickers) == 1
+        )
+        
+        if not unique_picks:
+            return f"🔍 No unique picks found for Gameweek {gameweek_num}.\nAll players were picked by multiple people."
+        
+        # Build the message
+        lines = [f"🎯 UNIQUE PICKS (GW{gameweek_num})", "=" * 25, ""]
+        
+        for player, picker in unique_picks:
+            lines.append(f"*{player}* — {picker}")
+        
+        return "\n".join(lines) + "\n"
+    
+    def process_season_command(self, message_body, gameweek_num):
+        """Season-scope commands (season table, form, head-to-head). Returns None if not one."""
+        message_lower = message_body.lower().strip()
+        
+        if message_lower in ['season', 'season table', 'table', 'standings']:
+            self._ensure_live_standings(gameweek_num)
+            return self.standings_service.format_season_table()
+        
+        form_match = re.match(r'^form(?: last (\d+))?$', message_lower)
+        if form_match:
+            self._ensure_live_standings(gameweek_num)
+            last_n = int(form_match.group(1)) if form_match.group(1) else 5
+            return self.standings_service.format_form(max(1, last_n))
+        
+        h2h_match = re.match(r'^(?:h2h|head-to-head|head to head) (.+)$', message_body.strip(), re.IGNORECASE)
+        if h2h_match:
+            names = re.split(r'\s+vs\s+|\s+', h2h_match.group(1).strip(), maxsplit=1, flags=re.IGNORECASE)
+            if len(names) != 2:
+                return "Please specify two users (e.g., 'h2h Peter Sam')"
+            self._ensure_live_standings(gameweek_num)
+            return self.standings_service.format_head_to_head(names[0], names[1])
+        
+        return None
+    
+    def _ensure_live_standings(self, gameweek_num):
+        """Score the open gameweek once if no leaderboard has been generated for it yet"""
+        if self.standings_service.has_gameweek(gameweek_num):
+            return
+        user_scores, error = self.calculate_user_scores(gameweek_num)
+        if not error:
+            self.standings_service.record_gameweek(gameweek_num, user_scores)
+    
+    def close_finished_gameweeks(self):
+        """Gameweek rollover: finalize season scores, then archive the picks"""
+        for gameweek_num in get_closed_gameweeks():
+            try:
+                if not self.standings_service.is_finalized(gameweek_num):
+                    user_scores, error = self.calculate_user_scores(gameweek_num)
+                    if error:
+                        logger.warning("Not finalizing GW%s standings: %s", gameweek_num, error,
+                                       extra={'gameweek': gameweek_num})
+                    else:
+                        self.standings_service.finalize_gameweek(gameweek_num, user_scores)
+            except Exception as e:
+                logger.error("Error finalizing GW%s: %s", gameweek_num, e, extra={'gameweek': gameweek_num})
+        
+        self.sheets_service.archive_closed_gameweeks()
+
+
+# Time every public method (bot_method_seconds{component="gameweek_service"})
+metrics.instrument_class(GameweekService, 'gameweek_service')
@@ -0,0 +1,136 @@
+import logging
+import re
+import unicodedata
+
+from config.settings import ADMIN_PHONE
+from services.sheets_quota import SheetsBusyError
+from utils.player_names import FPL_NAME_ALIASES
+
+logger = logging.getLogger(__name__)
+
+# Letters NFKD doesn't decompose to ASCII (Ødegaard, Højlund...)
+_LETTER_FOLDS = str.maketrans({'ø': 'o', 'Ø': 'O', 'æ': 'ae', 'Æ': 'AE', 'ß': 'ss', 'ł': 'l', 'Ł': 'L', 'đ': 'd', 'Đ': 'D'})
+
+
+def normalize_name(name):
+    """Lowercase ASCII letters only: 'B. Fernandes', 'B.Fernandes' and 'b fernandes' all match"""
+    ascii_name = unicodedata.normalize('NFKD', name.translate(_LETTER_FOLDS)).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z]', '', ascii_name.lower())
+
+
+_ALIASES = {normalize_name(alias): normalize_name(fpl_name) for alias, fpl_name in FPL_NAME_ALIASES.items()}
+
+
+class FplPlayerIndex:
+    """Resolves the free-text names in picks to FPL player ids.
+
+    A name matches a player's web_name first, then their surname, full name
+    or initial + surname. A name that matches more than one player at the
+    same level is left unresolved rather than guessed.
+    """
+
+    def __init__(self, players):
+        self._by_web_name = {}
+        self._by_other = {}
+        for player_id, player in players.items():
+            first = player.get('first_name', '')
+            second = player.get('second_name', '')
+            self._by_web_name.setdefault(normalize_name(player.get('web_name', '')), set()).add(player_id)
+            keys = {
+                normalize_name(second),
+                normalize_name(f"{first} {second}"),
+                normalize_name(f"{first[:1]} {second}"),
+                normalize_name(f"{first.split()[0] if first else ''} {second.split()[-1] if second else ''}"),
+            }
+            for key in keys - {''}:
+                self._by_other.setdefault(key, set()).add(player_id)
+
+    def resolve(self, name):
+        key = normalize_name(name)
+        key = _ALIASES.get(key, key)
+        for index in (self._by_web_name, self._by_other):
+            ids = index.get(key, set())
+            if len(ids) == 1:
+                return next(iter(ids))
+            if ids:
+                return None
+        return None
+
+
+class LiveScoresService:
+    """Marks scorers automatically from the FPL event-live feed.
+
+    Each poll is one conditional request; when the feed has changed, the
+    goals of every picked player are compared with the scorers already in
+    Player Scores and only the new ones are written, in one batch
+    (SheetsService.apply_player_scores). The admin then gets a single
+    updated leaderboard. Scorers are only ever added, and a player who
+    already has a Player Scores row for the gameweek is never touched, so
+    manual corrections ('0 [player]') stick.
+    """
+
+    def __init__(self, sheets_service, gameweek_service, message_service, fixture_service):
+        self.sheets_service = sheets_service
+        self.gameweek_service = gameweek_service
+        self.message_service = message_service
+        self.fixture_service = fixture_service
+        self._index = None
+        self._index_players = None
+
+    def _player_index(self):
+        players = self.fixture_service.get_players()
+        if players is not self._index_players:
+            self._index = FplPlayerIndex(players or {})
+            self._index_players = players
+        return self._index
+
+    def _decided_players(self, gameweek_num):
+        """Players with a Player Scores row (Yes or No) for the gameweek"""
+        records = self.sheets_service.get_player_score_records() or []
+        return {
+            str(record.get('Player', '')).strip().title()
+            for record in records
+            if str(record.get('Gameweek')) == str(gameweek_num)
+        }
+
+    def poll(self, gameweek_num):
+        """Apply any new scorers for a gameweek; returns the player names newly marked"""
+        goals = self.fixture_service.get_live_goals(gameweek_num)
+        if not goals:
+            return []
+
+        try:
+            picks = self.sheets_service.get_all_picks_for_gameweek(gameweek_num)
+            picked = {player.strip().title() for data in picks.values() for player in data['players']}
+            index = self._player_index()
+
+            scorers = set()
+            for name in picked:
+                player_id = index.resolve(name)
+                if player_id is None:
+                    logger.debug("No unique FPL player for pick '%s'", name, extra={'gameweek': gameweek_num})
+                elif goals.get(player_id, 0) > 0:
+                    scorers.add(name)
+
+            new_scorers = sorted(scorers - self._decided_players(gameweek_num))
+            if not new_scorers:
+                self.fixture_service.confirm_live_goals(gameweek_num)
+                return []
+
+            success, msg = self.sheets_service.apply_player_scores(gameweek_num, new_scorers)
+            if not success:
+                logger.error("Live goals not applied: %s", msg, extra={'gameweek': gameweek_num})
+                return []
+        except SheetsBusyError as e:
+            # The feed isn't confirmed, so the next poll fetches it in full and retries
+            logger.warning("Sheets busy, live goals deferred: %s", e, extra={'gameweek': gameweek_num})
+            return []
+
+        self.fixture_service.confirm_live_goals(gameweek_num)
+
+        logger.info("Live goals applied: %s", ', '.join(new_scorers), extra={'gameweek': gameweek_num})
+        leaderboard = self.gameweek_service.get_leaderboard(gameweek_num)
+        message = f"⚽ LIVE: {', '.join(new_scorers)} scored!\n\n{leaderboard}"
+        self.message_service.outbound.send(f'whatsapp:{ADMIN_PHONE}', message)
+        return new_scorers
+
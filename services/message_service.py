@@ -1,14 +1,22 @@
+import logging
+
 from twilio.rest import Client
 from datetime import datetime, timedelta
-from config.settings import USER_MAP, ADMIN_PHONE, TWILIO_FROM_NUMBER
+from config.settings import USER_MAP, ADMIN_PHONE
+from services.outbound_queue import OutboundQueue
 from services.sheets_service import SheetsService
 from utils.date_utils import get_uk_timezone, get_current_gameweek
+from utils.render_cache import RenderCache
 from config.settings import GAMEWEEK_SCHEDULE
 
+logger = logging.getLogger(__name__)
+
 class MessageService:
-    def __init__(self, twilio_client):
+    def __init__(self, twilio_client, sheets_service=None):
         self.twilio_client = twilio_client
-        self.sheets_service = SheetsService()
+        self.outbound = OutboundQueue(twilio_client)
+        self.sheets_service = sheets_service or SheetsService()
+        self.render_cache = RenderCache()
         self.user_map = USER_MAP
 
     def send_deadline_summary(self, gameweek_num=None):
@@ -33,42 +41,47 @@ class MessageService:
                 if gameweek_num is None:
                     gameweek_num, _ = get_current_gameweek()
                     if not gameweek_num:
-                        print("No active or recent gameweek found")
+                        logger.info("No active or recent gameweek found")
                         return
             
-            # Get all submitted picks
-            submitted_picks = self.sheets_service.get_all_picks_for_gameweek(gameweek_num)
-            
-            # Build the summary message
-            message = f"📊 GAMEWEEK {gameweek_num} FINAL PICKS\n"
-            message += "=" * 25 + "\n\n"
-            
-            # Track who hasn't submitted
-            users_without_picks = []
-            
-            # Check all users in USER_MAP
-            for phone, name in self.user_map.items():
-                if phone in submitted_picks:
-                    # User submitted picks
-                    picks = submitted_picks[phone]['players']
-                    message += f"✅ {name}: {', '.join(picks)}\n"
-                else:
-                    # User didn't submit
-                    users_without_picks.append(name)
-            
-            # Add section for users who didn't submit
-            if users_without_picks:
-                message += "\n❌ NO PICKS SUBMITTED:\n"
-                for name in users_without_picks:
-                    message += f"  • {name}\n"
-                message += "\n"
-            
-            # Send to admin
-            self.twilio_client.messages.create(
-                body=message,
-                from_=TWILIO_FROM_NUMBER,
-                to=f'whatsapp:{ADMIN_PHONE}'
+            message = self.render_cache.get_or_render(
+                'summary', gameweek_num, self.sheets_service.data_version(),
+                lambda: self._render_deadline_summary(gameweek_num)
             )
             
+            # Send to admin (split into ordered parts if it's over the WhatsApp limit)
+            self.outbound.send(f'whatsapp:{ADMIN_PHONE}', message)
+            
         except Exception as e:
-            print(f"Error sending deadline summary: {e}")
\ No newline at end of file
+            logger.error("Error sending deadline summary: %s", e)
+
+    def _render_deadline_summary(self, gameweek_num):
+        """Build the picks summary text for a gameweek"""
+        # Get all submitted picks
+        submitted_picks = self.sheets_service.get_all_picks_for_gameweek(gameweek_num)
+        
+        # Build the summary message
+        lines = [f"📊 GAMEWEEK {gameweek_num} FINAL PICKS", "=" * 25, ""]
+        
+        # Track who hasn't submitted
+        users_without_picks = []
+        
+        # Check all users in USER_MAP
+        for phone, name in self.user_map.items():
+            if phone in submitted_picks:
+                # User submitted picks
+                picks = submitted_picks[phone]['players']
+                lines.append(f"✅ {name}: {', '.join(picks)}")
+            else:
+                # User didn't submit
+                users_without_picks.append(name)
+        
+        # Add section for users who didn't submit
+        if users_without_picks:
+            lines.append("")
+            lines.append("❌ NO PICKS SUBMITTED:")
+            for name in users_without_picks:
+                lines.append(f"  • {name}")
+            lines.append("")
+        
+        return "\n".join(lines) + "\n"
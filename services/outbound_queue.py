@@ -0,0 +1,63 @@
+import logging
+import queue
+import threading
+import time
+
+from config.settings import TWILIO_FROM_NUMBER
+from utils.logging_utils import phone_hash
+from utils.message_chunks import number_parts, split_message
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PART_DELAY = 1.0   # seconds between parts so WhatsApp delivers them in order
+
+
+class OutboundQueue:
+    """Sends outgoing WhatsApp messages one at a time from a background thread.
+
+    Long messages are split at line boundaries into numbered parts, which are
+    queued together so they go out in order.
+    """
+
+    def __init__(self, twilio_client, part_delay=PART_DELAY):
+        self.twilio_client = twilio_client
+        self.part_delay = part_delay
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def send(self, to, body):
+        """Queue a message (split into parts if needed) for `to`, a WhatsApp address"""
+        parts = number_parts(split_message(body))
+        for part in parts:
+            self._queue.put((to, part))
+        self._ensure_worker()
+        return len(parts)
+
+    def wait_until_sent(self):
+        """Block until everything queued so far has been sent (used by tests and tools)"""
+        self._queue.join()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='outbound-queue', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            to, body = self._queue.get()
+            try:
+                with metrics.external_call('twilio', 'send'):
+                    self.twilio_client.messages.create(
+                        body=body,
+                        from_=TWILIO_FROM_NUMBER,
+                        to=to
+                    )
+            except Exception as e:
+                logger.error("Error sending message: %s", e, extra={'phone': phone_hash(to.replace('whatsapp:', ''))})
+            finally:
+                self._queue.task_done()
+            if self.part_delay and not self._queue.empty():
+                time.sleep(self.part_delay)
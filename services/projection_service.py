@@ -0,0 +1,180 @@
+"""'Who can still win?' for the current gameweek, over the fixtures not yet finished.
+
+Only picked players whose team still has a match to finish can add to a
+score, each worth their pick multiplier (pick_multiplier) to everyone who
+picked them. Whether a user can still finish top is exact: their best case
+is every one of their remaining players scoring and nobody else's. Win
+chances come from sampling who scores, with NumPy; without NumPy the
+reply still has the maximums and who can still win.
+"""
+import logging
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from services.gameweek_service import count_pickers, pick_multiplier
+from services.live_scores_service import FplPlayerIndex
+
+logger = logging.getLogger(__name__)
+
+SCENARIOS = 20_000                 # sampled gameweeks for win chances (well inside the webhook budget)
+PROJECTION_FIXTURES_TTL = 300      # match states at most 5 minutes old
+POSITION_PRIORS = {1: 0.01, 2: 0.06, 3: 0.15, 4: 0.30}    # P(scores in a match) by FPL element_type
+DEFAULT_PRIOR = 0.10
+
+
+def scoring_chance(element, matches):
+    """Chance a player scores in `matches` more matches.
+
+    Uses their expected goals per 90 from bootstrap-static when FPL has
+    one, otherwise a prior for their position.
+    """
+    try:
+        expected_goals = float(element.get('expected_goals_per_90'))
+    except (TypeError, ValueError):
+        expected_goals = 0.0
+    if expected_goals > 0:
+        per_match = 1 - math.exp(-expected_goals)
+    else:
+        per_match = POSITION_PRIORS.get(element.get('element_type'), DEFAULT_PRIOR)
+    return 1 - (1 - per_match) ** matches
+
+
+def project(totals, remaining, weights, chances, scenarios=SCENARIOS, seed=None):
+    """Projection for users' current totals and remaining picked players.
+
+    totals: {user: points so far}; remaining: {user: set of players still
+    to play}; weights: {player: points per goal}; chances: {player: P(scores)}.
+    Returns {user: {'max', 'can_win', 'win'}}; 'win' is None without NumPy.
+    """
+    users = list(totals)
+    report = {}
+    for user in users:
+        best_case = remaining[user]
+        # Their players score, nobody else's: anyone ahead of them even then can't be caught
+        rivals = max(
+            (totals[other] + sum(weights[player] for player in remaining[other] & best_case)
+             for other in users if other != user),
+            default=0,
+        )
+        max_total = totals[user] + sum(weights[player] for player in best_case)
+        report[user] = {'max': max_total, 'can_win': max_total >= rivals - 1e-9, 'win': None}
+
+    players = sorted(set().union(*remaining.values())) if remaining else []
+    if np is None:
+        return report
+    if not players:
+        leaders = [user for user in users if totals[user] == max(totals.values())]
+        for user in users:
+            report[user]['win'] = 1 / len(leaders) if user in leaders else 0.0
+        return report
+
+    # points[u, j]: what player j scoring is worth to user u
+    points = np.array([[weights[player] if player in remaining[user] else 0.0 for player in players]
+                       for user in users])
+    rng = np.random.default_rng(seed)
+    scored = rng.random((scenarios, len(players))) < np.array([chances[player] for player in players])
+    outcome = np.array([totals[user] for user in users]) + scored @ points.T
+    leaders = np.isclose(outcome, outcome.max(axis=1, keepdims=True))
+    # A shared first place splits the win
+    wins = (leaders / leaders.sum(axis=1, keepdims=True)).mean(axis=0)
+    for i, user in enumerate(users):
+        report[user]['win'] = float(wins[i])
+    return report
+
+
+class ProjectionService:
+    def __init__(self, gameweek_service, fixture_service):
+        self.gameweek_service = gameweek_service
+        self.sheets_service = gameweek_service.sheets_service
+        self.fixture_service = fixture_service
+        self._index = None
+        self._index_players = None
+
+    def _player_index(self, players):
+        if players is not self._index_players:
+            self._index = FplPlayerIndex(players or {})
+            self._index_players = players
+        return self._index
+
+    def _matches_left(self, gameweek_num):
+        """{team name: fixtures not yet finished} for the gameweek"""
+        matches_left = {}
+        for fixture in self.fixture_service.get_fixtures_for_gameweek(gameweek_num, max_age=PROJECTION_FIXTURES_TTL):
+            if not fixture['finished_provisional']:
+                for team in (fixture['home_team'], fixture['away_team']):
+                    matches_left[team] = matches_left.get(team, 0) + 1
+        return matches_left
+
+    def get_projection(self, gameweek_num):
+        """'Who can still win' text for a gameweek"""
+        try:
+            return self._render_projection(gameweek_num)
+        except Exception as e:
+            logger.exception("Projection failed", extra={'gameweek': gameweek_num})
+            return f"❌ Error projecting the gameweek: {str(e)}"
+
+    def _render_projection(self, gameweek_num):
+        user_scores, error = self.gameweek_service.calculate_user_scores(gameweek_num)
+        if error:
+            return error
+        all_picks = self.sheets_service.get_all_picks_for_gameweek(gameweek_num)
+
+        # Players already settled either way ('goal' or '0') can't add anything
+        settled = {
+            str(record.get('Player', '')).strip().title()
+            for record in self.sheets_service.get_player_score_records() or []
+            if str(record.get('Gameweek')) == str(gameweek_num)
+        }
+
+        players = self.fixture_service.get_players() or {}
+        teams = self.fixture_service.get_team_map() or {}
+        index = self._player_index(players)
+        matches_left = self._matches_left(gameweek_num)
+
+        pickers_per_player = count_pickers(all_picks)
+        weights = {}
+        chances = {}
+        unmatched = set()
+        for player in pickers_per_player:
+            if player in settled:
+                continue
+            player_id = index.resolve(player)
+            if player_id is None:
+                unmatched.add(player)
+                continue
+            element = players[player_id]
+            left = matches_left.get(teams.get(element.get('team')), 0)
+            if left:
+                weights[player] = pick_multiplier(pickers_per_player[player])
+                chances[player] = scoring_chance(element, left)
+
+        totals = {user_score['name']: user_score['total_score'] for user_score in user_scores}
+        remaining = {
+            pick_data['user_name']: {p.strip().title() for p in pick_data['players']} & weights.keys()
+            for pick_data in all_picks.values()
+        }
+        report = project(totals, remaining, weights, chances)
+        return self._format_projection(gameweek_num, report, totals, len(weights), unmatched)
+
+    def _format_projection(self, gameweek_num, report, totals, players_left, unmatched):
+        lines = [f"🔮 GW{gameweek_num} — WHO CAN STILL WIN?", "=" * 25, ""]
+        ranked = sorted(report, key=lambda user: (-(report[user]['win'] or 0), -report[user]['max'], -totals[user]))
+        for user in ranked:
+            projection = report[user]
+            if not projection['can_win']:
+                lines.append(f"~{user} — {totals[user]:.1f} pts (max {projection['max']:.1f})~")
+                continue
+            chance = "" if projection['win'] is None else f" · {projection['win']:.0%}"
+            lines.append(f"{user} — {totals[user]:.1f} pts (max {projection['max']:.1f}){chance}")
+
+        lines.append("")
+        lines.append(f"{players_left} picked players still to play")
+        if report and next(iter(report.values()))['win'] is not None and players_left:
+            lines.append(f"Chances from {SCENARIOS:,} simulated gameweeks")
+        if unmatched:
+            lines.append(f"Not matched to an FPL player (left out): {', '.join(sorted(unmatched))}")
+        return "\n".join(lines) + "\n"
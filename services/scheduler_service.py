@@ -1,12 +1,50 @@
+import logging
+
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.date import DateTrigger
 from datetime import timedelta, datetime
-from config.settings import GAMEWEEK_SCHEDULE
-from utils.date_utils import get_uk_timezone
+from config.settings import GAMEWEEK_SCHEDULE, LIVE_POLL_INTERVAL
+from utils.date_utils import ROLLOVER_DELAY, get_current_gameweek, get_uk_timezone, is_deadline_passed, now_uk
+
+logger = logging.getLogger(__name__)
+
+# Live goal polling: fast while a match is on, otherwise asleep until the next kickoff
+MATCH_WINDOW = timedelta(minutes=135)     # kickoff to final whistle, stoppage time and half-time included
+POST_MATCH_POLL = 600                     # seconds between polls while results await confirmation
+IDLE_POLL = 6 * 3600                      # longest sleep, so moved kickoffs are picked up
+LIVE_FIXTURES_TTL = 300                   # how stale match states may be while polling
+
+
+def live_poll_plan(fixtures, now):
+    """Decide whether to poll the live feed now, and how many seconds until the next check.
+
+    Returns (poll_now, delay). delay is None once every fixture is `finished`
+    (results confirmed), i.e. nothing more can change for the gameweek.
+    Fixtures without a kickoff time (TBC) are ignored.
+    """
+    fixtures = [f for f in fixtures if f.get('kickoff')]
+    if not fixtures or all(f['finished'] for f in fixtures):
+        return False, None
+
+    in_progress = any(
+        not f['finished_provisional'] and (f['started'] or f['kickoff'] <= now < f['kickoff'] + MATCH_WINDOW)
+        for f in fixtures
+    )
+    if in_progress:
+        return True, LIVE_POLL_INTERVAL
+
+    upcoming = [f['kickoff'] for f in fixtures if not f['started'] and f['kickoff'] > now]
+    awaiting_confirmation = any(f['finished_provisional'] and not f['finished'] for f in fixtures)
+    if upcoming:
+        until_kickoff = max((min(upcoming) - now).total_seconds(), LIVE_POLL_INTERVAL)
+        delay = min(until_kickoff, POST_MATCH_POLL) if awaiting_confirmation else until_kickoff
+        return awaiting_confirmation, min(delay, IDLE_POLL)
+    return True, POST_MATCH_POLL
 
 class SchedulerService:
-    def __init__(self, message_service):
+    def __init__(self, message_service, gameweek_service=None):
         self.message_service = message_service
+        self.gameweek_service = gameweek_service
     
     def schedule_deadline_summaries(self):
         """Schedule summary messages for all gameweek deadlines"""
@@ -29,6 +67,72 @@ class SchedulerService:
                     id=f'gw_{gw_num}_summary',
                     name=f'Gameweek {gw_num} Summary'
                 )
-                print(f"Scheduled summary for GW{gw_num} at {summary_time}")
+                logger.info("Scheduled summary for GW%s at %s", gw_num, summary_time)
+        
+        return scheduler
+    
+    def schedule_gameweek_rollover(self, scheduler):
+        """Schedule each gameweek's rollover (final season scores + picks archive) after its end_time"""
+        uk_tz = get_uk_timezone()
+        now = datetime.now(uk_tz).replace(tzinfo=None)
         
-        return scheduler
\ No newline at end of file
+        # Catch up on any gameweeks that closed while the bot was down
+        scheduler.add_job(
+            self.gameweek_service.close_finished_gameweeks,
+            trigger=DateTrigger(run_date=datetime.now(uk_tz) + timedelta(minutes=1)),
+            id='rollover_catch_up',
+            name='Roll over closed gameweeks'
+        )
+        
+        for gw_num, start_date, deadline, end_time in GAMEWEEK_SCHEDULE:
+            rollover_time = end_time + ROLLOVER_DELAY
+            if rollover_time > now:
+                scheduler.add_job(
+                    self.gameweek_service.close_finished_gameweeks,
+                    trigger=DateTrigger(run_date=rollover_time, timezone=uk_tz),
+                    id=f'gw_{gw_num}_rollover',
+                    name=f'Gameweek {gw_num} Rollover'
+                )
+                logger.info("Scheduled rollover for GW%s at %s", gw_num, rollover_time)
+        
+        return scheduler
+    
+    def schedule_live_scores(self, scheduler, live_scores_service, fixture_service):
+        """Poll the FPL live feed only while the current gameweek's matches are being played.
+
+        Each run reschedules itself from the fixtures' kickoff times and match
+        states: every LIVE_POLL_INTERVAL seconds during a match, asleep until
+        the next kickoff between matches, and idle once all results are final.
+        """
+        self._schedule_live_poll(scheduler, live_scores_service, fixture_service, 60)
+        return scheduler
+
+    def _schedule_live_poll(self, scheduler, live_scores_service, fixture_service, delay):
+        run_date = get_uk_timezone().localize(now_uk() + timedelta(seconds=delay))
+        scheduler.add_job(
+            self._live_poll,
+            trigger=DateTrigger(run_date=run_date),
+            args=[scheduler, live_scores_service, fixture_service],
+            id='live_scores',
+            name='Live goal ingestion',
+            replace_existing=True
+        )
+
+    def _live_poll(self, scheduler, live_scores_service, fixture_service):
+        delay = IDLE_POLL
+        try:
+            gw_num, _ = get_current_gameweek()
+            if gw_num:
+                fixtures = fixture_service.get_fixtures_for_gameweek(gw_num, max_age=LIVE_FIXTURES_TTL)
+                # No fixtures usually means the FPL API failed; don't sleep through a match
+                poll_now, next_delay = live_poll_plan(fixtures, now_uk()) if fixtures else (False, POST_MATCH_POLL)
+                if poll_now and is_deadline_passed(gw_num):
+                    live_scores_service.poll(gw_num)
+                if next_delay is not None:
+                    delay = next_delay
+        except Exception as e:
+            logger.error("Live goal poll failed: %s", e)
+        finally:
+            # Always reschedule, so one bad poll doesn't stop live scoring for the season
+            self._schedule_live_poll(scheduler, live_scores_service, fixture_service, delay)
+            logger.debug("Next live goal poll in %ss", int(delay))
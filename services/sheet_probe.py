@@ -0,0 +1,93 @@
+import logging
+import time
+
+from gspread.exceptions import APIError
+
+from services.sheets_quota import SheetsBusyError
+
+logger = logging.getLogger(__name__)
+
+PROBE_INTERVAL = 5       # trust a probe answer for 5 seconds before asking Drive again
+
+# Phrases Google uses when the Drive API is switched off or the service account
+# may not read file metadata. Drive also answers 403 for rate limits, so the
+# status code alone isn't enough to give up on the probe for good.
+NO_ACCESS_MARKERS = ('accessnotconfigured', 'has not been used', 'is disabled',
+                     'insufficient', 'permission', 'forbidden', 'not found')
+
+
+def _is_no_access(error):
+    """True if the probe failed because Drive will never answer this process"""
+    if not isinstance(error, APIError):
+        return False
+    status = getattr(error.response, 'status_code', None)
+    if status not in (403, 404):
+        return False
+    text = str(error).lower()
+    return any(marker in text for marker in NO_ACCESS_MARKERS)
+
+
+class DriveRevisionProbe:
+    """Cheap freshness check for the picks spreadsheet.
+
+    Asks the Drive API for the file's modifiedTime, which changes whenever
+    any tab is edited (by the bot or by hand). That is one tiny metadata call
+    instead of a full get_all_records() download, so cached readers only
+    refetch when the spreadsheet has actually changed.
+
+    The answer is remembered for PROBE_INTERVAL seconds so the several reads
+    made while handling a single command share one probe.
+    """
+
+    def __init__(self, interval=PROBE_INTERVAL):
+        self.interval = interval
+        self.available = True
+        self._token = None
+        self._checked_at = 0.0
+        self._retry_at = 0.0
+
+    def token(self, spreadsheet):
+        """Return the spreadsheet's current revision token, or None if unknown.
+
+        None means the probe can't answer and the caller should fall back to a
+        TTL. If the Drive API is not enabled or not permitted for the service
+        account the probe is switched off for good; any other failure only
+        skips probing until `interval` has passed.
+        """
+        if not self.available:
+            return None
+
+        now = time.monotonic()
+        if self._token is not None and (now - self._checked_at) < self.interval:
+            return self._token
+        if now < self._retry_at:
+            return None
+
+        try:
+            self._token = spreadsheet.get_lastUpdateTime()
+        except SheetsBusyError:
+            raise
+        except Exception as e:
+            self._token = None
+            if _is_no_access(e):
+                logger.warning("Drive revision probe unavailable, falling back to TTL cache: %s", e)
+                self.available = False
+            else:
+                logger.warning("Drive revision probe failed, retrying in %ss: %s", self.interval, e)
+                self._retry_at = now + self.interval
+            return None
+
+        self._checked_at = now
+        return self._token
+
+    def prime(self, token):
+        """Take a revision token fetched elsewhere (the async reader) as the current answer."""
+        if self.available and token is not None:
+            self._token = token
+            self._checked_at = time.monotonic()
+
+    def reset(self):
+        """Forget the remembered answer so the next token() call re-probes."""
+        self._token = None
+        self._checked_at = 0.0
+        self._retry_at = 0.0
@@ -0,0 +1,232 @@
+import logging
+import random
+import threading
+import time
+
+import requests
+from gspread.exceptions import APIError
+from urllib3.exceptions import NewConnectionError
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Google allows 60 read and 60 write requests per minute per user. A full
+# bucket plus one minute of refill (burst + rate) stays inside that quota.
+READS_PER_MINUTE = 45
+READ_BURST = 15
+WRITES_PER_MINUTE = 45
+WRITE_BURST = 15
+
+CALL_DEADLINE = 8.0      # total seconds one call may spend queueing and retrying (Twilio times out at 15s)
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5       # seconds; doubled on every retry
+BACKOFF_CAP = 8.0
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# gspread methods that spend the write budget; every other API method is a read
+WRITE_METHODS = {
+    'add_worksheet', 'append_row', 'append_rows', 'batch_clear', 'batch_update', 'clear',
+    'del_worksheet', 'delete_rows', 'insert_row', 'insert_rows', 'resize', 'update',
+    'update_cell', 'update_cells', 'values_append', 'values_batch_update', 'values_clear',
+    'values_update',
+}
+# Writes that add rows: repeating one that Google already applied duplicates the rows
+NON_IDEMPOTENT_METHODS = {'append_row', 'append_rows', 'insert_row', 'insert_rows', 'values_append'}
+# Drive metadata calls are retried but don't count against the Sheets quota
+DRIVE_METHODS = {'get_lastUpdateTime'}
+
+
+def _never_sent(error):
+    """True if a failed call can't have reached Google: rate limited, or no connection made"""
+    if isinstance(error, APIError):
+        return getattr(error.response, 'status_code', None) == 429
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError):
+        reason = error.args[0] if error.args else None
+        reason = getattr(reason, 'reason', reason)    # urllib3 MaxRetryError wraps the cause
+        return isinstance(reason, (NewConnectionError, ConnectionRefusedError))
+    return False
+
+
+class SheetsBusyError(Exception):
+    """Raised when the Sheets quota is exhausted and retrying didn't help"""
+
+    def __init__(self, message="Google Sheets is busy right now, please try again in a minute."):
+        super().__init__(message)
+
+
+class TokenBucket:
+    """Thread-safe token bucket. Callers reserve a token and sleep until it is due."""
+
+    def __init__(self, per_minute, burst):
+        self.rate = per_minute / 60.0
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, max_wait):
+        """Take one token, sleeping if needed.
+
+        Returns the seconds spent waiting, or None if the wait would exceed
+        max_wait (no token is taken in that case).
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+
+            wait = (1 - self._tokens) / self.rate
+            if wait > max_wait:
+                return None
+            # Reserve the token now so concurrent callers queue up behind us
+            self._tokens -= 1
+
+        time.sleep(wait)
+        return wait
+
+
+class SheetsQuota:
+    """Shared read/write budgets and retry policy for every gspread call."""
+
+    def __init__(self):
+        self.buckets = {
+            'read': TokenBucket(READS_PER_MINUTE, READ_BURST),
+            'write': TokenBucket(WRITES_PER_MINUTE, WRITE_BURST),
+        }
+        self.stats = {
+            'read_calls': 0,
+            'write_calls': 0,
+            'drive_calls': 0,
+            'throttled': 0,     # calls that had to wait for a token
+            'retried': 0,       # retries after a 429/5xx or connection error
+            'rejected': 0,      # calls given up on (SheetsBusyError raised)
+        }
+        self._lock = threading.Lock()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+        metrics.inc('bot_sheets_quota_total', (('event', key),))
+
+    def call(self, kind, fn, *args, **kwargs):
+        """Run a gspread call within the 'read', 'write' or 'drive' budget.
+
+        Retries 429/5xx responses with exponential backoff and full jitter.
+        Appends (NON_IDEMPOTENT_METHODS) are only retried when the failed
+        attempt can't have reached Google; otherwise the error is raised
+        as is, since a retry could duplicate the rows. Queueing for tokens
+        and backing off share one CALL_DEADLINE budget. Raises
+        SheetsBusyError once that runs out or all retries fail, so callers
+        never mistake an outage for an empty sheet.
+        """
+        self._count(f'{kind}_calls')
+        bucket = self.buckets.get(kind)
+        deadline = time.monotonic() + CALL_DEADLINE
+
+        for attempt in range(MAX_RETRIES + 1):
+            if bucket is not None:
+                waited = bucket.acquire(max(0.0, deadline - time.monotonic()))
+                if waited is None:
+                    self._count('rejected')
+                    raise SheetsBusyError()
+                if waited:
+                    self._count('throttled')
+
+            try:
+                with metrics.external_call('sheets', kind):
+                    return fn(*args, **kwargs)
+            except APIError as e:
+                status = getattr(e.response, 'status_code', None)
+                if status not in RETRYABLE_STATUS:
+                    raise
+                error = e
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+
+            if getattr(fn, '__name__', '') in NON_IDEMPOTENT_METHODS and not _never_sent(error):
+                logger.warning("Sheets call %s failed (%s) after it may have been applied, not retrying",
+                               fn.__name__, error)
+                raise error
+            if attempt == MAX_RETRIES:
+                break
+            delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+            if time.monotonic() + delay >= deadline:
+                break
+            self._count('retried')
+            logger.warning("Sheets call %s failed (%s), retrying in %.1fs", getattr(fn, '__name__', fn), error, delay)
+            time.sleep(delay)
+
+        self._count('rejected')
+        raise SheetsBusyError() from error
+
+
+def _method_kind(name):
+    if name in DRIVE_METHODS:
+        return 'drive'
+    return 'write' if name in WRITE_METHODS else 'read'
+
+
+class ThrottledWorksheet:
+    """gspread Worksheet wrapper that routes every API method through SheetsQuota"""
+
+    def __init__(self, worksheet, spreadsheet, quota):
+        self._worksheet = worksheet
+        self._spreadsheet = spreadsheet
+        self._quota = quota
+
+    @property
+    def spreadsheet(self):
+        return self._spreadsheet
+
+    def __getattr__(self, name):
+        attr = getattr(self._worksheet, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+        kind = _method_kind(name)
+
+        def throttled(*args, **kwargs):
+            return self._quota.call(kind, attr, *args, **kwargs)
+        return throttled
+
+
+class ThrottledSpreadsheet:
+    """gspread Spreadsheet wrapper; worksheets it hands out are throttled too"""
+
+    def __init__(self, spreadsheet, quota):
+        self._spreadsheet = spreadsheet
+        self._quota = quota
+
+    @property
+    def sheet1(self):
+        # sheet1 is a property in gspread but still fetches sheet metadata
+        worksheet = self._quota.call('read', lambda: self._spreadsheet.sheet1)
+        return ThrottledWorksheet(worksheet, self, self._quota)
+
+    def worksheet(self, title):
+        worksheet = self._quota.call('read', self._spreadsheet.worksheet, title)
+        return ThrottledWorksheet(worksheet, self, self._quota)
+
+    def add_worksheet(self, title, rows, cols, index=None):
+        worksheet = self._quota.call('write', self._spreadsheet.add_worksheet, title, rows, cols, index)
+        return ThrottledWorksheet(worksheet, self, self._quota)
+
+    def __getattr__(self, name):
+        attr = getattr(self._spreadsheet, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+        kind = _method_kind(name)
+
+        def throttled(*args, **kwargs):
+            return self._quota.call(kind, attr, *args, **kwargs)
+        return throttled
+
+
+# One quota per process: Google counts requests per service account, not per service
+sheets_quota = SheetsQuota()
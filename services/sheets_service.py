@@ -1,38 +1,213 @@
 from google.oauth2.service_account import Credentials
 import gspread
+from gspread.utils import numericise_all, rowcol_to_a1
+import logging
 import os
+import time
 from datetime import datetime
 from config.settings import SPREADSHEET_ID, SCOPES, USER_MAP
 from models.picks import PlayerPick
+from services.sheet_probe import DriveRevisionProbe
+from services.sheets_quota import SheetsBusyError, ThrottledSpreadsheet, sheets_quota
+from utils.date_utils import get_closed_gameweeks
+from utils.metrics import metrics
+
+FALLBACK_TTL = 30        # seconds to trust cached records when the revision probe is unavailable
+ARCHIVE_INDEX_TITLE = "Archive Index"
+
+logger = logging.getLogger(__name__)
+
+def service_account_credentials():
+    """Google service account credentials from the GOOGLE_* environment variables"""
+    return Credentials.from_service_account_info({
+        "type": "service_account",
+        "project_id": os.environ['GOOGLE_PROJECT_ID'],
+        "private_key_id": os.environ['GOOGLE_PRIVATE_KEY_ID'],
+        "private_key": os.environ['GOOGLE_PRIVATE_KEY'].replace('\\n', '\n'),
+        "client_email": os.environ['GOOGLE_CLIENT_EMAIL'],
+        "client_id": os.environ['GOOGLE_CLIENT_ID'],
+        "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+        "token_uri": "https://oauth2.googleapis.com/token",
+    }, scopes=SCOPES)
+
+def records_from_values(values):
+    """Turn a values range (header row first) into get_all_records() dicts, numericised the same way"""
+    if not values:
+        return []
+    keys = values[0]
+    records = []
+    for row in values[1:]:
+        row = row + [''] * (len(keys) - len(row))
+        records.append(dict(zip(keys, numericise_all(row[:len(keys)], False, ''))))
+    return records
 
 class SheetsService:
-    def __init__(self):
+    def __init__(self, spreadsheet=None, probe=None, quota=None):
         self.user_map = USER_MAP
+        self.quota = quota or sheets_quota
+        # Injected backend (tests); otherwise opened lazily
+        self._spreadsheet = ThrottledSpreadsheet(spreadsheet, self.quota) if spreadsheet is not None else None
         self._sheet = None
+        self._worksheets = {}             # {title: worksheet}
+        self._records_cache = {}          # {title: (revision_token, fetched_at, records)}
+        self.probe = probe or DriveRevisionProbe()
+        self.cache_stats = {'hits': 0, 'misses': 0}
+        self._archive_index = None        # {gameweek: archive worksheet title}, loaded lazily
+        self._write_count = 0             # bumped on every write by this process
 
     def get_google_sheet(self):
         """Initialize Google Sheets connection (cached after first call)"""
         if self._sheet is not None:
             return self._sheet
+        if self._spreadsheet is not None:
+            self._sheet = self._spreadsheet.sheet1
+            return self._sheet
         try:
-            creds = Credentials.from_service_account_info({
-                "type": "service_account",
-                "project_id": os.environ['GOOGLE_PROJECT_ID'],
-                "private_key_id": os.environ['GOOGLE_PRIVATE_KEY_ID'],
-                "private_key": os.environ['GOOGLE_PRIVATE_KEY'].replace('\\n', '\n'),
-                "client_email": os.environ['GOOGLE_CLIENT_EMAIL'],
-                "client_id": os.environ['GOOGLE_CLIENT_ID'],
-                "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                "token_uri": "https://oauth2.googleapis.com/token",
-            }, scopes=SCOPES)
-
-            gc = gspread.authorize(creds)
-            self._sheet = gc.open_by_key(SPREADSHEET_ID).sheet1
+            gc = gspread.authorize(service_account_credentials())
+            self._spreadsheet = ThrottledSpreadsheet(gc.open_by_key(SPREADSHEET_ID), self.quota)
+            self._sheet = self._spreadsheet.sheet1
             return self._sheet
         except Exception as e:
-            print(f"Error connecting to Google Sheets: {e}")
+            logger.error("Error connecting to Google Sheets: %s", e)
             return None
 
+    def picks_sheet_title(self):
+        """Title of the picks sheet if already connected, else None (never connects)"""
+        return self._sheet.title if self._sheet is not None else None
+
+    def get_worksheet(self, title):
+        """Return a worksheet by title, caching the handle to skip the metadata lookup.
+
+        Raises gspread.exceptions.WorksheetNotFound if the tab does not exist.
+        """
+        worksheet = self._worksheets.get(title)
+        if worksheet is None:
+            worksheet = self.get_google_sheet().spreadsheet.worksheet(title)
+            self._worksheets[title] = worksheet
+        return worksheet
+
+    def _get_records(self, worksheet):
+        """get_all_records() for a worksheet, served from cache while the sheet is unchanged.
+
+        The revision probe decides whether the cached copy is still current;
+        if the probe is unavailable, cached records are trusted for FALLBACK_TTL.
+        """
+        title = worksheet.title
+        cached = self._records_cache.get(title)
+        now = time.monotonic()
+
+        try:
+            token = self.probe.token(worksheet.spreadsheet)
+        except SheetsBusyError:
+            if cached:
+                # Quota exhausted: a slightly stale answer beats a wrong empty one
+                logger.warning("Sheets busy, serving cached %s records", title)
+                return cached[2]
+            raise
+
+        if self._is_current(cached, token, now):
+            self.cache_stats['hits'] += 1
+            return cached[2]
+
+        self.cache_stats['misses'] += 1
+        try:
+            records = worksheet.get_all_records()
+        except SheetsBusyError:
+            if cached:
+                logger.warning("Sheets busy, serving cached %s records", title)
+                return cached[2]
+            raise
+        self._records_cache[title] = (token, now, records)
+        return records
+
+    def _fresh_records(self, worksheet):
+        """get_all_records() straight from Sheets, bypassing the records cache.
+
+        For writes that address rows by position: cached records can be
+        older than rows an admin has since inserted, deleted or sorted, and
+        would point the write at someone else's row.
+        """
+        return worksheet.get_all_records()
+
+    @staticmethod
+    def _is_current(cached, token, now):
+        if not cached:
+            return False
+        cached_token, fetched_at, records = cached
+        if token is not None:
+            return cached_token == token
+        return (now - fetched_at) < FALLBACK_TTL
+
+    def prefetch_gameweek_records(self, gameweek_num, extra_titles=("Player Scores",)):
+        """Load a gameweek's picks tab and `extra_titles` into the records cache in one batch read.
+
+        Commands that combine several tabs would otherwise pay one
+        get_all_records round trip per tab, one after the other. Tabs that are
+        already current or don't exist are skipped, and on any failure the
+        usual per-tab reads simply happen instead.
+        """
+        try:
+            sheet = self.get_google_sheet()
+            if not sheet:
+                return
+            titles = [self.get_archive_index().get(gameweek_num) or sheet.title]
+            for title in extra_titles:
+                try:
+                    self.get_worksheet(title)
+                    titles.append(title)
+                except gspread.exceptions.WorksheetNotFound:
+                    pass
+
+            token = self.probe.token(sheet.spreadsheet)
+            now = time.monotonic()
+            stale = [title for title in titles if not self._is_current(self._records_cache.get(title), token, now)]
+            if len(stale) < 2:
+                return
+            response = sheet.spreadsheet.values_batch_get([f"'{title}'" for title in stale])
+        except SheetsBusyError:
+            return
+        except Exception as e:
+            logger.warning("Batch read failed, reading tabs one by one: %s", e)
+            return
+
+        self.cache_stats['misses'] += len(stale)
+        for title, value_range in zip(stale, response.get('valueRanges', [])):
+            self._records_cache[title] = (token, now, records_from_values(value_range.get('values', [])))
+
+    def prime_records(self, title, records, token, write_count):
+        """Cache records read outside gspread (the async batch reader) as if _get_records had fetched them.
+
+        `write_count` is _write_count from when the read started; if this
+        process has written since, the records may predate that write and
+        are dropped. Returns whether they were cached.
+        """
+        if write_count != self._write_count:
+            return False
+        self._records_cache[title] = (token, time.monotonic(), records)
+        self.probe.prime(token)
+        return True
+
+    def _invalidate(self, worksheet):
+        """Drop cached records after this process writes to a worksheet"""
+        self._records_cache.pop(worksheet.title, None)
+        self._write_count += 1
+        self.probe.reset()
+
+    def data_version(self):
+        """Token that changes whenever sheet data may have changed, for memoizing derived output.
+
+        Combines the spreadsheet revision with this process's own write count
+        (Drive's modifiedTime can lag a few seconds behind a write). Returns
+        None when the revision is unknown, meaning "don't memoize".
+        """
+        sheet = self.get_google_sheet()
+        if not sheet:
+            return None
+        token = self.probe.token(sheet.spreadsheet)
+        if token is None:
+            return None
+        return (token, self._write_count)
+
     def setup_google_sheet_headers(self):
         """Set up the headers in Google Sheets (run once)"""
         try:
@@ -42,12 +217,12 @@ class SheetsService:
                 
                 if not sheet.row_values(1):
                     sheet.insert_row(headers, 1)
-                    print("Headers added to Google Sheet")
+                    logger.info("Headers added to Google Sheet")
                 else:
-                    print("Headers already exist in Google Sheet")
+                    logger.debug("Headers already exist in Google Sheet")
             
         except Exception as e:
-            print(f"Error setting up headers: {e}")
+            logger.error("Error setting up headers: %s", e)
 
     def add_to_google_sheet(self, phone_number, players, gameweek_num, deadline):
         """Add player picks to Google Sheets with gameweek info"""
@@ -68,15 +243,19 @@ class SheetsService:
                 deadline=deadline,
             )
             sheet.append_row(pick.to_sheet_row())
-            print(f"Added GW{gameweek_num} picks for {user_id}: {', '.join(players)}")
+            self._invalidate(sheet)
+            logger.info("Added picks for %s", user_id, extra={'gameweek': gameweek_num})
+            logger.debug("Picks: %s", ', '.join(players), extra={'gameweek': gameweek_num})
             
             # Also update User Status sheet
             self.update_user_status_picks(phone_number, players, gameweek_num)
             
             return True, "success"
             
+        except SheetsBusyError:
+            raise
         except Exception as e:
-            print(f"Error adding to sheet: {e}")
+            logger.error("Error adding to sheet: %s", e)
             return False, "error"
 
     def get_all_picks_for_gameweek(self, gameweek_num):
@@ -86,7 +265,10 @@ class SheetsService:
             if not sheet:
                 return {}
             
-            all_records = sheet.get_all_records()
+            # Closed gameweeks live in their own compacted archive tab
+            archive_title = self.get_archive_index().get(gameweek_num)
+            source = self.get_worksheet(archive_title) if archive_title else sheet
+            all_records = self._get_records(source)
             
             # Dictionary to store latest picks per user
             user_picks = {}
@@ -116,8 +298,10 @@ class SheetsService:
             
             return user_picks
             
+        except SheetsBusyError:
+            raise
         except Exception as e:
-            print(f"Error getting picks: {e}")
+            logger.error("Error getting picks: %s", e)
             return {}
 
     def get_users_without_picks(self, gameweek_num):
@@ -128,7 +312,7 @@ class SheetsService:
                 return []
             
             # Get all records
-            all_records = sheet.get_all_records()
+            all_records = self._get_records(sheet)
             
             # Find users who submitted for this gameweek
             users_submitted = set()
@@ -147,9 +331,17 @@ class SheetsService:
             return users_without_picks
             
         except Exception as e:
-            print(f"Error checking submissions: {e}")
+            logger.error("Error checking submissions: %s", e)
             return []
 
+    def get_player_score_records(self):
+        """Get all rows of the Player Scores sheet, or None if it doesn't exist yet"""
+        try:
+            scores_sheet = self.get_worksheet("Player Scores")
+        except gspread.exceptions.WorksheetNotFound:
+            return None
+        return self._get_records(scores_sheet)
+
     def update_player_scored_status(self, gameweek_num, player_name, scored):
         """Update whether a player scored in a gameweek"""
         try:
@@ -159,17 +351,18 @@ class SheetsService:
             
             # Find or create a "Player Scores" worksheet
             try:
-                scores_sheet = sheet.spreadsheet.worksheet("Player Scores")
-            except:
+                scores_sheet = self.get_worksheet("Player Scores")
+            except gspread.exceptions.WorksheetNotFound:
                 # Create the sheet if it doesn't exist
                 scores_sheet = sheet.spreadsheet.add_worksheet(title="Player Scores", rows=100, cols=10)
                 scores_sheet.append_row(['Gameweek', 'Player', 'Scored', 'Updated'])
+                self._worksheets["Player Scores"] = scores_sheet
             
             # Normalize player name for consistency (title case)
             normalized_player = player_name.strip().title()
             
             # Check if this player already has a record for this gameweek
-            all_records = scores_sheet.get_all_records()
+            all_records = self._fresh_records(scores_sheet)
             row_to_update = None
             
             for i, record in enumerate(all_records, start=2):  # Start at 2 because row 1 is headers
@@ -190,14 +383,17 @@ class SheetsService:
                     'Yes' if scored else 'No',
                     datetime.now().isoformat()
                 ])
+            self._invalidate(scores_sheet)
             
             # Also update User Status sheet
             self.update_player_scores_in_status(normalized_player, scored, gameweek_num)
             
             return True, f"Updated: {normalized_player} {'scored' if scored else 'did not score'} in GW{gameweek_num}"
             
+        except SheetsBusyError:
+            raise
         except Exception as e:
-            print(f"Error updating player status: {e}")
+            logger.error("Error updating player status: %s", e)
             return False, str(e)
 
     def get_elimination_status(self, gameweek_num):
@@ -207,16 +403,21 @@ class SheetsService:
             if not sheet:
                 return None
             
-            # Get all picks for the gameweek
+            # Picks and Player Scores in one round trip
+            self.prefetch_gameweek_records(gameweek_num)
             picks = self.get_all_picks_for_gameweek(gameweek_num)
             
+            # Per-record debug lines are skipped entirely unless LOG_LEVEL=DEBUG
+            debug = logger.isEnabledFor(logging.DEBUG)
+            
             # Try to get scoring data
             try:
-                scores_sheet = sheet.spreadsheet.worksheet("Player Scores")
-                scores_records = scores_sheet.get_all_records()
+                scores_sheet = self.get_worksheet("Player Scores")
+                scores_records = self._get_records(scores_sheet)
                 
-                print(f"DEBUG: Found {len(scores_records)} records in Player Scores sheet")
-                print(f"DEBUG: Looking for gameweek {gameweek_num}")
+                if debug:
+                    logger.debug("Found %d records in Player Scores sheet", len(scores_records),
+                                 extra={'gameweek': gameweek_num})
                 
                 # Build a dict of players who scored (using title case for consistency)
                 scorers = {}
@@ -227,9 +428,11 @@ class SheetsService:
                         scored_value = record.get('Scored', '').strip().lower()
                         scored = scored_value == 'yes'
                         scorers[player] = scored
-                        print(f"DEBUG: Player '{player}' -> scored: {scored} (raw value: '{scored_value}')")
+                        if debug:
+                            logger.debug("Player '%s' -> scored: %s (raw value: '%s')", player, scored, scored_value)
                 
-                print(f"DEBUG: Final scorers dict: {scorers}")
+                if debug:
+                    logger.debug("Final scorers dict: %s", scorers)
             except:
                 # No scores sheet yet
                 scorers = {}
@@ -252,20 +455,18 @@ class SheetsService:
                 
                 for player in players:
                     player_normalized = player.strip().title()
-                    print(f"DEBUG: Checking player '{player_normalized}' for {user_name}")
                     if player_normalized in scorers:
                         if scorers[player_normalized]:
                             player_status.append(f"✅ {player}")
-                            print(f"DEBUG: Player '{player_normalized}' scored!")
                         else:
                             all_scored = False
                             player_status.append(f"❌ {player}")
-                            print(f"DEBUG: Player '{player_normalized}' did not score")
                     else:
                         all_checked = False
                         all_scored = False  # Can't have won if not all checked
                         player_status.append(f"⏳ {player}")
-                        print(f"DEBUG: Player '{player_normalized}' not found in scorers dict")
+                    if debug:
+                        logger.debug("%s: %s", user_name, player_status[-1])
                 
                 status_text = f"{user_name}: {', '.join(player_status)}"
                 
@@ -284,8 +485,10 @@ class SheetsService:
             
             return results
             
+        except SheetsBusyError:
+            raise
         except Exception as e:
-            print(f"Error getting elimination status: {e}")
+            logger.error("Error getting elimination status: %s", e)
             return None
     
     def setup_user_status_sheet(self):
@@ -297,12 +500,13 @@ class SheetsService:
             
             # Create User Status worksheet if it doesn't exist
             try:
-                status_sheet = sheet.spreadsheet.worksheet("User Status")
-                print("User Status sheet already exists")
+                status_sheet = self.get_worksheet("User Status")
+                logger.debug("User Status sheet already exists")
                 return True, "User Status sheet already exists"
             except:
                 # Create the sheet
                 status_sheet = sheet.spreadsheet.add_worksheet(title="User Status", rows=500, cols=19)
+                self._worksheets["User Status"] = status_sheet
                 headers = [
                     'Timestamp', 'Gameweek', 'Phone Number', 'User Name',
                     'Player 1', 'P1 Scored', 'Player 2', 'P2 Scored',
@@ -312,11 +516,11 @@ class SheetsService:
                     'Status', 'Updated'
                 ]
                 status_sheet.insert_row(headers, 1)
-                print("Created User Status sheet with headers")
+                logger.info("Created User Status sheet with headers")
                 return True, "Created User Status sheet with headers"
                 
         except Exception as e:
-            print(f"Error setting up User Status sheet: {e}")
+            logger.error("Error setting up User Status sheet: %s", e)
             return False, str(e)
     
     def update_user_status_picks(self, phone_number, players, gameweek_num):
@@ -328,16 +532,16 @@ class SheetsService:
             
             # Get or create User Status worksheet
             try:
-                status_sheet = sheet.spreadsheet.worksheet("User Status")
-            except:
+                status_sheet = self.get_worksheet("User Status")
+            except gspread.exceptions.WorksheetNotFound:
                 # Create sheet if it doesn't exist
                 self.setup_user_status_sheet()
-                status_sheet = sheet.spreadsheet.worksheet("User Status")
+                status_sheet = self.get_worksheet("User Status")
             
             user_name = self.user_map.get(phone_number, phone_number)
             
             # Check if user already has entry for this gameweek
-            all_records = status_sheet.get_all_records()
+            all_records = self._fresh_records(status_sheet)
             row_to_update = None
             latest_timestamp = ''
             
@@ -385,11 +589,14 @@ class SheetsService:
                     'Pending',
                     datetime.now().isoformat()
                 ])
+            self._invalidate(status_sheet)
             
             return True, f"Updated User Status for {user_name}"
             
+        except SheetsBusyError:
+            raise
         except Exception as e:
-            print(f"Error updating user status picks: {e}")
+            logger.error("Error updating user status picks: %s", e)
             return False, str(e)
     
     def update_player_scores_in_status(self, player_name, scored, gameweek_num):
@@ -401,15 +608,15 @@ class SheetsService:
             
             # Get User Status worksheet
             try:
-                status_sheet = sheet.spreadsheet.worksheet("User Status")
-            except:
+                status_sheet = self.get_worksheet("User Status")
+            except gspread.exceptions.WorksheetNotFound:
                 return False, "User Status sheet not found"
             
             # Normalize player name
             normalized_player = player_name.strip().title()
             
             # Get all records for this gameweek
-            all_records = status_sheet.get_all_records()
+            all_records = self._fresh_records(status_sheet)
             updates_made = 0
             
             for i, record in enumerate(all_records, start=2):
@@ -461,12 +668,98 @@ class SheetsService:
                         status_sheet.update_cell(i, 18, datetime.now().isoformat())  # Updated column (moved to column 18)
                         updates_made += 1
             
+            if updates_made:
+                self._invalidate(status_sheet)
             return True, f"Updated {updates_made} user statuses for {normalized_player}"
             
+        except SheetsBusyError:
+            raise
         except Exception as e:
-            print(f"Error updating player scores in status: {e}")
+            logger.error("Error updating player scores in status: %s", e)
             return False, str(e)
     
+    def apply_player_scores(self, gameweek_num, scored_players):
+        """Mark several players as scored at once (live feed ingestion).
+
+        Like update_player_scored_status(gw, player, True) for each player,
+        but with one append_rows to Player Scores and one batch update to
+        User Status. A player who already has a Player Scores row for the
+        gameweek (Yes or No) has been decided, possibly by hand, and is left
+        alone. Users already marked Lost keep that status.
+        """
+        try:
+            sheet = self.get_google_sheet()
+            if not sheet:
+                return False, "Could not connect to sheet"
+
+            normalized = {player.strip().title() for player in scored_players if player.strip()}
+            now = datetime.now().isoformat()
+
+            try:
+                scores_sheet = self.get_worksheet("Player Scores")
+            except gspread.exceptions.WorksheetNotFound:
+                scores_sheet = sheet.spreadsheet.add_worksheet(title="Player Scores", rows=100, cols=10)
+                scores_sheet.append_row(['Gameweek', 'Player', 'Scored', 'Updated'])
+                self._worksheets["Player Scores"] = scores_sheet
+
+            normalized -= {
+                str(record.get('Player', '')).strip().title()
+                for record in self._get_records(scores_sheet)
+                if str(record.get('Gameweek')) == str(gameweek_num)
+            }
+            if not normalized:
+                return True, "No players to update"
+            scores_sheet.append_rows([[gameweek_num, player, 'Yes', now] for player in sorted(normalized)])
+            self._invalidate(scores_sheet)
+
+            try:
+                status_sheet = self.get_worksheet("User Status")
+            except gspread.exceptions.WorksheetNotFound:
+                return True, f"Marked {len(normalized)} players as scored in GW{gameweek_num}"
+
+            # Fresh read: cell positions must match the sheet exactly
+            rows = status_sheet.get_all_values()
+            headers = rows[0] if rows else []
+            column = {name: i for i, name in enumerate(headers)}
+            pick_columns = [(column[f'Player {n}'], column[f'P{n} Scored'])
+                            for n in range(1, 9) if f'Player {n}' in column and f'P{n} Scored' in column]
+            status_col = column.get('Status')
+            updated_col = column.get('Updated')
+
+            status_updates = []
+            for row_num, row in enumerate(rows[1:], start=2):
+                if len(row) <= column.get('Gameweek', 0) or str(row[column['Gameweek']]) != str(gameweek_num):
+                    continue
+                row = row + [''] * (len(headers) - len(row))
+                changed = False
+                for player_col, scored_col in pick_columns:
+                    if row[player_col].strip().title() in normalized and row[scored_col].strip().lower() != 'yes':
+                        row[scored_col] = 'Yes'
+                        status_updates.append({'range': rowcol_to_a1(row_num, scored_col + 1), 'values': [['Yes']]})
+                        changed = True
+                if not changed or status_col is None:
+                    continue
+
+                all_checked = all(row[scored_col].strip().lower() in ('yes', 'no')
+                                  for player_col, scored_col in pick_columns if row[player_col].strip())
+                if row[status_col] != 'Lost':
+                    status_updates.append({'range': rowcol_to_a1(row_num, status_col + 1),
+                                           'values': [['Active' if all_checked else 'Pending']]})
+                if updated_col is not None:
+                    status_updates.append({'range': rowcol_to_a1(row_num, updated_col + 1), 'values': [[now]]})
+
+            if status_updates:
+                status_sheet.batch_update(status_updates)
+                self._invalidate(status_sheet)
+
+            return True, f"Marked {len(normalized)} players as scored in GW{gameweek_num}"
+
+        except SheetsBusyError:
+            raise
+        except Exception as e:
+            logger.error("Error applying player scores: %s", e, extra={'gameweek': gameweek_num})
+            return False, str(e)
+
     def eliminate_user(self, user_identifier, gameweek_num):
         """Manually set a user's status to Lost"""
         try:
@@ -476,15 +769,15 @@ class SheetsService:
             
             # Get User Status worksheet
             try:
-                status_sheet = sheet.spreadsheet.worksheet("User Status")
-            except:
+                status_sheet = self.get_worksheet("User Status")
+            except gspread.exceptions.WorksheetNotFound:
                 return False, "User Status sheet not found"
             
             # Normalize user identifier for matching
             user_lower = user_identifier.strip().lower()
             
             # Find ALL entries for this user in this gameweek
-            all_records = status_sheet.get_all_records()
+            all_records = self._fresh_records(status_sheet)
             rows_updated = []
             user_name_found = None
             
@@ -505,12 +798,15 @@ class SheetsService:
                         user_name_found = user_name_in_sheet
             
             if rows_updated:
+                self._invalidate(status_sheet)
                 return True, f"Eliminated {user_name_found} for GW{gameweek_num} ({len(rows_updated)} entries updated)"
             else:
                 return False, f"User '{user_identifier}' not found in GW{gameweek_num}"
                 
+        except SheetsBusyError:
+            raise
         except Exception as e:
-            print(f"Error eliminating user: {e}")
+            logger.error("Error eliminating user: %s", e)
             return False, str(e)
     
     def reinstate_user(self, user_identifier, gameweek_num):
@@ -522,15 +818,15 @@ class SheetsService:
             
             # Get User Status worksheet
             try:
-                status_sheet = sheet.spreadsheet.worksheet("User Status")
-            except:
+                status_sheet = self.get_worksheet("User Status")
+            except gspread.exceptions.WorksheetNotFound:
                 return False, "User Status sheet not found"
             
             # Normalize user identifier for matching
             user_lower = user_identifier.strip().lower()
             
             # Find ALL entries for this user in this gameweek
-            all_records = status_sheet.get_all_records()
+            all_records = self._fresh_records(status_sheet)
             rows_updated = []
             user_name_found = None
             
@@ -551,12 +847,15 @@ class SheetsService:
                         user_name_found = user_name_in_sheet
             
             if rows_updated:
+                self._invalidate(status_sheet)
                 return True, f"Reinstated {user_name_found} for GW{gameweek_num} ({len(rows_updated)} entries updated)"
             else:
                 return False, f"User '{user_identifier}' not found in GW{gameweek_num}"
                 
+        except SheetsBusyError:
+            raise
         except Exception as e:
-            print(f"Error reinstating user: {e}")
+            logger.error("Error reinstating user: %s", e)
             return False, str(e)
     
     def get_user_status_from_sheet(self, gameweek_num):
@@ -568,8 +867,8 @@ class SheetsService:
             
             # Get User Status worksheet
             try:
-                status_sheet = sheet.spreadsheet.worksheet("User Status")
-                all_records = status_sheet.get_all_records()
+                status_sheet = self.get_worksheet("User Status")
+                all_records = self._get_records(status_sheet)
             except:
                 # Fall back to old calculation method if sheet doesn't exist
                 return self.get_elimination_status(gameweek_num)
@@ -635,7 +934,153 @@ class SheetsService:
             
             return results
             
+        except SheetsBusyError:
+            raise
         except Exception as e:
-            print(f"Error getting user status from sheet: {e}")
+            logger.error("Error getting user status from sheet: %s", e)
             # Fall back to calculation method
-            return self.get_elimination_status(gameweek_num)
\ No newline at end of file
+            return self.get_elimination_status(gameweek_num)
+
+    def get_archive_index(self):
+        """Map of archived gameweek -> archive worksheet title (read once, then kept in memory).
+
+        A gameweek nobody picked for is archived without a tab; its title is ''.
+        """
+        if self._archive_index is None:
+            try:
+                records = self.get_worksheet(ARCHIVE_INDEX_TITLE).get_all_records()
+            except gspread.exceptions.WorksheetNotFound:
+                records = []
+            self._archive_index = {
+                int(record['Gameweek']): record.get('Worksheet') or ''
+                for record in records if record.get('Gameweek')
+            }
+        return self._archive_index
+
+    def archive_gameweek(self, gameweek_num):
+        """Move a finished gameweek's picks out of the live sheet.
+
+        Writes one row per user (their latest submission) to a "GW<n> Picks"
+        tab, deletes every row for that gameweek from sheet1 in a single batch
+        request, and only then records the tab in the Archive Index. A
+        gameweek with no picks is only recorded in the index, so unused
+        gameweeks don't pile up empty tabs. Safe to re-run: until the index
+        row exists, an interrupted rollover is simply done again.
+        """
+        try:
+            sheet = self.get_google_sheet()
+            if not sheet:
+                return False, "Could not connect to sheet"
+
+            # Fresh read: row positions must be exact for the deletes below
+            all_values = sheet.get_all_values()
+            if not all_values:
+                return False, "Picks sheet is empty"
+            headers = all_values[0]
+            gw_col = headers.index('Gameweek')
+            phone_col = headers.index('Phone Number')
+            ts_col = headers.index('Timestamp')
+
+            rows_to_delete = []
+            latest = {}   # {phone: row values}
+            for row_num, row in enumerate(all_values[1:], start=2):
+                if len(row) <= gw_col or str(row[gw_col]).strip() != str(gameweek_num):
+                    continue
+                rows_to_delete.append(row_num)
+                phone = row[phone_col]
+                if phone not in latest or row[ts_col] > latest[phone][ts_col]:
+                    latest[phone] = row
+
+            archive_index = self.get_archive_index()
+            archive_title = archive_index.get(gameweek_num)
+            indexed = archive_title is not None
+
+            if not indexed:
+                archived_rows = sorted(latest.values(), key=lambda row: row[ts_col])
+                archive_title = f"GW{gameweek_num} Picks"
+                archived_count = len(archived_rows)
+                if archived_rows:
+                    try:
+                        # Left behind by an interrupted rollover: rewrite it
+                        archive_sheet = self.get_worksheet(archive_title)
+                        archive_sheet.clear()
+                    except gspread.exceptions.WorksheetNotFound:
+                        archive_sheet = sheet.spreadsheet.add_worksheet(
+                            title=archive_title, rows=len(archived_rows) + 1, cols=len(headers)
+                        )
+                    archive_sheet.update('A1', [headers] + archived_rows)
+                    self._worksheets[archive_title] = archive_sheet
+                else:
+                    try:
+                        # Rows already deleted by a rollover interrupted before indexing
+                        archived_count = len(self.get_worksheet(archive_title).get_all_records())
+                    except gspread.exceptions.WorksheetNotFound:
+                        archive_title = ''
+
+            if rows_to_delete:
+                # Delete bottom-up in contiguous runs so earlier indices stay valid.
+                # New submissions are appended below, so they're never shifted into range.
+                runs = []
+                for row_num in sorted(rows_to_delete, reverse=True):
+                    if runs and runs[-1][0] == row_num + 1:
+                        runs[-1][0] = row_num
+                    else:
+                        runs.append([row_num, row_num])
+                sheet.spreadsheet.batch_update({'requests': [
+                    {'deleteDimension': {'range': {
+                        'sheetId': sheet.id,
+                        'dimension': 'ROWS',
+                        'startIndex': start - 1,
+                        'endIndex': end,
+                    }}}
+                    for start, end in runs
+                ]})
+                self._invalidate(sheet)
+
+            if not indexed:
+                try:
+                    index_sheet = self.get_worksheet(ARCHIVE_INDEX_TITLE)
+                except gspread.exceptions.WorksheetNotFound:
+                    index_sheet = sheet.spreadsheet.add_worksheet(title=ARCHIVE_INDEX_TITLE, rows=50, cols=4)
+                    index_sheet.append_row(['Gameweek', 'Worksheet', 'Rows', 'Archived'])
+                    self._worksheets[ARCHIVE_INDEX_TITLE] = index_sheet
+                index_sheet.append_row([gameweek_num, archive_title, archived_count, datetime.now().isoformat()])
+                archive_index[gameweek_num] = archive_title
+
+            if not archive_title:
+                logger.info("Archived GW%s: no picks, recorded in index only", gameweek_num,
+                            extra={'gameweek': gameweek_num})
+                return True, f"Archived GW{gameweek_num} (no picks)"
+            logger.info("Archived GW%s: %d users to '%s', removed %d rows from live sheet",
+                        gameweek_num, len(latest), archive_title, len(rows_to_delete),
+                        extra={'gameweek': gameweek_num})
+            return True, f"Archived GW{gameweek_num} to {archive_title}"
+
+        except SheetsBusyError:
+            raise
+        except Exception as e:
+            logger.error("Error archiving GW%s: %s", gameweek_num, e, extra={'gameweek': gameweek_num})
+            return False, str(e)
+
+    def archive_closed_gameweeks(self):
+        """Archive every closed gameweek that isn't archived yet.
+
+        A failure on one gameweek is logged and the rest are still attempted;
+        the next rollover run picks the failed one up again.
+        """
+        try:
+            archived = self.get_archive_index()
+        except Exception as e:
+            logger.error("Error reading archive index: %s", e)
+            return
+        for gameweek_num in get_closed_gameweeks():
+            if gameweek_num in archived:
+                continue
+            try:
+                self.archive_gameweek(gameweek_num)
+            except Exception as e:
+                logger.error("Error archiving GW%s: %s", gameweek_num, e, extra={'gameweek': gameweek_num})
+
+
+# Time every public method (bot_method_seconds{component="sheets_service"})
+metrics.instrument_class(SheetsService, 'sheets_service')
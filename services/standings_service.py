@@ -0,0 +1,177 @@
+import logging
+
+import gspread
+
+from config.settings import USER_MAP
+from services.sheets_quota import SheetsBusyError
+
+logger = logging.getLogger(__name__)
+
+STANDINGS_TITLE = "Season Scores"
+FORM_GAMEWEEKS = 5
+
+
+class StandingsService:
+    """Season-long standings built from per-gameweek final scores.
+
+    Each closed gameweek is materialized once into the compact "Season Scores"
+    tab (one row per user per gameweek). The open gameweek is tracked in
+    memory and refreshed every time a leaderboard is generated, so season
+    queries never re-read old picks or Player Scores.
+    """
+
+    def __init__(self, sheets_service):
+        self.sheets_service = sheets_service
+        self.user_map = USER_MAP
+        self._points = {}        # {gameweek: {user_name: points}}
+        self._finalized = set()  # gameweeks whose scores are written to the sheet
+        self._loaded = False
+
+    def _load(self):
+        """Read the materialized table once per process"""
+        if self._loaded:
+            return
+        try:
+            records = self.sheets_service.get_worksheet(STANDINGS_TITLE).get_all_records()
+        except gspread.exceptions.WorksheetNotFound:
+            records = []
+        for record in records:
+            try:
+                gameweek = int(record.get('Gameweek'))
+            except (TypeError, ValueError):
+                continue
+            name = str(record.get('User', '')).strip()
+            if name:
+                self._points.setdefault(gameweek, {})[name] = float(record.get('Points') or 0)
+                self._finalized.add(gameweek)
+        self._loaded = True
+
+    def is_finalized(self, gameweek_num):
+        self._load()
+        return gameweek_num in self._finalized
+
+    def has_gameweek(self, gameweek_num):
+        self._load()
+        return gameweek_num in self._points
+
+    def record_gameweek(self, gameweek_num, user_scores):
+        """Update the live (not yet final) scores for a gameweek from a leaderboard calculation"""
+        self._load()
+        if gameweek_num in self._finalized:
+            return
+        self._points[gameweek_num] = {u['name']: u['total_score'] for u in user_scores}
+
+    def finalize_gameweek(self, gameweek_num, user_scores):
+        """Write a closed gameweek's final scores to the Season Scores tab (once)"""
+        self._load()
+        if gameweek_num in self._finalized:
+            return True, f"GW{gameweek_num} already finalized"
+        try:
+            sheet = self.sheets_service.get_google_sheet()
+            if not sheet:
+                return False, "Could not connect to sheet"
+            try:
+                standings_sheet = self.sheets_service.get_worksheet(STANDINGS_TITLE)
+            except gspread.exceptions.WorksheetNotFound:
+                standings_sheet = sheet.spreadsheet.add_worksheet(title=STANDINGS_TITLE, rows=1000, cols=3)
+                standings_sheet.append_row(['Gameweek', 'User', 'Points'])
+
+            rows = [[gameweek_num, u['name'], round(u['total_score'], 2)] for u in user_scores]
+            if rows:
+                standings_sheet.append_rows(rows)
+
+            self._points[gameweek_num] = {u['name']: u['total_score'] for u in user_scores}
+            self._finalized.add(gameweek_num)
+            return True, f"Finalized GW{gameweek_num} ({len(rows)} users)"
+
+        except SheetsBusyError:
+            raise
+        except Exception as e:
+            logger.error("Error finalizing GW%s standings: %s", gameweek_num, e, extra={'gameweek': gameweek_num})
+            return False, str(e)
+
+    def _all_users(self):
+        users = list(self.user_map.values())
+        for scores in self._points.values():
+            for name in scores:
+                if name not in users:
+                    users.append(name)
+        return users
+
+    def _live_label(self):
+        live = sorted(gw for gw in self._points if gw not in self._finalized)
+        return f" (incl. live GW{live[-1]})" if live else ""
+
+    def format_season_table(self):
+        """Total points per user across all gameweeks"""
+        self._load()
+        if not self._points:
+            return "No gameweek scores recorded yet."
+
+        totals = {name: 0.0 for name in self._all_users()}
+        played = {name: 0 for name in totals}
+        for scores in self._points.values():
+            for name, points in scores.items():
+                totals[name] += points
+                played[name] += 1
+
+        ranked = sorted(totals.items(), key=lambda x: (-x[1], x[0]))
+        gameweeks = sorted(self._points)
+
+        lines = [f"🏆 SEASON TABLE (GW{gameweeks[0]}–GW{gameweeks[-1]}){self._live_label()}", ""]
+        for i, (name, total) in enumerate(ranked, 1):
+            lines.append(f"{i}. {name} — {total:.1f} pts ({played[name]} GW)")
+        return "\n".join(lines) + "\n"
+
+    def format_form(self, last_n=FORM_GAMEWEEKS):
+        """Each user's points over the last N gameweeks, best form first"""
+        self._load()
+        if not self._points:
+            return "No gameweek scores recorded yet."
+
+        gameweeks = sorted(self._points)[-last_n:]
+        form = []
+        for name in self._all_users():
+            points = [self._points[gw].get(name, 0.0) for gw in gameweeks]
+            form.append((name, points, sum(points)))
+        form.sort(key=lambda x: (-x[2], x[0]))
+
+        lines = [f"📈 FORM — LAST {len(gameweeks)} (GW{gameweeks[0]}–GW{gameweeks[-1]}){self._live_label()}", ""]
+        for name, points, total in form:
+            lines.append(f"{name}: {' · '.join(f'{p:.1f}' for p in points)} = {total:.1f}")
+        return "\n".join(lines) + "\n"
+
+    def format_head_to_head(self, name_a, name_b):
+        """Gameweek-by-gameweek comparison of two users"""
+        self._load()
+        users = {name.lower(): name for name in self._all_users()}
+        user_a = users.get(name_a.strip().lower())
+        user_b = users.get(name_b.strip().lower())
+        if not user_a:
+            return f"User '{name_a}' not found."
+        if not user_b:
+            return f"User '{name_b}' not found."
+
+        wins_a = wins_b = draws = 0
+        total_a = total_b = 0.0
+        lines = [f"⚔️ {user_a} vs {user_b}{self._live_label()}", ""]
+        for gw in sorted(self._points):
+            scores = self._points[gw]
+            if user_a not in scores and user_b not in scores:
+                continue
+            a = scores.get(user_a, 0.0)
+            b = scores.get(user_b, 0.0)
+            total_a += a
+            total_b += b
+            if a > b:
+                wins_a += 1
+            elif b > a:
+                wins_b += 1
+            else:
+                draws += 1
+            lines.append(f"GW{gw}: {a:.1f} — {b:.1f}")
+
+        lines.append("")
+        lines.append(f"Record: {user_a} {wins_a}W · {draws}D · {wins_b}W {user_b}")
+        lines.append(f"Total: {total_a:.1f} — {total_b:.1f}")
+        return "\n".join(lines)
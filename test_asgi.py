@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+# Tests for the optional ASGI entry point: async prefetch, WSGI bridge and async outbound
+import sys
+sys.path.append('.')
+
+import asyncio
+import json
+from urllib.parse import urlencode
+
+from bench.harness import BENCH_GAMEWEEK, build_spreadsheet, league, load_app, synthetic_users
+from bench.fake_fpl import RecordedFplHttp, RecordedResponse
+from config.settings import ADMIN_PHONE
+from services.fixture_service import FixtureService
+from services.sheets_service import records_from_values
+
+
+class AsyncRecordedClient:
+    """httpx.AsyncClient stand-in over the recorded FPL JSON; tracks how many GETs overlap"""
+
+    def __init__(self, http):
+        self.http = http
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.posts = []
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return self.http.get(url, params=params, headers=headers, timeout=timeout)
+
+    async def post(self, url, data=None, auth=None, timeout=None):
+        self.posts.append(data)
+        return RecordedResponse(url, 201)
+
+
+async def request(asgi_app, method, path, form=None):
+    body = urlencode(form or {}).encode()
+    sent = []
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': b'',
+             'headers': [(b'content-type', b'application/x-www-form-urlencoded')]}
+    await asgi_app(scope, receive, send)
+    return sent[0]['status'], sent[1]['body'].decode()
+
+
+def test_webhook_over_asgi():
+    from asgi import AsyncBot
+
+    app_module = load_app()
+    users = synthetic_users(5, ADMIN_PHONE)
+    http = RecordedFplHttp()
+    client = AsyncRecordedClient(http)
+    saved_fixtures = app_module.fixture_service
+    app_module.fixture_service = FixtureService(http=http)
+
+    async def scenario():
+        asgi_app = AsyncBot(bot_module=app_module, client=client, threads=2)
+        status, body = await request(asgi_app, 'POST', '/webhook', {'From': f'whatsapp:{ADMIN_PHONE}', 'Body': 'fixtures'})
+        assert status == 200 and 'Man City' in body
+        # bootstrap-static and fixtures were fetched together, then the handler used the cache
+        assert client.max_in_flight == 2
+        assert http.requests['bootstrap-static.json'] == 1 and http.requests['fixtures-event-1.json'] == 1
+
+        asgi_app.outbound.part_delay = 0
+        status, body = await request(asgi_app, 'POST', '/webhook', {'From': f'whatsapp:{ADMIN_PHONE}', 'Body': 'summary'})
+        assert f'Sending Gameweek {BENCH_GAMEWEEK} summary' in body
+        status, body = await request(asgi_app, 'GET', '/health')
+        assert status == 200
+        await asgi_app.shutdown()
+
+    try:
+        with league(app_module, build_spreadsheet(users), users):
+            asyncio.run(scenario())
+    finally:
+        app_module.fixture_service = saved_fixtures
+    # The summary went out through the async Twilio sender
+    assert client.posts and client.posts[0]['To'] == f'whatsapp:{ADMIN_PHONE}'
+
+
+class SheetsApiClient:
+    """Answers the Drive revision and values:batchGet calls; runs `during_read` inside the batchGet"""
+
+    def __init__(self, during_read=None):
+        self.during_read = during_read
+        self.order = []
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        await asyncio.sleep(0)
+        if 'batchGet' in url:
+            self.order.append('values')
+            if self.during_read:
+                self.during_read()
+            values = [['Gameweek', 'Player', 'Scored'], ['1', 'Haaland', 'Yes']]
+            return RecordedResponse(url, 200, json.dumps({'valueRanges': [{'values': values}]}))
+        self.order.append('revision')
+        return RecordedResponse(url, 200, json.dumps({'modifiedTime': 'rev-1'}))
+
+
+class ValidCredentials:
+    valid = True
+    token = 'token'
+
+
+def test_sheets_warm_reads_revision_first_and_yields_to_writes():
+    from services.async_clients import AsyncSheetsReader
+    from services.sheets_quota import SheetsQuota
+    from services.sheets_service import SheetsService
+
+    quota = SheetsQuota()
+    quota.buckets.clear()
+    sheets_service = SheetsService(spreadsheet=build_spreadsheet({}), quota=quota)
+
+    client = SheetsApiClient()
+    assert asyncio.run(AsyncSheetsReader(client, sheets_service, ValidCredentials()).warm(['Player Scores']))
+    assert client.order == ['revision', 'values']
+    assert sheets_service._records_cache['Player Scores'][0] == 'rev-1'
+
+    # A write lands while the batch read is in flight: its invalidation must stand
+    sheets_service._records_cache.clear()
+    client = SheetsApiClient(during_read=lambda: sheets_service._invalidate(sheets_service.get_worksheet('Player Scores')))
+    assert not asyncio.run(AsyncSheetsReader(client, sheets_service, ValidCredentials()).warm(['Player Scores']))
+    assert 'Player Scores' not in sheets_service._records_cache
+
+
+def test_records_from_values_match_get_all_records():
+    values = [['Gameweek', 'Player', 'Scored'], ['1', 'Haaland', 'Yes'], ['1', 'Salah']]
+    assert records_from_values(values) == [
+        {'Gameweek': 1, 'Player': 'Haaland', 'Scored': 'Yes'},
+        {'Gameweek': 1, 'Player': 'Salah', 'Scored': ''},
+    ]
+    assert records_from_values([]) == []
+
+
+if __name__ == "__main__":
+    test_webhook_over_asgi()
+    test_sheets_warm_reads_revision_first_and_yields_to_writes()
+    test_records_from_values_match_get_all_records()
+    print("✅ All ASGI tests passed")
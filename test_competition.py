@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+# Tests for the scoring rules and score cache shared by the PL and WC games
+import sys
+sys.path.append('.')
+
+from services.competition import PREMIER_LEAGUE, WORLD_CUP_2026, ScoreCache
+
+
+def test_rules():
+    goals = PREMIER_LEAGUE.rule('goal')
+    assert goals.multiplier(1) == 1.0
+    assert abs(goals.multiplier(2) - 0.9) < 1e-9
+    assert goals.multiplier(50) == 0.1
+    assert abs(goals.points(2, 3) - 1.6) < 1e-9
+
+    result = WORLD_CUP_2026.rule('group_result')
+    assert result.points('England', 'England', 'Croatia', 2, 1) == 1
+    assert result.points('Draw', 'England', 'Croatia', 1, 1) == 1
+    assert result.points('England', 'England', 'Croatia', 0, 1) == 0
+
+    winner = WORLD_CUP_2026.rule('group_winner')
+    assert winner.points('Spain', 'Spain', 'Spain') == 1
+    assert winner.points('Japan', 'Japan', 'Spain') == 3
+    assert winner.points('', 'Spain', 'Spain') == 0
+    assert winner.points('Spain', None, 'Spain') == 0
+
+    score = WORLD_CUP_2026.rule('knockout_score')
+    assert score.points(2, 1, 2, 1) == 2
+    assert score.points(1, 0, 3, 1) == 1
+    assert score.points(1, 1, 2, 2) == 1
+    assert score.points(1, 0, 0, 1) == 0
+
+
+def test_world_cup_forms():
+    assert WORLD_CUP_2026.forms_of('group_result') == [1, 2, 3]
+    assert WORLD_CUP_2026.form_kind(4) == 'group_winner'
+    assert WORLD_CUP_2026.forms_of('knockout_score') == [8, 9, 10]
+    assert WORLD_CUP_2026.form_kind(11) is None
+
+
+def test_score_cache_rescores_only_stale_keys():
+    cache = ScoreCache()
+    scored = []
+
+    def score(key):
+        scored.append(key)
+        return len(key)
+
+    items = [('ann', 'a', {'m1'}), ('bob', 'b', {'m2'})]
+    assert cache.refresh(items, {'m1': 1, 'm2': 2}, score) == {'ann': 3, 'bob': 3}
+    assert scored == ['ann', 'bob']
+
+    # Nothing changed: everything is reused
+    scored.clear()
+    cache.refresh(items, {'m1': 1, 'm2': 2}, score)
+    assert scored == []
+
+    # A changed result, a changed pick and a new key
+    items = [('ann', 'a', {'m1'}), ('bob', 'c', {'m2'}), ('cy', 'c', {'m3'})]
+    cache.refresh(items, {'m1': 5, 'm2': 2}, score)
+    assert scored == ['ann', 'bob', 'cy']
+
+    # A dropped key is forgotten, and clear() forgets everything
+    scored.clear()
+    cache.refresh(items[1:], {'m1': 5, 'm2': 2}, score)
+    cache.refresh(items, {'m1': 5, 'm2': 2}, score)
+    assert scored == ['ann']
+    cache.clear()
+    scored.clear()
+    cache.refresh(items, {'m1': 5, 'm2': 2}, score)
+    assert scored == ['ann', 'bob', 'cy']
+
+
+if __name__ == "__main__":
+    test_rules()
+    test_world_cup_forms()
+    test_score_cache_rescores_only_stale_keys()
+    print("✅ All competition tests passed")
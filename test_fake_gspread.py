@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+
+# Tests for the in-memory gspread fake used by the benchmarks, exercised
+# through the real SheetsService so the fake stays faithful to what it uses.
+import sys
+sys.path.append('.')
+
+from datetime import datetime, timedelta
+
+import utils.date_utils as date_utils
+from bench.fake_gspread import FakeSpreadsheet
+from services.sheets_quota import SheetsBusyError, SheetsQuota
+from services.sheets_service import SheetsService
+
+DEADLINE = datetime(2026, 8, 21, 18, 30)
+PICKS = ['Haaland', 'Salah', 'Saka', 'Palmer', 'Watkins', 'Isak', 'Son', 'Wissa']
+
+
+def make_service():
+    spreadsheet = FakeSpreadsheet()
+    quota = SheetsQuota()
+    quota.buckets.clear()
+    service = SheetsService(spreadsheet=spreadsheet, quota=quota)
+    service.setup_google_sheet_headers()
+    service.setup_user_status_sheet()
+    return spreadsheet, service
+
+
+def test_picks_round_trip_like_google():
+    spreadsheet, service = make_service()
+    service.add_to_google_sheet('+447375356774', PICKS, 1, DEADLINE)
+
+    picks = service.get_all_picks_for_gameweek(1)
+    # get_all_records numericises the phone, the service adds the '+' back
+    assert list(picks) == ['+447375356774']
+    assert picks['+447375356774']['players'] == PICKS
+    assert spreadsheet.calls['append_row'] == 2   # picks row + User Status row
+
+
+def test_calls_counted_and_revision_bumped_on_writes():
+    spreadsheet, service = make_service()
+    revision = spreadsheet.revision
+    spreadsheet.reset_calls()
+
+    service.get_all_picks_for_gameweek(1)
+    assert spreadsheet.revision == revision
+    assert spreadsheet.calls['get_all_records'] == 1
+
+    service.add_to_google_sheet('+447375356774', PICKS, 1, DEADLINE)
+    assert spreadsheet.revision > revision
+
+
+def test_archive_gameweek_moves_rows():
+    spreadsheet, service = make_service()
+    service.add_to_google_sheet('+447375356774', PICKS, 1, DEADLINE)
+    service.add_to_google_sheet('+447375356774', PICKS[::-1], 2, DEADLINE)
+
+    success, _ = service.archive_gameweek(1)
+    assert success
+    live = spreadsheet.worksheet('Sheet1').rows
+    assert [row[3] for row in live[1:]] == ['2']
+    assert spreadsheet.calls['batch_update'] == 1
+    assert service.get_all_picks_for_gameweek(1)['+447375356774']['players'] == PICKS
+
+
+def test_row_writes_find_rows_after_a_hand_sort():
+    spreadsheet, service = make_service()
+    service.add_to_google_sheet('+447375356774', PICKS, 1, DEADLINE)
+    service.get_user_status_from_sheet(1)   # User Status now cached
+
+    # An admin inserts a row above Peter's; the cached records still put him on row 2
+    status = spreadsheet.worksheet('User Status')
+    status.rows.insert(1, ['2026-08-21T09:00:00', '1', '+447000000002', 'Sam'] + [''] * 16)
+    spreadsheet.revision += 1
+
+    success, _ = service.eliminate_user('Peter', 1)
+    assert success
+    assert status.rows[1][3] == 'Sam' and status.rows[1][16] == ''
+    assert status.rows[2][3] == 'Peter' and status.rows[2][16] == 'Lost'
+
+
+def test_interrupted_archive_is_finished_by_the_next_rollover():
+    # The process dies before the row delete, or after it but before the index row
+    for crash_on in ('delete', 'index'):
+        spreadsheet, service = make_service()
+        service.add_to_google_sheet('+447375356774', PICKS, 1, DEADLINE)
+        service.add_to_google_sheet('+447375356774', PICKS[::-1], 2, DEADLINE)
+        batch_update, add_worksheet = spreadsheet.batch_update, spreadsheet.add_worksheet
+
+        def crashing_batch_update(body):
+            raise RuntimeError("dyno restarted")
+
+        def crashing_add_worksheet(title, rows, cols, index=None):
+            if title == 'Archive Index':
+                raise RuntimeError("dyno restarted")
+            return add_worksheet(title, rows, cols, index)
+
+        if crash_on == 'delete':
+            spreadsheet.batch_update = crashing_batch_update
+        else:
+            spreadsheet.add_worksheet = crashing_add_worksheet
+        success, _ = service.archive_gameweek(1)
+        assert not success
+        spreadsheet.batch_update, spreadsheet.add_worksheet = batch_update, add_worksheet
+
+        assert 1 not in service.get_archive_index()
+        assert service.archive_gameweek(1)[0]
+        assert service.get_archive_index() == {1: 'GW1 Picks'}
+        live = spreadsheet.worksheet('Sheet1').rows
+        assert [row[3] for row in live[1:]] == ['2']
+        assert service.get_all_picks_for_gameweek(1)['+447375356774']['players'] == PICKS
+
+
+def test_gameweek_without_picks_gets_no_tab():
+    spreadsheet, service = make_service()
+    tabs = len(spreadsheet.worksheets())
+
+    success, _ = service.archive_gameweek(3)
+    assert success
+    # Only the index tab is new, and GW3 is recorded so it isn't archived again
+    assert len(spreadsheet.worksheets()) == tabs + 1
+    assert service.get_archive_index() == {3: ''}
+    assert service.get_all_picks_for_gameweek(3) == {}
+
+
+def test_rollover_waits_for_corrections_and_survives_failures():
+    spreadsheet, service = make_service()
+    gw1_end, gw2_end = datetime(2026, 8, 24, 23, 0), datetime(2026, 8, 31, 23, 0)
+    real_now = date_utils.now_uk
+    try:
+        # Inside GW1's correction window nothing rolls over yet
+        date_utils.now_uk = lambda: gw1_end + timedelta(minutes=10)
+        assert date_utils.get_closed_gameweeks() == []
+
+        date_utils.now_uk = lambda: gw2_end + timedelta(hours=1)
+        archive_gameweek = service.archive_gameweek
+
+        def busy_on_gw1(gameweek_num):
+            if gameweek_num == 1:
+                raise SheetsBusyError()
+            return archive_gameweek(gameweek_num)
+        service.archive_gameweek = busy_on_gw1
+
+        service.archive_closed_gameweeks()
+        assert set(service.get_archive_index()) == {2}
+    finally:
+        date_utils.now_uk = real_now
+
+
+def test_leaderboard_reads_picks_and_scores_in_one_batch():
+    from services.gameweek_service import GameweekService
+
+    spreadsheet, service = make_service()
+    service.add_to_google_sheet('+447375356774', PICKS, 1, DEADLINE)
+    service.update_player_scored_status(1, 'Haaland', True)
+
+    gameweek_service = GameweekService(service)
+    spreadsheet.reset_calls()
+    user_scores, error = gameweek_service.calculate_user_scores(1)
+    assert error is None and len(user_scores) == 1
+    assert spreadsheet.calls['values_batch_get'] == 1
+    assert spreadsheet.calls['get_all_records'] == 0
+
+    # Both tabs now cached at this revision: no second batch
+    gameweek_service.calculate_user_scores(1)
+    assert spreadsheet.calls['values_batch_get'] == 1
+
+
+def test_error_replies_are_not_memoized():
+    from services.gameweek_service import GameweekService
+
+    spreadsheet, service = make_service()
+    service.add_to_google_sheet('+447375356774', PICKS, 1, DEADLINE)
+    service.update_player_scored_status(1, 'Haaland', True)
+    gameweek_service = GameweekService(service)
+
+    # A failed read looks like "no picks"; it must not stick for this data version
+    get_all_picks = service.get_all_picks_for_gameweek
+    service.get_all_picks_for_gameweek = lambda gameweek_num: {}
+    assert gameweek_service._generate_leaderboard(1) == "No picks found for this gameweek."
+    service.get_all_picks_for_gameweek = get_all_picks
+    assert "Peter" in gameweek_service._generate_leaderboard(1)
+
+
+if __name__ == "__main__":
+    test_picks_round_trip_like_google()
+    test_calls_counted_and_revision_bumped_on_writes()
+    test_archive_gameweek_moves_rows()
+    test_row_writes_find_rows_after_a_hand_sort()
+    test_interrupted_archive_is_finished_by_the_next_rollover()
+    test_gameweek_without_picks_gets_no_tab()
+    test_rollover_waits_for_corrections_and_survives_failures()
+    test_leaderboard_reads_picks_and_scores_in_one_batch()
+    test_error_replies_are_not_memoized()
+    print("✅ All fake gspread tests passed")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+
+# Tests for live goal ingestion, against recorded FPL JSON served with ETags
+import sys
+sys.path.append('.')
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+from bench.fake_fpl import RECORDINGS_DIR, RecordedFplHttp
+from bench.harness import RecordingTwilioClient, SCORES_HEADERS, build_spreadsheet
+from config.settings import ADMIN_PHONE
+from services.fixture_service import FixtureService
+from services.gameweek_service import GameweekService
+from services.live_scores_service import LiveScoresService
+from services.message_service import MessageService
+from services.sheets_quota import SheetsBusyError, SheetsQuota
+from services.scheduler_service import IDLE_POLL, POST_MATCH_POLL, live_poll_plan
+from services.sheets_service import SheetsService
+
+USERS = {ADMIN_PHONE: 'Admin', '+447000000001': 'User0001', '+447000000002': 'User0002'}
+
+
+def make_league(recordings):
+    spreadsheet = build_spreadsheet(USERS)
+    spreadsheet.seed('Player Scores', [SCORES_HEADERS])
+    quota = SheetsQuota()
+    quota.buckets.clear()
+    sheets_service = SheetsService(spreadsheet=spreadsheet, quota=quota)
+    twilio = RecordingTwilioClient()
+    message_service = MessageService(twilio, sheets_service)
+    message_service.outbound.part_delay = 0
+    http = RecordedFplHttp(recordings)
+    live = LiveScoresService(sheets_service, GameweekService(sheets_service), message_service,
+                             FixtureService(http=http))
+    return spreadsheet, sheets_service, twilio, http, live
+
+
+def picked_players(sheets_service):
+    return {p.title() for data in sheets_service.get_all_picks_for_gameweek(1).values() for p in data['players']}
+
+
+def set_goals(recordings, player_id, goals):
+    path = os.path.join(recordings, 'event-1-live.json')
+    with open(path) as f:
+        live = json.load(f)
+    for element in live['elements']:
+        if element['id'] == player_id:
+            element['stats']['goals_scored'] = goals
+    with open(path, 'w') as f:
+        json.dump(live, f)
+
+
+def test_scorers_applied_once_and_unchanged_feed_is_free():
+    with tempfile.TemporaryDirectory() as tmp:
+        recordings = os.path.join(tmp, 'fpl')
+        shutil.copytree(RECORDINGS_DIR, recordings)
+        spreadsheet, sheets_service, twilio, http, live = make_league(recordings)
+        picked = sorted(picked_players(sheets_service))
+        index = live._player_index()
+        scored_before = {name for name in picked if name in ('Haaland', 'Salah', 'Enzo')}
+
+        # Two picked players score, on top of whoever already scores in the recording
+        first, second, third = [name for name in picked if name not in scored_before][:3]
+        set_goals(recordings, index.resolve(first), 1)
+        set_goals(recordings, index.resolve(second), 2)
+        expected = sorted(scored_before | {first, second})
+        assert live.poll(1) == expected
+        live.message_service.outbound.wait_until_sent()
+        assert len(twilio.sent) == 1
+        to, body = twilio.sent[0]
+        assert to == f'whatsapp:{ADMIN_PHONE}' and body.startswith('⚽ LIVE:')
+
+        scores = {r['Player']: r['Scored'] for r in sheets_service.get_player_score_records()}
+        assert scores == {player: 'Yes' for player in expected}
+        for row in spreadsheet.worksheet('User Status').get_all_records():
+            for n in range(1, 9):
+                if row[f'Player {n}'] in expected:
+                    assert row[f'P{n} Scored'] == 'Yes'
+
+        # Unchanged feed: a 304, no Sheets traffic, no message
+        spreadsheet.reset_calls()
+        assert live.poll(1) == []
+        assert spreadsheet.total_calls() == 0
+        assert http.requests['event-1-live.json'] == 2
+
+        # One more scorer: only that player is written
+        set_goals(recordings, index.resolve(third), 1)
+        assert live.poll(1) == [third]
+        live.message_service.outbound.wait_until_sent()
+        assert len(twilio.sent) == 2
+        assert spreadsheet.calls['append_rows'] == 1
+
+
+def test_busy_sheets_leave_the_feed_to_be_retried():
+    with tempfile.TemporaryDirectory() as tmp:
+        recordings = os.path.join(tmp, 'fpl')
+        shutil.copytree(RECORDINGS_DIR, recordings)
+        spreadsheet, sheets_service, twilio, http, live = make_league(recordings)
+        scorer = sorted(picked_players(sheets_service))[0]
+        set_goals(recordings, live._player_index().resolve(scorer), 1)
+        apply_player_scores = sheets_service.apply_player_scores
+
+        def busy(gameweek_num, scorers):
+            raise SheetsBusyError()
+        sheets_service.apply_player_scores = busy
+        assert live.poll(1) == []
+
+        # Same feed again: fetched in full (no 304) and applied this time
+        sheets_service.apply_player_scores = apply_player_scores
+        assert live.poll(1) == [scorer]
+        assert live.poll(1) == []
+        assert http.requests['event-1-live.json'] == 3
+
+
+def test_manual_scores_are_never_overwritten():
+    with tempfile.TemporaryDirectory() as tmp:
+        recordings = os.path.join(tmp, 'fpl')
+        shutil.copytree(RECORDINGS_DIR, recordings)
+        spreadsheet, sheets_service, twilio, http, live = make_league(recordings)
+        ruled_out, scorer = sorted(picked_players(sheets_service))[:2]
+        index = live._player_index()
+        # The admin rules a goal out by hand before the feed credits it
+        sheets_service.update_player_scored_status(1, ruled_out, False)
+
+        set_goals(recordings, index.resolve(scorer), 1)
+        assert live.poll(1) == [scorer]
+        set_goals(recordings, index.resolve(ruled_out), 1)
+        assert live.poll(1) == []
+
+        scores = {r['Player']: r['Scored'] for r in sheets_service.get_player_score_records()}
+        assert scores == {ruled_out: 'No', scorer: 'Yes'}
+
+
+def test_ambiguous_pick_names_are_not_guessed():
+    from services.live_scores_service import FplPlayerIndex
+    players = {
+        1: {'web_name': 'B.Fernandes', 'first_name': 'Bruno Miguel', 'second_name': 'Borges Fernandes'},
+        2: {'web_name': 'M.Fernandes', 'first_name': 'Mateus', 'second_name': 'Espanha Fernandes'},
+        3: {'web_name': 'Ødegaard', 'first_name': 'Martin', 'second_name': 'Ødegaard'},
+    }
+    index = FplPlayerIndex(players)
+    assert index.resolve('Bruno Fernandes') == 1
+    assert index.resolve('B. Fernandes') == 1
+    assert index.resolve('Fernandes') is None
+    assert index.resolve('Odegaard') == 3
+
+
+def test_polling_follows_kickoffs():
+    saturday = datetime(2026, 8, 22, 12, 30)
+    sunday = datetime(2026, 8, 23, 14, 0)
+
+    def fixture(kickoff, started=False, provisional=False, finished=False):
+        return {'kickoff': kickoff, 'started': started, 'finished_provisional': provisional, 'finished': finished}
+
+    fixtures = [fixture(saturday), fixture(saturday + timedelta(hours=2, minutes=30)), fixture(sunday)]
+    # Before the first kickoff: sleep until it
+    assert live_poll_plan(fixtures, saturday - timedelta(minutes=20)) == (False, 1200)
+    # During a match (even before FPL flags it started): poll at the live interval
+    poll_now, delay = live_poll_plan(fixtures, saturday + timedelta(minutes=50))
+    assert poll_now and 30 <= delay <= 60
+
+    # Between matches on different days: back off, at most IDLE_POLL apart
+    fixtures[0].update(started=True, finished_provisional=True, finished=True)
+    fixtures[1].update(started=True, finished_provisional=True)
+    assert live_poll_plan(fixtures, saturday + timedelta(hours=5)) == (True, POST_MATCH_POLL)
+    fixtures[1].update(finished=True)
+    assert live_poll_plan(fixtures, saturday + timedelta(hours=5)) == (False, IDLE_POLL)
+
+    # All results confirmed: stop
+    fixtures[2].update(started=True, finished_provisional=True, finished=True)
+    assert live_poll_plan(fixtures, sunday + timedelta(hours=3)) == (False, None)
+
+
+if __name__ == "__main__":
+    test_scorers_applied_once_and_unchanged_feed_is_free()
+    test_busy_sheets_leave_the_feed_to_be_retried()
+    test_manual_scores_are_never_overwritten()
+    test_ambiguous_pick_names_are_not_guessed()
+    test_polling_follows_kickoffs()
+    print("✅ All live scores tests passed")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+# Tests for the structured log formatting and per-request log context
+import sys
+sys.path.append('.')
+
+import json
+import logging
+
+from utils.logging_utils import (ContextFilter, JsonFormatter, KeyValueFormatter, clear_log_context,
+                                 phone_hash, set_log_context)
+
+
+def make_record(message, *args, **extra):
+    record = logging.LogRecord('services.sheets_service', logging.INFO, __file__, 1, message, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    ContextFilter().filter(record)
+    return record
+
+
+def test_phone_hash_is_stable_and_hides_the_number():
+    assert phone_hash('+447375356774') == phone_hash('+447375356774')
+    assert phone_hash('+447375356774') != phone_hash('+447375356775')
+    assert '7375356774' not in phone_hash('+447375356774')
+    assert phone_hash('') == '-'
+
+
+def test_context_and_extra_fields_are_appended():
+    set_log_context(command='goal', phone=phone_hash('+447375356774'))
+    try:
+        record = make_record("Added picks for %s", 'Peter', gameweek=3)
+    finally:
+        clear_log_context()
+
+    line = KeyValueFormatter().format(record)
+    assert "INFO services.sheets_service Added picks for Peter" in line
+    assert line.endswith(f"command=goal phone={phone_hash('+447375356774')} gameweek=3")
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry['message'] == "Added picks for Peter"
+    assert entry['gameweek'] == 3 and entry['command'] == 'goal'
+
+
+def test_context_is_cleared_between_requests():
+    set_log_context(command='status')
+    clear_log_context()
+    assert KeyValueFormatter().format(make_record("Summary scheduler started")).endswith("started")
+
+
+if __name__ == "__main__":
+    test_phone_hash_is_stable_and_hides_the_number()
+    test_context_and_extra_fields_are_appended()
+    test_context_is_cleared_between_requests()
+    print("✅ All logging tests passed")
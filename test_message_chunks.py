@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+# Tests for splitting long replies into WhatsApp-sized parts and paging through them
+import sys
+sys.path.append('.')
+
+from utils.message_chunks import ReplyPager, WHATSAPP_LIMIT, number_parts, split_message
+
+
+def long_leaderboard(users=120):
+    lines = ["🏆 LEADERBOARD (DETAILED)", ""]
+    for i in range(1, users + 1):
+        lines.append(f"{i}. User {i} — 1.8 pts")
+        lines.append("   ⚽ Haaland (1g × 0.9) = 0.9")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def test_short_message_is_untouched():
+    assert split_message("hello\nworld") == ["hello\nworld"]
+    assert number_parts(["hello"]) == ["hello"]
+
+
+def test_split_at_line_boundaries_within_limit():
+    text = long_leaderboard()
+    parts = number_parts(split_message(text))
+
+    assert len(parts) > 1
+    assert all(len(part) <= WHATSAPP_LIMIT for part in parts)
+    assert parts[0].startswith(f"(1/{len(parts)})\n🏆 LEADERBOARD")
+    # Every line survives, in order (blank separators may move to a part boundary)
+    original = [line for line in text.split("\n") if line.strip()]
+    rejoined = [line for part in split_message(text) for line in part.split("\n") if line.strip()]
+    assert rejoined == original
+
+
+def test_overlong_line_is_hard_split():
+    parts = split_message("x" * 3500, limit=1000)
+    assert [len(p) for p in parts] == [1000, 1000, 1000, 500]
+
+
+def test_pager_serves_follow_up_pages():
+    pager = ReplyPager()
+    first = pager.paginate('+1', long_leaderboard())
+    total = first.split('\n', 1)[0].strip('()').split('/')[1]
+
+    assert "Reply 'more' for part 2/" in first
+    assert pager.page('+1').startswith(f"(2/{total})")
+    assert pager.page('+1', 1).startswith(f"(1/{total})")
+    assert pager.page('+2') == "Nothing more to show."
+    assert pager.page('+1', 99) == f"There are only {total} parts."
+
+
+if __name__ == "__main__":
+    test_short_message_is_untouched()
+    test_split_at_line_boundaries_within_limit()
+    test_overlong_line_is_hard_split()
+    test_pager_serves_follow_up_pages()
+    print("✅ All message chunk tests passed")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+# Tests for the in-process metrics registry and the command labels it uses
+import sys
+sys.path.append('.')
+
+from utils.metrics import Metrics
+from utils.text_utils import command_name
+
+
+def test_external_calls_are_counted_per_request():
+    metrics = Metrics()
+    metrics.start_request('whatsapp_webhook', 'goal')
+    with metrics.external_call('sheets', 'read'):
+        pass
+    with metrics.external_call('sheets', 'write'):
+        pass
+    try:
+        with metrics.external_call('fpl', 'fixtures'):
+            raise ConnectionError("down")
+    except ConnectionError:
+        pass
+
+    line = metrics.finish_request(200)
+    assert line.startswith("request route=whatsapp_webhook status=200 ")
+    assert "sheets_calls=2" in line and "fpl_calls=1" in line
+
+    text = metrics.render()
+    assert 'bot_external_calls_total{service="sheets",operation="read"} 1' in text
+    assert 'bot_external_errors_total{service="fpl",operation="fixtures"} 1' in text
+    assert 'bot_request_seconds_count{route="whatsapp_webhook",command="goal",status="200"} 1' in text
+    assert metrics.finish_request(200) is None
+
+
+def test_instrumented_methods_and_cache_ratio():
+    metrics = Metrics()
+
+    class Service:
+        def lookup(self, x):
+            return x * 2
+
+    metrics.instrument_class(Service, 'service')
+    assert Service().lookup(2) == 4
+
+    stats = {'hits': 3, 'misses': 1}
+    metrics.register_cache('records', lambda: stats)
+    text = metrics.render()
+    assert 'bot_method_seconds_count{component="service",method="lookup"} 1' in text
+    assert 'bot_cache_hit_ratio{cache="records"} 0.7500' in text
+    # One TYPE line per metric name
+    assert text.count('# TYPE bot_cache_hits_total') == 1
+
+
+def test_command_names():
+    assert command_name('goal Mohamed Salah') == 'goal'
+    assert command_name('Leaderboard Detail') == 'leaderboard_detail'
+    assert command_name('page 2') == 'more'
+    assert command_name('Haaland\nSalah\nSaka\nPalmer\nWatkins\nIsak\nSon\nWissa') == 'pick'
+    assert command_name('hello') == 'other'
+
+
+if __name__ == "__main__":
+    test_external_calls_are_counted_per_request()
+    test_instrumented_methods_and_cache_ratio()
+    test_command_names()
+    print("✅ All metrics tests passed")
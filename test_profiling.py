@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+# Tests for the opt-in request profiler
+import sys
+sys.path.append('.')
+
+import os
+import pstats
+import tempfile
+import time
+
+import utils.profiling as profiling
+from utils.profiling import RequestProfiler
+
+
+def handler(x):
+    return x + 1
+
+
+def slow_handler():
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+    return 'done'
+
+
+def test_disabled_profiler_returns_function_untouched():
+    profiler = RequestProfiler(directory=tempfile.mkdtemp(), every=0, slow_ms=0)
+    assert profiler.wrap(handler) is handler
+
+
+def test_every_nth_request_is_cprofiled():
+    directory = tempfile.mkdtemp()
+    profiler = RequestProfiler(directory=directory, every=2, slow_ms=0)
+    wrapped = profiler.wrap(handler, tag=lambda: 'goal')
+
+    assert [wrapped(i) for i in range(4)] == [1, 2, 3, 4]
+    files = sorted(os.listdir(directory))
+    assert len(files) == 2
+    assert all('_goal_' in name and name.endswith('.prof') for name in files)
+    pstats.Stats(os.path.join(directory, files[0]))   # loads as a valid pstats dump
+
+
+def test_only_slow_requests_keep_stack_samples():
+    directory = tempfile.mkdtemp()
+    profiler = RequestProfiler(directory=directory, every=0, slow_ms=20)
+
+    assert profiler.wrap(handler, tag=lambda: 'fast')(1) == 2
+    assert profiler.wrap(slow_handler, tag=lambda: 'leaderboard detail')() == 'done'
+
+    files = os.listdir(directory)
+    assert len(files) == 1
+    assert '_leaderboard_detail_' in files[0] and files[0].endswith('.folded')
+    with open(os.path.join(directory, files[0])) as f:
+        assert 'slow_handler' in f.read()
+
+
+def test_prune_only_deletes_profile_files():
+    directory = tempfile.mkdtemp()
+    for name in ('20200101-000000-000000_old_1ms.prof', '20200101-000000-000001_old_1ms.folded', 'notes.txt'):
+        open(os.path.join(directory, name), 'w').close()
+    profiler = RequestProfiler(directory=directory, every=1, slow_ms=0)
+
+    saved = profiling.MAX_PROFILE_FILES
+    profiling.MAX_PROFILE_FILES = 1
+    try:
+        profiler.wrap(handler, tag=lambda: 'new')(1)
+    finally:
+        profiling.MAX_PROFILE_FILES = saved
+
+    files = sorted(os.listdir(directory))
+    assert len(files) == 2
+    assert '_new_' in files[0] and files[0].endswith('.prof')
+    assert files[1] == 'notes.txt'
+
+
+if __name__ == "__main__":
+    test_disabled_profiler_returns_function_untouched()
+    test_every_nth_request_is_cprofiled()
+    test_only_slow_requests_keep_stack_samples()
+    test_prune_only_deletes_profile_files()
+    print("✅ All profiling tests passed")
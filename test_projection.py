@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+# Tests for the 'who can still win' gameweek projection
+import sys
+sys.path.append('.')
+
+import json
+import os
+import shutil
+import tempfile
+
+from bench.fake_fpl import RECORDINGS_DIR, RecordedFplHttp
+from bench.harness import build_spreadsheet
+from config.settings import ADMIN_PHONE
+from services import projection_service
+from services.fixture_service import FixtureService
+from services.gameweek_service import GameweekService, count_pickers, pick_multiplier
+from services.projection_service import ProjectionService, project
+from services.sheets_quota import SheetsQuota
+from services.sheets_service import SheetsService
+
+USERS = {ADMIN_PHONE: 'Admin', '+447000000001': 'User0001', '+447000000002': 'User0002',
+         '+447000000003': 'User0003'}
+
+
+def make_projection(recordings):
+    quota = SheetsQuota()
+    quota.buckets.clear()
+    sheets_service = SheetsService(spreadsheet=build_spreadsheet(USERS), quota=quota)
+    fixture_service = FixtureService(http=RecordedFplHttp(recordings))
+    return sheets_service, fixture_service, ProjectionService(GameweekService(sheets_service), fixture_service)
+
+
+def test_can_still_win_is_exact():
+    # Carol is 1.5 behind with two unique players left; Bob shares his only player with Alice
+    totals = {'Alice': 2.0, 'Bob': 0.5, 'Carol': 0.5}
+    remaining = {'Alice': {'Saka'}, 'Bob': {'Saka'}, 'Carol': {'Isak', 'Wood'}}
+    weights = {'Saka': pick_multiplier(2), 'Isak': 1.0, 'Wood': 1.0}
+    chances = {'Saka': 0.3, 'Isak': 0.3, 'Wood': 0.3}
+    report = project(totals, remaining, weights, chances, seed=1)
+
+    assert report['Alice']['can_win'] and report['Carol']['can_win']
+    assert not report['Bob']['can_win']
+    assert abs(report['Carol']['max'] - 2.5) < 1e-9 and abs(report['Alice']['max'] - 2.9) < 1e-9
+    assert report['Bob']['win'] == 0
+    assert abs(sum(entry['win'] for entry in report.values()) - 1) < 1e-9
+    # Carol only wins if both her players score: 0.3 * 0.3, with Saka blank
+    assert 0.04 < report['Carol']['win'] < 0.09
+
+    # Without numpy the exact part is unchanged and there are no chances
+    numpy, projection_service.np = projection_service.np, None
+    try:
+        assert project(totals, remaining, weights, chances) == {
+            user: dict(entry, win=None) for user, entry in report.items()
+        }
+    finally:
+        projection_service.np = numpy
+
+
+def test_projection_counts_only_players_still_to_play():
+    with tempfile.TemporaryDirectory() as tmp:
+        recordings = os.path.join(tmp, 'fpl')
+        shutil.copytree(RECORDINGS_DIR, recordings)
+        sheets_service, fixture_service, projection = make_projection(recordings)
+
+        all_picks = sheets_service.get_all_picks_for_gameweek(1)
+        pickers = count_pickers(all_picks)
+        scored = {r['Player'] for r in sheets_service.get_player_score_records()}
+        text = projection.get_projection(1)
+        assert text.startswith("🔮 GW1 — WHO CAN STILL WIN?")
+        assert f"{len(set(pickers) - scored)} picked players still to play" in text
+
+        # Every fixture finished: only the current scores are left
+        path = os.path.join(recordings, 'fixtures-event-1.json')
+        with open(path) as f:
+            fixtures = json.load(f)
+        for fixture in fixtures:
+            fixture['finished'] = fixture['finished_provisional'] = True
+        with open(path, 'w') as f:
+            json.dump(fixtures, f)
+        fixture_service._fixtures_cache.clear()
+
+        text = projection.get_projection(1)
+        assert "0 picked players still to play" in text
+        user_scores, _ = projection.gameweek_service.calculate_user_scores(1)
+        best = user_scores[0]['total_score']
+        for user_score in user_scores:
+            line = f"{user_score['name']} — {user_score['total_score']:.1f} pts (max {user_score['total_score']:.1f})"
+            assert line in text
+            assert (f"~{line}~" in text) == (user_score['total_score'] < best)
+
+
+if __name__ == "__main__":
+    test_can_still_win_is_exact()
+    test_projection_counts_only_players_still_to_play()
+    print("✅ All projection tests passed")
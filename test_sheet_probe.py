@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+# Tests for the revision-probe backed records cache in SheetsService,
+# run against a small in-memory stand-in for the gspread spreadsheet.
+import sys
+sys.path.append('.')
+
+from gspread.exceptions import APIError, WorksheetNotFound
+
+from services.sheets_service import SheetsService
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, records):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.records = records
+        self.downloads = 0
+
+    def get_all_records(self):
+        self.downloads += 1
+        return list(self.records)
+
+    def append_row(self, row):
+        self.records.append({'Timestamp': row[0], 'Phone Number': row[1][1:], 'Gameweek': row[3],
+                             **{f'Player {i}': row[4 + i] for i in range(1, 9)}})
+        self.spreadsheet.revision += 1
+
+
+class FakeSpreadsheet:
+    def __init__(self):
+        self.revision = 1
+        self.probes = 0
+        self.sheet1 = FakeWorksheet(self, 'Sheet1', [])
+        self.spreadsheet = self
+
+    def get_lastUpdateTime(self):
+        self.probes += 1
+        return f"rev-{self.revision}"
+
+    def worksheet(self, title):
+        raise WorksheetNotFound(title)
+
+
+class FakeResponse:
+    def __init__(self, status_code, message):
+        self.status_code = status_code
+        self.text = message
+
+    def json(self):
+        return {'error': {'code': self.status_code, 'message': self.text}}
+
+
+def make_service():
+    spreadsheet = FakeSpreadsheet()
+    service = SheetsService(spreadsheet=spreadsheet)
+    service.probe.interval = 0  # probe on every read so the test sees each change
+    return spreadsheet, service
+
+
+def test_unchanged_sheet_is_not_downloaded_again():
+    spreadsheet, service = make_service()
+    service.get_all_picks_for_gameweek(1)
+    service.get_all_picks_for_gameweek(1)
+    service.get_all_picks_for_gameweek(2)
+
+    assert spreadsheet.sheet1.downloads == 1
+    assert spreadsheet.probes == 3
+    assert service.cache_stats == {'hits': 2, 'misses': 1}
+
+
+def test_external_edit_triggers_refetch():
+    spreadsheet, service = make_service()
+    service.get_all_picks_for_gameweek(1)
+
+    # Someone edits the sheet by hand: only the revision changes
+    spreadsheet.sheet1.records.append({'Timestamp': '2026-08-21T10:00:00', 'Phone Number': 447375356774,
+                                       'Gameweek': 1, 'Player 1': 'Salah'})
+    spreadsheet.revision += 1
+
+    picks = service.get_all_picks_for_gameweek(1)
+    assert spreadsheet.sheet1.downloads == 2
+    assert picks['+447375356774']['players'] == ['Salah']
+
+
+def test_own_write_invalidates_cache():
+    spreadsheet, service = make_service()
+    service.probe.interval = 60  # a long-lived probe answer must not hide our own write
+    service.get_all_picks_for_gameweek(1)
+
+    service.get_google_sheet().append_row(['2026-08-21T10:00:00', '+447375356774', 'Peter', 1, '',
+                                           'Haaland', 'Salah', 'Saka', 'Palmer', 'Watkins', 'Isak', 'Son', 'Wissa'])
+    service._invalidate(service.get_google_sheet())
+
+    picks = service.get_all_picks_for_gameweek(1)
+    assert spreadsheet.sheet1.downloads == 2
+    assert len(picks['+447375356774']['players']) == 8
+
+
+def test_ttl_fallback_when_probe_unavailable():
+    spreadsheet, service = make_service()
+
+    def no_drive_access():
+        raise APIError(FakeResponse(403, "Google Drive API has not been used in project 123 or it is disabled."))
+    spreadsheet.get_lastUpdateTime = no_drive_access
+
+    service.get_all_picks_for_gameweek(1)
+    service.get_all_picks_for_gameweek(1)
+    assert service.probe.available is False
+    assert spreadsheet.sheet1.downloads == 1
+
+
+def test_transient_probe_failure_is_retried():
+    spreadsheet, service = make_service()
+    working_probe = spreadsheet.get_lastUpdateTime
+
+    def network_blip():
+        raise ConnectionResetError("connection reset by peer")
+    spreadsheet.get_lastUpdateTime = network_blip
+
+    assert service.probe.token(spreadsheet) is None
+    assert service.probe.available is True
+
+    spreadsheet.get_lastUpdateTime = working_probe
+    assert service.probe.token(spreadsheet) == "rev-1"
+
+
+if __name__ == "__main__":
+    test_unchanged_sheet_is_not_downloaded_again()
+    test_external_edit_triggers_refetch()
+    test_own_write_invalidates_cache()
+    test_ttl_fallback_when_probe_unavailable()
+    test_transient_probe_failure_is_retried()
+    print("✅ All sheet probe tests passed")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+# Tests for the shared Sheets rate limiter and retry policy
+import sys
+import time
+sys.path.append('.')
+
+import requests
+from gspread.exceptions import APIError
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+import services.sheets_quota as sheets_quota
+from services.sheets_quota import SheetsBusyError, SheetsQuota, TokenBucket
+
+# Keep retry backoff short so the tests run instantly
+sheets_quota.BACKOFF_BASE = 0.001
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = f"HTTP {status_code}"
+
+    def json(self):
+        return {'error': {'code': self.status_code, 'message': self.text}}
+
+
+def flaky(failures, status=429):
+    """Return a callable that fails `failures` times with `status`, then succeeds"""
+    calls = {'n': 0}
+
+    def call():
+        calls['n'] += 1
+        if calls['n'] <= failures:
+            raise APIError(FakeResponse(status))
+        return 'ok'
+    return call, calls
+
+
+def test_retries_rate_limited_calls():
+    quota = SheetsQuota()
+    call, calls = flaky(2)
+
+    assert quota.call('read', call) == 'ok'
+    assert calls['n'] == 3
+    assert quota.stats['retried'] == 2
+    assert quota.stats['rejected'] == 0
+
+
+def test_gives_up_with_busy_error():
+    quota = SheetsQuota()
+    call, calls = flaky(100, status=503)
+
+    try:
+        quota.call('write', call)
+        assert False, "expected SheetsBusyError"
+    except SheetsBusyError:
+        pass
+    assert calls['n'] == sheets_quota.MAX_RETRIES + 1
+    assert quota.stats['rejected'] == 1
+
+
+def test_client_errors_are_not_retried():
+    quota = SheetsQuota()
+    call, calls = flaky(1, status=400)
+
+    try:
+        quota.call('read', call)
+        assert False, "expected APIError"
+    except APIError:
+        pass
+    assert calls['n'] == 1
+
+
+def test_retries_stop_at_call_deadline():
+    saved = sheets_quota.CALL_DEADLINE, sheets_quota.BACKOFF_BASE, sheets_quota.random.uniform
+    sheets_quota.CALL_DEADLINE = 0.2
+    sheets_quota.BACKOFF_BASE = 0.15
+    sheets_quota.random.uniform = lambda low, high: high
+    try:
+        quota = SheetsQuota()
+        call, calls = flaky(100, status=503)
+
+        started = time.monotonic()
+        try:
+            quota.call('read', call)
+            assert False, "expected SheetsBusyError"
+        except SheetsBusyError:
+            pass
+        # 0.15s + 0.3s of backoff would overrun the deadline, so only one retry happens
+        assert time.monotonic() - started < 0.3
+        assert calls['n'] == 2
+        assert quota.stats['rejected'] == 1
+    finally:
+        sheets_quota.CALL_DEADLINE, sheets_quota.BACKOFF_BASE, sheets_quota.random.uniform = saved
+
+
+def test_appends_are_not_retried_once_they_may_have_landed():
+    quota = SheetsQuota()
+    rows = []
+
+    def append_row(row, failures={'n': 0}, error=None):
+        rows.append(row)
+        failures['n'] += 1
+        if failures['n'] == 1:
+            raise error
+        return 'ok'
+
+    # A 503 or a read timeout may come after Google wrote the row
+    for error in (APIError(FakeResponse(503)), requests.exceptions.ReadTimeout("read timed out")):
+        rows.clear()
+        try:
+            quota.call('write', append_row, ['row'], failures={'n': 0}, error=error)
+            assert False, "expected the original error"
+        except type(error):
+            pass
+        assert rows == [['row']]
+
+    # Rate limited or never connected: nothing was written, so retrying is safe
+    refused = requests.exceptions.ConnectionError(
+        MaxRetryError(None, '/values:append', NewConnectionError(None, "Connection refused")))
+    for error in (APIError(FakeResponse(429)), refused):
+        rows.clear()
+        assert quota.call('write', append_row, ['row'], failures={'n': 0}, error=error) == 'ok'
+        assert len(rows) == 2
+
+
+def test_busy_write_reaches_the_reply():
+    from bench.fake_gspread import FakeSpreadsheet
+    from services.sheets_service import SheetsService
+
+    def busy(title):
+        raise SheetsBusyError()
+
+    service = SheetsService(spreadsheet=FakeSpreadsheet())
+    service.get_worksheet = busy
+    try:
+        service.eliminate_user('Peter', 1)
+        assert False, "expected SheetsBusyError"
+    except SheetsBusyError:
+        pass
+
+
+def test_bucket_rejects_when_wait_too_long():
+    bucket = TokenBucket(per_minute=1, burst=2)
+    assert bucket.acquire(max_wait=0) == 0.0
+    assert bucket.acquire(max_wait=0) == 0.0
+    # Next token is ~60s away
+    assert bucket.acquire(max_wait=1) is None
+
+
+def test_deadline_replay_keeps_to_the_quota():
+    from bench.deadline_replay import over_quota, simulate_queue
+
+    # 100 picks in the same second, one write each, no handler time or latency
+    arrivals = [(0.0, f'+44{i}', '') for i in range(100)]
+    handler_times = [0.0] * 100
+    sheets_calls = [['write']] * 100
+
+    schedule = simulate_queue(arrivals, handler_times, sheets_calls, workers=1, latency=0.0)
+    assert not over_quota(schedule)
+    assert sum(1 for entry in schedule if entry['throttled']) == 100 - sheets_quota.WRITE_BURST
+    # The backlog drains at the bucket's rate, so the last request finishes well over a minute in
+    assert schedule[-1]['finish'] > 60
+
+    # Without the buckets every call lands in minute 0 and Google would refuse 40 of them
+    schedule = simulate_queue(arrivals, handler_times, sheets_calls, workers=1, latency=0.0, quota=False)
+    assert len(over_quota(schedule)) == 40
+
+
+if __name__ == "__main__":
+    test_retries_rate_limited_calls()
+    test_gives_up_with_busy_error()
+    test_client_errors_are_not_retried()
+    test_retries_stop_at_call_deadline()
+    test_appends_are_not_retried_once_they_may_have_landed()
+    test_busy_write_reaches_the_reply()
+    test_bucket_rejects_when_wait_too_long()
+    test_deadline_replay_keeps_to_the_quota()
+    print("✅ All sheets quota tests passed")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+# Tests for the season standings table (season, form and head-to-head queries)
+import sys
+sys.path.append('.')
+
+from gspread.exceptions import WorksheetNotFound
+
+from services.standings_service import StandingsService
+
+
+class NoStandingsSheet:
+    """Sheets service stand-in with no Season Scores tab yet"""
+
+    def get_worksheet(self, title):
+        raise WorksheetNotFound(title)
+
+
+def scores(**points):
+    return [{'name': name, 'total_score': pts, 'breakdown': []} for name, pts in points.items()]
+
+
+def make_standings():
+    standings = StandingsService(NoStandingsSheet())
+    standings.user_map = {'+1': 'Peter', '+2': 'Sam', '+3': 'Aubrey'}
+    standings.record_gameweek(1, scores(Peter=1.8, Sam=0.9))
+    standings.record_gameweek(2, scores(Peter=0.0, Sam=2.7, Aubrey=1.0))
+    return standings
+
+
+def test_season_table_sums_gameweeks():
+    table = make_standings().format_season_table()
+    lines = table.splitlines()
+    assert lines[0] == "🏆 SEASON TABLE (GW1–GW2) (incl. live GW2)"
+    assert lines[2] == "1. Sam — 3.6 pts (2 GW)"
+    assert lines[3] == "2. Peter — 1.8 pts (2 GW)"
+    assert lines[4] == "3. Aubrey — 1.0 pts (1 GW)"
+
+
+def test_live_gameweek_is_replaced_not_added():
+    standings = make_standings()
+    standings.record_gameweek(2, scores(Peter=0.9, Sam=2.7, Aubrey=1.0))
+    assert "2. Peter — 2.7 pts (2 GW)" in standings.format_season_table()
+
+
+def test_form_uses_last_n_gameweeks():
+    form = make_standings().format_form(last_n=1)
+    assert form.splitlines()[0].startswith("📈 FORM — LAST 1 (GW2–GW2)")
+    assert "Sam: 2.7 = 2.7" in form
+
+
+def test_head_to_head():
+    h2h = make_standings().format_head_to_head('peter', 'SAM')
+    assert "GW1: 1.8 — 0.9" in h2h
+    assert "Record: Peter 1W · 0D · 1W Sam" in h2h
+    assert make_standings().format_head_to_head('Peter', 'Nobody') == "User 'Nobody' not found."
+
+
+if __name__ == "__main__":
+    test_season_table_sums_gameweeks()
+    test_live_gameweek_is_replaced_not_added()
+    test_form_uses_last_n_gameweeks()
+    test_head_to_head()
+    print("✅ All standings tests passed")
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+
+# Tests for the archived World Cup 2026 scoring (archive/worldcup2026/services)
+import sys
+sys.path.append('.')
+
+import importlib.util
+import os
+
+WC_SERVICES = os.path.join('archive', 'worldcup2026', 'services')
+
+
+def load_wc_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(WC_SERVICES, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    # As deployed, where these modules import each other from services/
+    sys.modules[f'services.{name}'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+wc_scoring_service = load_wc_module('wc_scoring_service')
+
+RESULTS = [
+    {'match_key': 'England vs Croatia', 'home_score': 2, 'away_score': 1, 'stage': 'group', 'matchday': 1},
+    {'match_key': 'Mexico vs South Africa', 'home_score': 1, 'away_score': 1, 'stage': 'group', 'matchday': 1},
+    # A later correction of a group result: the latest entry is the one scored
+    {'match_key': 'England vs Croatia', 'home_score': 0, 'away_score': 1, 'stage': 'group', 'matchday': 1},
+    {'match_key': 'France vs Morocco', 'home_score': 2, 'away_score': 1, 'stage': 'knockout', 'matchday': ''},
+]
+
+FORM1 = ['Timestamp', 'Your name', 'England (#4) vs Croatia (#10)', 'Mexico (#15) vs South Africa (#57)']
+
+
+def picks(form_headers, values):
+    # As WCSheetsService.get_all_picks returns a submission: the tab's header row and the raw row
+    return {'timestamp': values[0], 'headers': form_headers, 'row': values}
+
+
+PICKS = {
+    'peter': {'display_name': 'Peter', 'forms': {
+        1: picks(FORM1, ['2026-06-10', 'Peter', 'England', 'Draw']),
+        4: picks(['Timestamp', 'Your name', 'Group A Winner'], ['2026-06-10', 'Peter', 'Mexico (#15)']),
+        5: picks(['Timestamp', 'Your name', 'France vs Morocco'], ['2026-06-28', 'Peter', 'France']),
+        8: picks(['Timestamp', 'Your name', 'France vs Morocco [France]', 'France vs Morocco [Morocco]'],
+                 ['2026-07-08', 'Peter', '2', '1']),
+    }},
+    'dave': {'display_name': 'Dave', 'forms': {
+        1: picks(FORM1, ['2026-06-10', 'Dave', 'Croatia', 'Mexico']),
+        8: picks(['Timestamp', 'Your name', 'France vs Morocco [France]', 'France vs Morocco [Morocco]'],
+                 ['2026-07-08', 'Dave', '3', '0']),
+    }},
+}
+
+
+class FakeWCSheets:
+    def __init__(self, results=RESULTS):
+        self.results = results
+
+    def get_all_results(self):
+        return self.results
+
+    def get_all_picks(self):
+        return PICKS
+
+    def get_bonus_ledger(self):
+        return {'peter': (0.5, [8])}
+
+    def get_group_winners(self):
+        return {'A': 'Mexico'}
+
+    def normalize_name(self, name):
+        return name.strip().lower()
+
+
+def test_leaderboard_scores_every_form():
+    text = wc_scoring_service.WCScoringService(FakeWCSheets()).calculate_leaderboard()
+    # Peter: 1 group + 1 group winner (top seed) + 1 R32 + 2 exact QF + 0.5 bonus; Dave: 1 group + 1 QF result
+    assert "1. Peter  —  5.5 pts" in text
+    assert "2. Dave  —  2 pts" in text
+
+
+def test_result_index_and_column_keys():
+    results = wc_scoring_service.index_results(RESULTS)
+    assert results['group'][('England vs Croatia', 1)]['home_score'] == 0
+    assert list(results['knockout']) == ['France vs Morocco']
+
+
+def make_wc_sheets(results=()):
+    from bench.fake_gspread import FakeSpreadsheet
+    from services.sheets_quota import SheetsQuota
+
+    spreadsheet = FakeSpreadsheet()
+    spreadsheet.seed('results', [['match_key', 'home_score', 'away_score', 'stage', 'matchday', 'timestamp'],
+                                 *results])
+    quota = SheetsQuota()
+    quota.buckets.clear()
+    sheets = load_wc_module('wc_sheets_service').WCSheetsService(spreadsheet=spreadsheet, quota=quota)
+    return spreadsheet, sheets
+
+
+def test_group_fixtures_match_in_either_order():
+    _, sheets = make_wc_sheets()
+    assert sheets.determine_match_stage_and_matchday('Croatia vs England') == ('group', 1)
+    assert sheets.determine_match_stage_and_matchday('Panama vs England') == ('group', 3)
+    assert sheets.determine_match_stage_and_matchday('France vs Morocco') == ('knockout', None)
+
+    # An old row logged the wrong way round (and so as knockout) still scores its group pick
+    reversed_result = {'match_key': 'Croatia vs England', 'home_score': 1, 'away_score': 2,
+                       'stage': 'knockout', 'matchday': ''}
+    results = wc_scoring_service.index_results([reversed_result])
+    assert results['group'][('England vs Croatia', 1)]['home_score'] == 2
+    assert results['knockout'] == {}
+
+
+def test_group_opponents_meeting_again_in_the_knockouts():
+    _, sheets = make_wc_sheets([['England vs Croatia', 2, 1, 'group', 1, '2026-06-14']])
+    # Before the knockouts, logging the fixture again corrects the group result
+    assert sheets.determine_match_stage_and_matchday('England vs Croatia') == ('group', 1)
+
+    sheets.log_result('France vs Morocco', 2, 1, 'knockout', None)
+    assert sheets.determine_match_stage_and_matchday('England vs Croatia') == ('knockout', None)
+    sheets.log_result('England vs Croatia', 1, 1, 'knockout', None)
+
+    results = wc_scoring_service.index_results(sheets.get_all_results())
+    assert results['group'][('England vs Croatia', 1)]['home_score'] == 2
+    assert results['knockout']['England vs Croatia']['away_score'] == 1
+
+    qf = ['Timestamp', 'Your name', 'England vs Croatia [England]', 'England vs Croatia [Croatia]']
+    form8 = picks(qf, ['2026-07-08', 'Peter', '1', '1'])
+    assert wc_scoring_service.WCScoringService(sheets)._score_qf_picks(form8, results) == 2
+
+
+def test_team_resolver():
+    resolver = load_wc_module('wc_team_resolver').team_resolver
+    assert resolver.resolve('ENG') == 'England'
+    assert resolver.resolve('eng') == 'England'
+    assert resolver.resolve('south korea') == 'South Korea'
+    assert resolver.resolve('Croatai') == 'Croatia'
+    assert resolver.resolve('Nethrlands') == 'Netherlands'
+    assert resolver.resolve('Wakanda') is None
+    assert resolver.abbreviation('Ivory Coast') == 'CIV'
+    assert resolver.abbreviation('Curacao') == 'CUR'
+
+
+def test_form_schema_types_columns_once():
+    schema = wc_scoring_service.form_schema(tuple(FORM1 + ['Group B Winner', 'Spain vs Italy [Spain]']))
+    assert schema.group_matches[0] == (2, 'England vs Croatia', 'England', 'Croatia')
+    assert schema.group_winners == [(4, 'B')]
+    assert schema.score_columns == [(5, 'Spain vs Italy', 'Spain')]
+    assert wc_scoring_service.form_schema(tuple(FORM1)) is wc_scoring_service.form_schema(tuple(FORM1))
+
+
+def test_new_result_rescores_only_forms_with_that_match():
+    sheets = FakeWCSheets(list(RESULTS[:2]))
+    scoring = wc_scoring_service.WCScoringService(sheets)
+    rescored = []
+    score_form = scoring._score_form
+    scoring._score_form = lambda form_num, *args: rescored.append(form_num) or score_form(form_num, *args)
+
+    scoring.calculate_leaderboard()
+    assert sorted(rescored) == [1, 1, 4, 5, 8, 8]
+
+    rescored.clear()
+    assert scoring.get_detailed_scores('peter').endswith("🏆 TOTAL: 3.5 pts")
+    assert rescored == []
+
+    sheets.results.append(RESULTS[3])
+    rescored.clear()
+    assert "1. Peter  —  6.5 pts" in scoring.calculate_leaderboard()
+    assert sorted(rescored) == [5, 8, 8]
+
+
+def test_corrected_result_rescores_forms_that_depend_on_it():
+    sheets = FakeWCSheets(RESULTS[:2] + RESULTS[3:])
+    scoring = wc_scoring_service.WCScoringService(sheets)
+    rescored = []
+    score_form = scoring._score_form
+    scoring._score_form = lambda form_num, *args: rescored.append(form_num) or score_form(form_num, *args)
+    assert "1. Peter  —  6.5 pts" in scoring.calculate_leaderboard()
+
+    # England vs Croatia re-entered as 0-1: only the two form 1 rows are rescored
+    sheets.results.insert(2, RESULTS[2])
+    rescored.clear()
+    text = scoring.calculate_leaderboard()
+    assert sorted(rescored) == [1, 1]
+    assert "1. Peter  —  5.5 pts" in text and "2. Dave  —  2 pts" in text
+
+
+def test_whatif_plays_out_remaining_matches_with_the_scoring_rules():
+    wc_simulator = load_wc_module('wc_simulator')
+    scoring = wc_scoring_service.WCScoringService(FakeWCSheets(list(RESULTS[:2])))
+    all_picks, results, totals, _ = scoring.player_totals()
+    matches = wc_simulator.remaining_matches(all_picks, results)
+    assert list(matches) == [('knockout', 'France vs Morocco')]
+
+    simulation = wc_simulator.WhatIf(['Peter', 'Dave'], [totals['peter'], totals['dave']], matches)
+    (table,) = simulation.tables
+    # Each scoreline's points are what the leaderboard gives once it is logged
+    outcome = wc_simulator.MAX_GOALS + 1
+    for home, away in [(2, 1), (3, 0), (0, 0), (1, 2)]:
+        result = {'match_key': 'France vs Morocco', 'home_score': home, 'away_score': away, 'stage': 'knockout'}
+        after = wc_scoring_service.WCScoringService(FakeWCSheets(list(RESULTS[:2]) + [result])).player_totals()[2]
+        assert list(table[home * outcome + away]) == [after['peter'] - totals['peter'], after['dave'] - totals['dave']]
+
+    report, played, exhaustive = simulation.run()
+    assert exhaustive and played == 36
+    assert report['Peter']['best'] == 1 and report['Dave']['worst'] == 2
+    assert abs(report['Peter']['win'] + report['Dave']['win'] - 1) < 1e-9
+    assert report['Peter']['max'] == 6.5 and report['Dave']['alive'] is False
+    assert "Dave  —  out (max 2 pts, #2)" in wc_simulator.format_whatif(report, played, exhaustive)
+
+    sampled, played, exhaustive = simulation.run(scenarios=20, seed=1)
+    assert not exhaustive and played == 20
+
+
+def test_whatif_is_out_when_a_shared_pick_keeps_the_gap():
+    wc_simulator = load_wc_module('wc_simulator')
+    # Ann leads Bob by one and both backed Brazil in the only match left: Bob can't catch up
+    matches = {('group', 'Brazil vs Morocco', 1): {
+        'teams': ('Brazil', 'Morocco'),
+        'picks': [(0, 'outcome', 'Brazil'), (1, 'outcome', 'Brazil')],
+    }}
+    simulation = wc_simulator.WhatIf(['Ann', 'Bob'], [10, 9], matches)
+    assert simulation.max_totals()[1] >= 10    # his maximum alone would pass Ann's current total
+
+    report, played, exhaustive = simulation.run()
+    assert exhaustive and played == 3
+    assert report['Bob']['best'] == 2 and report['Bob']['alive'] is False
+    assert report['Ann']['alive'] is True
+    assert "Bob  —  out" in wc_simulator.format_whatif(report, played, exhaustive)
+
+    # Sampling can't prove it, but Bob's own best case still leaves him second
+    report, _, exhaustive = simulation.run(scenarios=2, seed=1)
+    assert not exhaustive and report['Bob']['alive'] is False
+
+
+def test_leaderboard_reads_every_tab_in_one_batch():
+    from bench.fake_gspread import FakeSpreadsheet
+    from services.sheets_quota import SheetsQuota
+
+    spreadsheet = FakeSpreadsheet()
+    spreadsheet.seed('form1_picks', [FORM1, ['2026-06-10', 'Peter', 'England', 'Draw'],
+                                     ['2026-06-10', 'Dave', 'Croatia', 'Mexico']])
+    spreadsheet.seed('results', [['match_key', 'home_score', 'away_score', 'stage', 'matchday', 'timestamp'],
+                                 ['England vs Croatia', 2, 1, 'group', 1, '2026-06-14']])
+    spreadsheet.seed('bonus', [['form', 'player', 'points', 'timestamp']])
+    spreadsheet.seed('group_winners', [['group', 'team', 'timestamp']])
+    quota = SheetsQuota()
+    quota.buckets.clear()
+    sheets = load_wc_module('wc_sheets_service').WCSheetsService(spreadsheet=spreadsheet, quota=quota)
+    scoring = wc_scoring_service.WCScoringService(sheets)
+
+    assert "1. Peter  —  1 pts" in scoring.calculate_leaderboard()
+    assert spreadsheet.calls['values_batch_get'] == 1
+
+    spreadsheet.reset_calls()
+    scoring.calculate_leaderboard()
+    assert spreadsheet.total_calls() == 0
+
+    sheets.log_result('Mexico vs South Africa', 1, 1, 'group', 1)
+    spreadsheet.reset_calls()
+    assert "1. Peter  —  2 pts" in scoring.calculate_leaderboard()
+    assert spreadsheet.calls['values_batch_get'] == 1
+
+    sheets.award_bonus_points(1, ['Dave', 'Peter'], 0.5)
+    sheets.award_bonus_points(2, ['dave'], 1)
+    assert spreadsheet.calls['append_rows'] == 2
+    assert sheets.get_bonus_ledger() == {'dave': (1.5, [1, 2]), 'peter': (0.5, [1])}
+    assert "1. Peter  —  2.5 pts" in scoring.calculate_leaderboard()
+
+
+def test_result_edited_in_the_sheet_updates_the_leaderboard():
+    from bench.fake_gspread import FakeSpreadsheet
+    from services.sheets_quota import SheetsQuota
+
+    spreadsheet = FakeSpreadsheet()
+    spreadsheet.seed('form1_picks', [FORM1, ['2026-06-10', 'Peter', 'England', 'Draw'],
+                                     ['2026-06-10', 'Dave', 'Croatia', 'Mexico']])
+    spreadsheet.seed('results', [['match_key', 'home_score', 'away_score', 'stage', 'matchday', 'timestamp'],
+                                 ['England vs Croatia', 2, 1, 'group', 1, '2026-06-14'],
+                                 ['Mexico vs South Africa', 1, 1, 'group', 1, '2026-06-14']])
+    quota = SheetsQuota()
+    quota.buckets.clear()
+    sheets = load_wc_module('wc_sheets_service').WCSheetsService(spreadsheet=spreadsheet, quota=quota)
+    sheets.probe.interval = 0
+    scoring = wc_scoring_service.WCScoringService(sheets)
+    text = scoring.calculate_leaderboard()
+    assert "1. Peter  —  2 pts" in text and "2. Dave  —  0 pts" in text
+
+    spreadsheet.worksheet('results').rows[1][1] = 0
+    spreadsheet.revision += 1
+    text = scoring.calculate_leaderboard()
+    assert "Peter  —  1 pts" in text and "Dave  —  1 pts" in text
+
+
+def test_hand_edited_rows_are_reparsed():
+    from bench.fake_gspread import FakeSpreadsheet
+    from services.sheets_quota import SheetsQuota
+
+    spreadsheet = FakeSpreadsheet()
+    spreadsheet.seed('results', [['match_key', 'home_score', 'away_score', 'stage', 'matchday', 'timestamp'],
+                                 ['England vs Croatia', 2, 1, 'group', 1, '2026-06-14'],
+                                 ['Mexico vs South Africa', 1, 1, 'group', 1, '2026-06-14']])
+    quota = SheetsQuota()
+    quota.buckets.clear()
+    sheets = load_wc_module('wc_sheets_service').WCSheetsService(spreadsheet=spreadsheet, quota=quota)
+    sheets.probe.interval = 0
+    assert sheets.get_all_results()[0]['home_score'] == 2
+
+    # An admin corrects a result in the middle of the tab: same row count, same last row
+    spreadsheet.worksheet('results').rows[1][1] = 0
+    spreadsheet.revision += 1
+    assert sheets.get_all_results()[0]['home_score'] == 0
+
+
+if __name__ == "__main__":
+    test_leaderboard_scores_every_form()
+    test_result_index_and_column_keys()
+    test_group_fixtures_match_in_either_order()
+    test_group_opponents_meeting_again_in_the_knockouts()
+    test_team_resolver()
+    test_form_schema_types_columns_once()
+    test_new_result_rescores_only_forms_with_that_match()
+    test_corrected_result_rescores_forms_that_depend_on_it()
+    test_whatif_plays_out_remaining_matches_with_the_scoring_rules()
+    test_whatif_is_out_when_a_shared_pick_keeps_the_gap()
+    test_leaderboard_reads_every_tab_in_one_batch()
+    test_result_edited_in_the_sheet_updates_the_leaderboard()
+    test_hand_edited_rows_are_reparsed()
+    print("✅ All WC scoring tests passed")
@@ -2,14 +2,23 @@ import pytz
 from datetime import datetime, timedelta
 from config.settings import GAMEWEEK_SCHEDULE
 
+ROLLOVER_DELAY = timedelta(minutes=30)   # let late goal corrections land before rolling a gameweek over
+
 def get_uk_timezone():
     """Get UK timezone (handles BST/GMT automatically)"""
     return pytz.timezone('Europe/London')
 
+def now_uk():
+    """Current UK wall-clock time as a naive datetime (the schedule's format).
+    
+    The benchmark tools replace this to replay a fixed point in the season.
+    """
+    return datetime.now(get_uk_timezone()).replace(tzinfo=None)
+
 def get_current_gameweek():
     """Determine which gameweek we're currently in based on current time"""
     uk_tz = get_uk_timezone()
-    now = datetime.now(uk_tz).replace(tzinfo=None)  # Remove timezone for comparison
+    now = now_uk()  # Remove timezone for comparison
     
     for gw_num, start_date, deadline, end_time in GAMEWEEK_SCHEDULE:
         # Convert dates to UK timezone
@@ -41,7 +50,7 @@ def get_current_gameweek():
 def is_deadline_passed(gameweek_num):
     """Check if the deadline for a specific gameweek has passed"""
     uk_tz = get_uk_timezone()
-    now = datetime.now(uk_tz).replace(tzinfo=None)
+    now = now_uk()
     
     for gw_num, start_date, deadline, end_time in GAMEWEEK_SCHEDULE:
         if gw_num == gameweek_num:
@@ -50,6 +59,13 @@ def is_deadline_passed(gameweek_num):
     
     return True  # If gameweek not found, assume deadline passed
 
+def get_closed_gameweeks():
+    """Gameweek numbers whose end_time (goal tracking window) plus ROLLOVER_DELAY has passed"""
+    now = now_uk()
+    
+    return [gw_num for gw_num, start_date, deadline, end_time in GAMEWEEK_SCHEDULE
+            if now > end_time + ROLLOVER_DELAY]
+
 def format_deadline(deadline_dt):
     """Format deadline time for display"""
     uk_tz = get_uk_timezone()
@@ -0,0 +1,111 @@
+import atexit
+import hashlib
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+
+from config.settings import LOG_FORMAT, LOG_LEVEL, LOG_PHONE_SALT
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'context'}
+
+_context = threading.local()
+_listener = None
+
+
+def phone_hash(phone):
+    """Stable, non-reversible short id for a phone number, safe to put in logs"""
+    if not phone:
+        return '-'
+    digest = hashlib.sha256(f"{LOG_PHONE_SALT}{phone}".encode()).hexdigest()
+    return f"p_{digest[:10]}"
+
+
+def set_log_context(**fields):
+    """Attach fields (command, phone, gameweek...) to every log line from this thread"""
+    current = getattr(_context, 'fields', None) or {}
+    _context.fields = {**current, **fields}
+
+
+def clear_log_context():
+    _context.fields = {}
+
+
+class ContextFilter(logging.Filter):
+    """Copies the thread's log context onto the record (runs on the logging thread, before queueing)"""
+
+    def filter(self, record):
+        record.context = dict(getattr(_context, 'fields', None) or {})
+        return True
+
+
+def _structured_fields(record):
+    fields = dict(getattr(record, 'context', {}))
+    for key, value in vars(record).items():
+        if key not in _RECORD_ATTRS and not key.startswith('_'):
+            fields[key] = value
+    return fields
+
+
+class KeyValueFormatter(logging.Formatter):
+    """`time LEVEL logger message key=value ...`"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        fields = _structured_fields(record)
+        if fields:
+            line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, structured fields as top-level keys"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **_structured_fields(record),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level=LOG_LEVEL, fmt=LOG_FORMAT):
+    """Route all logging through a queue to a stdout writer thread (idempotent).
+
+    The request thread only formats the message and enqueues it; the actual
+    write happens on the listener thread. Records below `level` are dropped
+    before their message is even formatted.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.Queue(-1)
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == 'json' else KeyValueFormatter())
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    # The scheduler logs every job run at INFO
+    logging.getLogger('apscheduler').setLevel(max(root.level, logging.WARNING))
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
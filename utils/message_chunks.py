@@ -0,0 +1,101 @@
+import threading
+import time
+
+WHATSAPP_LIMIT = 1600     # max characters in one WhatsApp message body
+PART_RESERVE = 60         # room left in each part for the "(1/3)" header or "more" footer
+PAGE_TTL = 1800           # keep paged replies for 30 minutes
+MAX_PAGED_USERS = 200
+
+
+def split_message(text, limit=WHATSAPP_LIMIT - PART_RESERVE):
+    """Split text into parts of at most `limit` characters, breaking at line boundaries.
+
+    A single line longer than the limit is hard-split. Blank lines at the
+    start of a part are dropped so each part reads cleanly on its own.
+    """
+    if len(text) <= limit:
+        return [text]
+
+    parts = []
+    current = []
+    current_len = 0
+    for line in text.split('\n'):
+        while len(line) > limit:
+            if current:
+                parts.append('\n'.join(current))
+                current, current_len = [], 0
+            parts.append(line[:limit])
+            line = line[limit:]
+
+        added = len(line) + (1 if current else 0)
+        if current and current_len + added > limit:
+            parts.append('\n'.join(current))
+            current, current_len = [], 0
+            added = len(line)
+        if not current and not line.strip():
+            continue
+        current.append(line)
+        current_len += added
+
+    if current:
+        parts.append('\n'.join(current))
+    return parts
+
+
+def number_parts(parts):
+    """Prefix each part with "(i/n)" when a message had to be split"""
+    if len(parts) == 1:
+        return parts
+    return [f"({i}/{len(parts)})\n{part}" for i, part in enumerate(parts, 1)]
+
+
+class ReplyPager:
+    """Keeps the remaining pages of long webhook replies per user.
+
+    A long reply is sent as page 1 with a footer; 'more' or 'page N' then
+    serves the rest from memory without recomputing anything.
+    """
+
+    def __init__(self, ttl=PAGE_TTL, max_users=MAX_PAGED_USERS):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._pages = {}   # {phone: {'pages': [...], 'next': index, 'stored_at': monotonic}}
+        self._lock = threading.Lock()
+
+    def paginate(self, phone, text):
+        """Return the first page of text, remembering the rest for follow-ups"""
+        parts = split_message(text)
+        if len(parts) == 1:
+            with self._lock:
+                self._pages.pop(phone, None)
+            return text
+
+        with self._lock:
+            if len(self._pages) >= self.max_users:
+                oldest = min(self._pages, key=lambda p: self._pages[p]['stored_at'])
+                self._pages.pop(oldest)
+            self._pages[phone] = {'pages': parts, 'next': 1, 'stored_at': time.monotonic()}
+        return self._format_page(parts, 0)
+
+    def page(self, phone, number=None):
+        """Return page `number` (1-based), or the next unread page if number is None"""
+        with self._lock:
+            entry = self._pages.get(phone)
+            if not entry or time.monotonic() - entry['stored_at'] > self.ttl:
+                self._pages.pop(phone, None)
+                return "Nothing more to show."
+
+            index = entry['next'] if number is None else number - 1
+            pages = entry['pages']
+            if index >= len(pages) or index < 0:
+                if number is None:
+                    return "That's everything — no more parts."
+                return f"There are only {len(pages)} parts."
+            entry['next'] = index + 1
+        return self._format_page(pages, index)
+
+    def _format_page(self, pages, index):
+        page = f"({index + 1}/{len(pages)})\n{pages[index]}"
+        if index + 1 < len(pages):
+            page += f"\n\n📄 Reply 'more' for part {index + 2}/{len(pages)}"
+        return page
@@ -0,0 +1,207 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) for request latency buckets; Twilio gives up at 15s
+REQUEST_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0)
+
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(f'{key}="{str(value).replace(chr(34), "")}"' for key, value in labels)
+    return '{' + pairs + '}'
+
+
+class RequestTrace:
+    """What one request spent on external services, for its timing log line"""
+
+    def __init__(self, route, command):
+        self.route = route
+        self.command = command
+        self.started = time.perf_counter()
+        self.calls = {}       # {service: count}
+        self.seconds = {}     # {service: total seconds}
+
+    def add(self, service, seconds):
+        self.calls[service] = self.calls.get(service, 0) + 1
+        self.seconds[service] = self.seconds.get(service, 0.0) + seconds
+
+    def log_line(self, status):
+        """One logfmt line: route, status, total and per-service time and call counts.
+
+        The command is left to the log context, which already tags every line of the request.
+        """
+        duration = time.perf_counter() - self.started
+        fields = [f"route={self.route}", f"status={status}",
+                  f"duration_ms={duration * 1000:.1f}"]
+        for service in sorted(self.calls):
+            fields.append(f"{service}_calls={self.calls[service]}")
+            fields.append(f"{service}_ms={self.seconds[service] * 1000:.1f}")
+        return "request " + " ".join(fields)
+
+
+class Metrics:
+    """In-process counters, summaries and histograms rendered as Prometheus text.
+
+    Kept dependency-free: a handful of dicts behind one lock. Cache hit
+    ratios are read at scrape time from the stats dicts the caches already
+    keep, via register_cache().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}     # {(name, labels): value}
+        self._summaries = {}    # {(name, labels): [count, sum]}
+        self._histograms = {}   # {(name, labels): [bucket counts..., count, sum]}
+        self._caches = {}       # {cache name: callable returning {'hits', 'misses'}}
+        self._local = threading.local()
+
+    # -- recording --
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, tuple(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, labels, seconds):
+        key = (name, tuple(labels))
+        with self._lock:
+            entry = self._summaries.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def observe_request(self, labels, seconds):
+        key = ('bot_request_seconds', tuple(labels))
+        with self._lock:
+            entry = self._histograms.setdefault(key, [0] * len(REQUEST_BUCKETS) + [0, 0.0])
+            for i, bound in enumerate(REQUEST_BUCKETS):
+                if seconds <= bound:
+                    entry[i] += 1
+            entry[-2] += 1
+            entry[-1] += seconds
+
+    def register_cache(self, name, stats):
+        """Expose a cache's hits/misses; `stats` is called at scrape time"""
+        self._caches[name] = stats
+
+    # -- request scope --
+
+    def start_request(self, route, command):
+        trace = RequestTrace(route, command)
+        self._local.trace = trace
+        return trace
+
+    def finish_request(self, status):
+        """Record the current request's latency and return its log line (None if none started)"""
+        trace = getattr(self._local, 'trace', None)
+        if trace is None:
+            return None
+        self._local.trace = None
+        labels = (('route', trace.route), ('command', trace.command), ('status', status))
+        self.observe_request(labels, time.perf_counter() - trace.started)
+        return trace.log_line(status)
+
+    @contextmanager
+    def external_call(self, service, operation):
+        """Time one call to Sheets, FPL or Twilio and count it (and its failure, if it raises)"""
+        labels = (('service', service), ('operation', operation))
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc('bot_external_errors_total', labels)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.inc('bot_external_calls_total', labels)
+            self.observe('bot_external_call_seconds', labels, elapsed)
+            trace = getattr(self._local, 'trace', None)
+            if trace is not None:
+                trace.add(service, elapsed)
+
+    def timed(self, component, method):
+        """Decorator recording a method's wall time in bot_method_seconds"""
+        labels = (('component', component), ('method', method))
+
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe('bot_method_seconds', labels, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def instrument_class(self, cls, component):
+        """Wrap every public method defined on cls with timed()"""
+        for name, attr in list(vars(cls).items()):
+            if callable(attr) and not name.startswith('_'):
+                setattr(cls, name, self.timed(component, name)(attr))
+        return cls
+
+    # -- exposition --
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            counters = dict(self._counters)
+            summaries = {key: list(value) for key, value in self._summaries.items()}
+            histograms = {key: list(value) for key, value in self._histograms.items()}
+
+        lines = []
+        seen = set()
+
+        def header(name, kind):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, 'counter')
+            lines.append(f"{name}{_label_text(labels)} {value}")
+
+        for (name, labels), (count, total) in sorted(summaries.items()):
+            header(name, 'summary')
+            lines.append(f"{name}_count{_label_text(labels)} {count}")
+            lines.append(f"{name}_sum{_label_text(labels)} {total:.6f}")
+
+        for (name, labels), entry in sorted(histograms.items()):
+            header(name, 'histogram')
+            for bound, bucket_count in zip(REQUEST_BUCKETS, entry):
+                lines.append(f"{name}_bucket{_label_text(labels + (('le', bound),))} {bucket_count}")
+            lines.append(f"{name}_bucket{_label_text(labels + (('le', '+Inf'),))} {entry[-2]}")
+            lines.append(f"{name}_count{_label_text(labels)} {entry[-2]}")
+            lines.append(f"{name}_sum{_label_text(labels)} {entry[-1]:.6f}")
+
+        snapshots = []
+        for name, stats in sorted(self._caches.items()):
+            try:
+                snapshot = stats()
+            except Exception:
+                continue
+            snapshots.append(((('cache', name),), snapshot.get('hits', 0), snapshot.get('misses', 0)))
+        if snapshots:
+            header('bot_cache_hits_total', 'counter')
+            lines.extend(f"bot_cache_hits_total{_label_text(labels)} {hits}" for labels, hits, _ in snapshots)
+            header('bot_cache_misses_total', 'counter')
+            lines.extend(f"bot_cache_misses_total{_label_text(labels)} {misses}" for labels, _, misses in snapshots)
+            header('bot_cache_hit_ratio', 'gauge')
+            for labels, hits, misses in snapshots:
+                ratio = hits / (hits + misses) if hits + misses else 0.0
+                lines.append(f"bot_cache_hit_ratio{_label_text(labels)} {ratio:.4f}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+            self._histograms.clear()
+
+
+# One registry per process, shared by every service
+metrics = Metrics()
@@ -8,4 +8,10 @@ PLAYER_CORRECTIONS = {
     "enzo fernandez": "E. Fernandez",
     "enzo": "E. Fernandez",
     "bruno fernandes": "B. Fernandes" 
+}
+
+# Pick names the FPL live feed knows by a different name (web_name)
+FPL_NAME_ALIASES = {
+    "DCL": "Calvert-Lewin",
+    "E. Fernandez": "Enzo",
 }
\ No newline at end of file
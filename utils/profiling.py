@@ -0,0 +1,161 @@
+import cProfile
+import functools
+import itertools
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from config.settings import PROFILE_DIR, PROFILE_EVERY, PROFILE_SLOW_MS
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_INTERVAL = 0.005   # seconds between stack samples of a request in slow-request mode
+MAX_PROFILE_FILES = 200   # oldest files are deleted beyond this
+PROFILE_SUFFIXES = ('.prof', '.folded')   # the only files _prune() touches; PROFILE_DIR may hold others
+
+
+class StackSampler:
+    """Samples the stacks of registered threads from one background thread.
+
+    Cheap enough to leave on for every request: a slow request's samples are
+    written out in the folded format flamegraph.pl / speedscope read; a fast
+    request's are thrown away.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self._active = {}     # {thread id: Counter of folded stacks}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, thread_id):
+        samples = Counter()
+        with self._lock:
+            self._active[thread_id] = samples
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+        return samples
+
+    def stop(self, thread_id):
+        with self._lock:
+            return self._active.pop(thread_id, Counter())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for thread_id, samples in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples[self._fold(frame)] += 1
+
+    @staticmethod
+    def _fold(frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(stack))
+
+
+class RequestProfiler:
+    """Opt-in profiling of webhook requests, configured from the environment.
+
+    PROFILE_EVERY=N    run cProfile on every Nth request and dump a .prof file
+    PROFILE_SLOW_MS=T  sample stacks of every request and keep those slower
+                       than T ms as a .folded file
+    PROFILE_DIR        where the files go (default ./profiles)
+
+    Files are named <time>_<tag>_<ms>ms so they sort by time and group by
+    command. With both settings off, wrap() returns the function untouched.
+    """
+
+    def __init__(self, directory=PROFILE_DIR, every=PROFILE_EVERY, slow_ms=PROFILE_SLOW_MS):
+        self.directory = directory
+        self.every = every
+        self.slow_ms = slow_ms
+        self.sampler = StackSampler() if slow_ms else None
+        self._counter = itertools.count(1)
+        self._cprofile_lock = threading.Lock()   # only one cProfile may run at a time
+
+    @property
+    def enabled(self):
+        return bool(self.every or self.slow_ms)
+
+    def wrap(self, fn, tag=lambda: 'request'):
+        """Profile calls to fn per the settings; tag() names the file (e.g. the command)"""
+        if not self.enabled:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profile = None
+            if self.every and next(self._counter) % self.every == 0 and self._cprofile_lock.acquire(blocking=False):
+                profile = cProfile.Profile()
+            thread_id = threading.get_ident()
+            if self.sampler:
+                self.sampler.start(thread_id)
+
+            start = time.perf_counter()
+            try:
+                if profile is not None:
+                    return profile.runcall(fn, *args, **kwargs)
+                return fn(*args, **kwargs)
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                samples = self.sampler.stop(thread_id) if self.sampler else None
+                try:
+                    if profile is not None:
+                        self._write(profile, tag, elapsed_ms, '.prof')
+                    if samples and elapsed_ms >= self.slow_ms:
+                        self._write(samples, tag, elapsed_ms, '.folded')
+                except Exception as e:
+                    logger.error("Error writing profile: %s", e)
+                finally:
+                    if profile is not None:
+                        self._cprofile_lock.release()
+        return wrapper
+
+    def profiled(self, tag=lambda: 'request'):
+        """Decorator form of wrap()"""
+        return functools.partial(self.wrap, tag=tag)
+
+    def _write(self, data, tag, elapsed_ms, suffix):
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            label = re.sub(r'[^A-Za-z0-9_-]+', '_', str(tag()))[:40] or 'request'
+        except Exception:
+            label = 'request'
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        path = os.path.join(self.directory, f"{stamp}_{label}_{elapsed_ms:.0f}ms{suffix}")
+
+        if suffix == '.prof':
+            data.dump_stats(path)
+        else:
+            with open(path, 'w') as f:
+                for stack, count in data.most_common():
+                    f.write(f"{stack} {count}\n")
+        logger.info("Profile written to %s", path)
+        self._prune()
+
+    def _prune(self):
+        files = sorted(name for name in os.listdir(self.directory) if name.endswith(PROFILE_SUFFIXES))
+        for name in files[:-MAX_PROFILE_FILES]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+
+# Configured once from the environment at import
+request_profiler = RequestProfiler()
@@ -0,0 +1,55 @@
+import threading
+from collections import OrderedDict
+
+MAX_ENTRIES = 64
+
+
+class Uncached(str):
+    """Reply text that get_or_render returns but never remembers (errors and empty states)"""
+
+
+class RenderCache:
+    """LRU of rendered reply text keyed by (command, gameweek, data version).
+
+    The data version is whatever token changes when the underlying data does
+    (sheet revision, fixture fetch time). Identical requests in between are
+    served from memory; a version of None means "unknown" and always renders.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, command, gameweek, version, render):
+        """Return the cached text for this key, or call render() and remember the result.
+
+        A render() that returns Uncached text is passed through unstored, so a
+        transient error or empty answer isn't served for the rest of the version.
+        """
+        if version is None:
+            self.stats['misses'] += 1
+            return str(render())
+
+        key = (command, gameweek, version)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return self._entries[key]
+
+        self.stats['misses'] += 1
+        text = render()
+        if isinstance(text, Uncached):
+            return str(text)
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return text
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -21,6 +21,38 @@ def parse_player_picks(message_body):
     
     return players
 
+# Command vocabulary of the webhook, used to label metrics and logs
+COMMAND_PATTERNS = [
+    ('more', r'^(?:more|next|page \d+)$'),
+    ('fixtures', r'^(?:show fixtures|fixtures|games)$'),
+    ('weights', r'^(?:show weightings|weightings|show weights|weights)$'),
+    ('season', r'^(?:season|season table|table|standings)$'),
+    ('form', r'^form(?: last \d+)?$'),
+    ('h2h', r'^(?:h2h|head-to-head|head to head) '),
+    ('goal', r'^(?:goal|1) '),
+    ('no_goal', r'^0 '),
+    ('eliminate', r'^eliminate '),
+    ('reinstate', r'^reinstate '),
+    ('unique', r'^(?:show unique|unique|unique picks|show unique picks)$'),
+    ('help', r'^(?:help|commands)$'),
+    ('scorers', r'^(?:show scorers|scorers|goals)$'),
+    ('leaderboard_detail', r'^leaderboard detail$'),
+    ('leaderboard', r'^leaderboard$'),
+    ('projection', r'^(?:projection|can win|who can win)$'),
+    ('status', r'^(?:show active|active|whos in|who is in|status|show status)$'),
+    ('summary', r'^(?:summary|picks|show picks|show)$'),
+]
+
+def command_name(message_body):
+    """Short, bounded name for the command in a message ('pick' for a set of picks, else 'other')"""
+    message_lower = message_body.lower().strip()
+    for name, pattern in COMMAND_PATTERNS:
+        if re.match(pattern, message_lower):
+            return name
+    if len(parse_player_picks(message_body)) == 8:
+        return 'pick'
+    return 'other'
+
 def send_instructions(current_gameweek, deadline_str):
     """Generate welcome/instructions message"""
     return (